@@ -0,0 +1,45 @@
+"""Heavy libraries (tensorflow, torch, cv2, matplotlib.pyplot, scipy.ndimage) imported on the first use.
+
+Test discovery imports every test module, so a module level import of such library slows down every run even if none
+of its tests is selected. Names imported with lazy_import are bound to a proxy which imports the library on the first
+access to any of its attributes, e.g. tf = lazy_import('tensorflow') instead of import tensorflow as tf.
+
+Attributes are resolved when the line using them is executed, so the proxies can't be used in module level
+annotations, base classes and decorators - they would import the library immediately.
+"""
+import importlib
+import sys
+from types import ModuleType
+from typing import Any
+
+
+_MODULE_KEY: str = '__lazy_module__'
+
+
+def _load(proxy: ModuleType) -> ModuleType:
+    module: ModuleType | None = proxy.__dict__.get(_MODULE_KEY)
+    if module is None:
+        module = importlib.import_module(proxy.__name__)
+        proxy.__dict__[_MODULE_KEY] = module
+
+    return module
+
+
+class LazyModule(ModuleType):
+    # no public methods, they would hide the attributes of the module
+    def __getattr__(self, name: str) -> Any:
+        # called only for the attributes which are missing in the proxy itself
+        return getattr(_load(self), name)
+
+    def __dir__(self) -> list[str]:
+        return dir(_load(self))
+
+    def __repr__(self) -> str:
+        return f"<lazy module '{self.__name__}' ({'loaded' if _MODULE_KEY in self.__dict__ else 'not loaded'})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Returns the module if it's already imported or the proxy importing it on the first attribute access"""
+    module: ModuleType | None = sys.modules.get(name)
+
+    return LazyModule(name) if module is None else module
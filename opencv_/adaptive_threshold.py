@@ -0,0 +1,117 @@
+"""Adaptive thresholding of one image with many (block size, C) pairs at once.
+
+cv2.adaptiveThreshold computes the local means from scratch on every call. Here the summed-area table of the image is
+built once and the means of all the block sizes are 4 lookups per pixel in it, the Gaussian weighted means are
+computed once per distinct block size. The pairs sharing a block size are thresholded by one comparison broadcast over
+their C values. The maps are the same as cv2.adaptiveThreshold returns.
+
+Run from the repository root to compare with the calls of cv2.adaptiveThreshold: python -m opencv_.adaptive_threshold
+"""
+import math
+import time
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+def get_local_means(image: np.ndarray, block_sizes: list[int]) -> np.ndarray:
+    """Returns (block sizes, height, width) uint8 means of the blocks around the pixels rounded as cv2.boxFilter does,
+    the border is replicated. The summed-area table is built once for all the block sizes."""
+    max_radius: int = max(block_sizes) // 2
+    padded: np.ndarray = cv2.copyMakeBorder(image, max_radius, max_radius, max_radius, max_radius,
+                                            cv2.BORDER_REPLICATE)
+    table: np.ndarray = cv2.integral(padded, sdepth=cv2.CV_32S)
+    height, width = image.shape[:2]
+
+    means: np.ndarray = np.empty((len(block_sizes), height, width), dtype=np.uint8)
+    for mean, block_size in zip(means, block_sizes):
+        start: int = max_radius - block_size // 2
+        end: int = start + block_size
+        # cv2 arithmetic on the views of the table avoids the temporaries and the float64 division of NumPy
+        sums: np.ndarray = cv2.add(cv2.subtract(table[end:end + height, end:end + width],
+                                                table[start:start + height, end:end + width]),
+                                   cv2.subtract(table[start:start + height, start:start + width],
+                                                table[end:end + height, start:start + width]))
+        mean[:] = cv2.convertScaleAbs(sums, alpha=1 / (block_size * block_size))
+
+    return means
+
+
+def get_gaussian_means(image: np.ndarray, block_sizes: list[int]) -> np.ndarray:
+    """Returns (block sizes, height, width) Gaussian weighted means as cv2.adaptiveThreshold computes them, the image
+    is converted to float32 once and blurred by one separable pass per block size"""
+    image = image.astype(np.float32)
+    means: np.ndarray = np.empty((len(block_sizes),) + image.shape[:2], dtype=np.uint8)
+    for mean, block_size in zip(means, block_sizes):
+        blurred: np.ndarray = cv2.GaussianBlur(image, (block_size, block_size), 0,
+                                               borderType=cv2.BORDER_REPLICATE | cv2.BORDER_ISOLATED)
+        np.rint(blurred, out=mean, casting='unsafe')
+
+    return means
+
+
+# pylint: disable=too-many-arguments
+def adaptive_thresholds(image: np.ndarray, parameters: list[tuple[int, float]], *,
+                        method: int | None = None, threshold_type: int | None = None,
+                        max_value: int = 255) -> np.ndarray:
+    """Returns (parameters, height, width) uint8 maps of cv2.adaptiveThreshold of the gray uint8 image for every
+    (block size, C) pair. ADAPTIVE_THRESH_MEAN_C and THRESH_BINARY are used by default."""
+    method = cv2.ADAPTIVE_THRESH_MEAN_C if method is None else method
+    threshold_type = cv2.THRESH_BINARY if threshold_type is None else threshold_type
+    if threshold_type not in (cv2.THRESH_BINARY, cv2.THRESH_BINARY_INV):
+        raise ValueError(f'Unsupported threshold type: {threshold_type}')
+    for block_size, _ in parameters:
+        if block_size % 2 == 0 or block_size < 3:
+            raise ValueError(f'Block size must be odd and greater than 1: {block_size}')
+
+    block_sizes: list[int] = sorted({block_size for block_size, _ in parameters})
+    means: np.ndarray = get_local_means(image, block_sizes) if method == cv2.ADAPTIVE_THRESH_MEAN_C else \
+        get_gaussian_means(image, block_sizes)
+
+    # cv2 rounds C towards the side which makes the comparison of integers the same as of the real numbers
+    rounding = math.ceil if threshold_type == cv2.THRESH_BINARY else math.floor
+    deltas: np.ndarray = np.array([rounding(c) for _, c in parameters], dtype=np.int16)[:, np.newaxis, np.newaxis]
+    pair_sizes: np.ndarray = np.array([block_size for block_size, _ in parameters])
+    signed: np.ndarray = image.astype(np.int16)
+    above: np.ndarray = np.empty((len(parameters),) + image.shape[:2], dtype=bool)
+    for mean, block_size in zip(means, block_sizes):
+        # the difference from the mean is computed once per block size and compared with all its C at once
+        pairs: np.ndarray = np.flatnonzero(pair_sizes == block_size)
+        above[pairs] = signed - mean.astype(np.int16) > -deltas[pairs]
+    if threshold_type == cv2.THRESH_BINARY_INV:
+        above = ~above
+
+    return above.view(np.uint8) * np.uint8(max_value)
+
+
+def _benchmark(image: np.ndarray, parameters: list[tuple[int, float]], method: int, repeats: int = 3) -> None:
+    start: float = time.perf_counter()
+    for _ in range(repeats):
+        expected: list[np.ndarray] = [cv2.adaptiveThreshold(image, 255, method, cv2.THRESH_BINARY, block_size, c)
+                                      for block_size, c in parameters]
+    loop_time: float = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        maps: np.ndarray = adaptive_thresholds(image, parameters, method=method)
+    batch_time: float = (time.perf_counter() - start) / repeats
+
+    differences: int = int((maps != np.stack(expected)).sum())
+    print(f'{image.shape[1]}x{image.shape[0]}, {len(parameters)} pairs, method {method}: '
+          f'adaptiveThreshold loop {loop_time * 1000:.1f}ms, batch {batch_time * 1000:.1f}ms, '
+          f'{differences} different pixels')
+
+
+if __name__ == '__main__':
+    from os.path import abspath, dirname, join
+
+    animal: np.ndarray = cv2.imread(join(dirname(dirname(abspath(__file__))), 'images', 'animal.jpg'),
+                                    cv2.IMREAD_GRAYSCALE)
+    grid: list[tuple[int, float]] = [(block_size, c) for block_size in range(3, 52, 4) for c in (-2, 0, 1, 2, 5)]
+    for scale in (1, 4):
+        resized: np.ndarray = cv2.resize(animal, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        _benchmark(resized, grid, cv2.ADAPTIVE_THRESH_MEAN_C)
+        _benchmark(resized, grid, cv2.ADAPTIVE_THRESH_GAUSSIAN_C)
@@ -0,0 +1,231 @@
+"""Index of the bounding boxes of the PRImA and Pascal VOC annotations for training of the cascade classifiers.
+
+Every XML file is streamed with iterparse once, boxes of all the files are kept in one (boxes, 4) int32 array of
+[x0, y0, x1, y1] with offsets of the files, so info.dat, bg.txt and the negative crops of CascadeClassifier.ipynb and
+CascadeClassifierCards.ipynb are generated from the index without parsing the XML again. The index is cached in a .npz
+file and rebuilt when the list of the files or their modification times change. The training set itself is built by
+opencv_.cascade_dataset.
+"""
+import os
+from dataclasses import dataclass
+from typing import Iterator
+from xml.etree.ElementTree import Element, iterparse
+
+import numpy as np
+
+# PRImA regions with fewer points are skipped as in CascadeClassifier.ipynb
+MIN_REGION_POINTS: int = 4
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _parse_prima(events: Iterator[tuple[str, Element]]) -> np.ndarray:
+    """Boxes of the TextRegion elements, points are collected into flat arrays and reduced per region at once"""
+    coordinates: list[int] = []
+    region_starts: list[int] = []
+    in_region: bool = False
+    for event, element in events:
+        name: str = _local_name(element.tag)
+        if name == 'TextRegion':
+            in_region = event == 'start'
+            if in_region:
+                region_starts.append(len(coordinates))
+            else:
+                element.clear()
+        elif event == 'end' and in_region and name == 'Point':
+            coordinates.extend((int(element.get('x')), int(element.get('y'))))
+        elif event == 'end' and in_region and name == 'Coords' and element.get('points') is not None:
+            # PAGE format of the later versions stores the points in the attribute: "x0,y0 x1,y1 ..."
+            coordinates.extend(int(value) for point in element.get('points').split() for value in point.split(','))
+
+    points: np.ndarray = np.array(coordinates, dtype=np.int32).reshape(-1, 2)
+    counts: np.ndarray = np.diff(np.append(np.array(region_starts, dtype=np.int64) // 2, len(points)))
+    kept: np.ndarray = counts >= MIN_REGION_POINTS
+    if not kept.any():
+        return np.empty((0, 4), dtype=np.int32)
+    points = points[np.repeat(kept, counts)]
+    starts: np.ndarray = np.concatenate([[0], np.cumsum(counts[kept])[:-1]])
+
+    return np.hstack([np.minimum.reduceat(points, starts), np.maximum.reduceat(points, starts)])
+
+
+def _parse_voc(events: Iterator[tuple[str, Element]]) -> np.ndarray:
+    coordinates: list[int] = []
+    in_part: bool = False
+    for event, element in events:
+        if element.tag == 'part':
+            # parts of the object (e.g. hands of a person) have boxes of their own
+            in_part = event == 'start'
+        elif event == 'end' and element.tag == 'bndbox' and not in_part:
+            coordinates.extend(int(float(element.findtext(name))) for name in ('xmin', 'ymin', 'xmax', 'ymax'))
+        elif event == 'end' and element.tag == 'object':
+            element.clear()
+
+    return np.array(coordinates, dtype=np.int32).reshape(-1, 4)
+
+
+def parse_annotation(path: str) -> np.ndarray:
+    """Returns (boxes, 4) int32 array of [x0, y0, x1, y1] of the PRImA text regions or the Pascal VOC objects"""
+    events: Iterator[tuple[str, Element]] = iter(iterparse(path, events=('start', 'end')))
+    _, root = next(events)
+    root_name: str = _local_name(root.tag)
+    if root_name == 'annotation':
+        return _parse_voc(events)
+    if root_name == 'PcGts':
+        return _parse_prima(events)
+    raise ValueError(f'Unknown annotation format of {path}: {root.tag}')
+
+
+def get_prima_image_path(xml_path: str, images_dir: str) -> str:
+    """Image of the PRImA annotation, e.g. XML/pc-00000001.xml annotates Images/00000001.tif"""
+    name: str = os.path.splitext(os.path.basename(xml_path))[0]
+
+    return os.path.join(images_dir, f'{name.removeprefix("pc-")}.tif')
+
+
+def get_voc_image_path(xml_path: str) -> str:
+    """Image of the Pascal VOC annotation lies next to it"""
+    return f'{os.path.splitext(xml_path)[0]}.jpg'
+
+
+@dataclass
+class AnnotationIndex:
+    xml_paths: np.ndarray  # (images,) str
+    image_paths: np.ndarray  # (images,) str
+    mtimes: np.ndarray  # (images,) int64 modification times of the XML files in nanoseconds
+    boxes: np.ndarray  # (boxes, 4) int32 [x0, y0, x1, y1]
+    offsets: np.ndarray  # (images + 1,) int64, boxes of the image i are boxes[offsets[i]:offsets[i + 1]]
+
+    def __len__(self) -> int:
+        return len(self.xml_paths)
+
+    def get_boxes(self, index: int) -> np.ndarray:
+        return self.boxes[self.offsets[index]:self.offsets[index + 1]]
+
+    def get_counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def get_max_box_size(self) -> tuple[int, int]:
+        """Returns (width, height) of the largest box"""
+        if len(self.boxes) == 0:
+            return 0, 0
+        sizes: np.ndarray = self.boxes[:, 2:] - self.boxes[:, :2]
+
+        return int(sizes[:, 0].max()), int(sizes[:, 1].max())
+
+    def get_extents(self) -> np.ndarray:
+        """Returns (images, 4) int32 array of the boxes enclosing all the boxes of every image, [-1, -1, -1, -1] for
+        the images without boxes"""
+        extents: np.ndarray = np.full((len(self), 4), -1, dtype=np.int32)
+        counts: np.ndarray = self.get_counts()
+        not_empty: np.ndarray = counts > 0
+        if not_empty.any():
+            starts: np.ndarray = self.offsets[:-1][not_empty]
+            extents[not_empty, :2] = np.minimum.reduceat(self.boxes[:, :2], starts)
+            extents[not_empty, 2:] = np.maximum.reduceat(self.boxes[:, 2:], starts)
+
+        return extents
+
+    def save(self, path: str) -> None:
+        np.savez(path, xml_paths=self.xml_paths, image_paths=self.image_paths, mtimes=self.mtimes, boxes=self.boxes,
+                 offsets=self.offsets)
+
+    @staticmethod
+    def load(path: str) -> 'AnnotationIndex':
+        with np.load(path) as data:
+            return AnnotationIndex(data['xml_paths'], data['image_paths'], data['mtimes'], data['boxes'],
+                                   data['offsets'])
+
+
+def build_index(xml_paths: list[str], image_paths: list[str]) -> AnnotationIndex:
+    """Parses the annotations, image_paths are the images annotated by the XML files"""
+    if len(xml_paths) != len(image_paths):
+        raise ValueError(f'{len(xml_paths)} annotations for {len(image_paths)} images')
+    boxes: list[np.ndarray] = [parse_annotation(path) for path in xml_paths]
+    offsets: np.ndarray = np.zeros(len(boxes) + 1, dtype=np.int64)
+    np.cumsum([len(image_boxes) for image_boxes in boxes], out=offsets[1:])
+
+    return AnnotationIndex(np.array(xml_paths, dtype=str), np.array(image_paths, dtype=str), _get_mtimes(xml_paths),
+                           np.concatenate(boxes) if len(boxes) > 0 else np.empty((0, 4), dtype=np.int32), offsets)
+
+
+def _get_mtimes(paths: list[str]) -> np.ndarray:
+    return np.array([os.stat(path).st_mtime_ns for path in paths], dtype=np.int64)
+
+
+def load_index(xml_paths: list[str], image_paths: list[str], cache_path: str) -> AnnotationIndex:
+    """Returns the index cached in the .npz file if it was built for the same files, builds and caches it otherwise"""
+    if os.path.exists(cache_path):
+        index: AnnotationIndex = AnnotationIndex.load(cache_path)
+        if index.xml_paths.tolist() == list(xml_paths) and index.image_paths.tolist() == list(image_paths) and \
+                np.array_equal(index.mtimes, _get_mtimes(xml_paths)):
+            return index
+
+    index = build_index(xml_paths, image_paths)
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    index.save(cache_path)
+
+    return index
+
+
+def _to_relative(path: str, start: str) -> str:
+    return os.path.join('.', os.path.relpath(path, start))
+
+
+def write_info(index: AnnotationIndex, info_path: str, positives_dir: str | None = None) -> int:
+    """Writes the positive samples description for opencv_createsamples, returns the number of the boxes.
+
+    Images are referenced relative to the directory of the file, from positives_dir if the images are copied there.
+    Boxes without area are skipped because opencv_createsamples rejects them.
+    """
+    info_dir: str = os.path.dirname(os.path.abspath(info_path))
+    sizes: np.ndarray = index.boxes[:, 2:] - index.boxes[:, :2]
+    rectangles: np.ndarray = np.hstack([index.boxes[:, :2], sizes])
+    valid: np.ndarray = (sizes > 0).all(axis=1)
+    count: int = 0
+    with open(info_path, 'w', encoding='utf-8') as file:
+        for i, image_path in enumerate(index.image_paths):
+            if positives_dir is not None:
+                image_path = os.path.join(positives_dir, os.path.basename(image_path))
+            image_rectangles: np.ndarray = rectangles[index.offsets[i]:index.offsets[i + 1]]
+            image_rectangles = image_rectangles[valid[index.offsets[i]:index.offsets[i + 1]]]
+            descriptor: str = '  '.join(' '.join(map(str, rectangle)) for rectangle in image_rectangles.tolist())
+            file.write(f'{_to_relative(os.path.abspath(image_path), info_dir)} {len(image_rectangles)} {descriptor}\n')
+            count += len(image_rectangles)
+
+    return count
+
+
+def write_bg(image_paths: list[str], bg_path: str) -> None:
+    """Writes the negative samples description, images are referenced relative to the directory of the file"""
+    bg_dir: str = os.path.dirname(os.path.abspath(bg_path))
+    with open(bg_path, 'w', encoding='utf-8') as file:
+        for path in image_paths:
+            file.write(f'{_to_relative(os.path.abspath(path), bg_dir)}\n')
+
+
+def get_negative_regions(extent: np.ndarray, shape: tuple[int, ...],
+                         min_size: tuple[int, int] = (128, 128)) -> dict[str, tuple[slice, slice]]:
+    """Returns rows and columns of the parts of the image to the left, top, right and bottom of all the boxes which
+    are at least min_size (width, height), as in CascadeClassifierCards.ipynb"""
+    if extent[0] < 0:
+        return {}
+    height, width = shape[:2]
+    x0, y0, x1, y1 = extent.tolist()
+    regions: dict[str, tuple[slice, slice]] = {
+        'left': (slice(0, height), slice(0, x0)),
+        'top': (slice(0, y0), slice(0, width)),
+        'right': (slice(0, height), slice(x1, width)),
+        'bottom': (slice(y1, height), slice(0, width)),
+    }
+
+    return {side: region for side, region in regions.items()
+            if region[1].stop - region[1].start >= min_size[0] and region[0].stop - region[0].start >= min_size[1]}
+
+
+def get_negative_path(output_dir: str, image_path: str, side: str) -> str:
+    name, extension = os.path.splitext(os.path.basename(image_path))
+
+    return os.path.join(output_dir, f'{name}_{side}{extension}')
@@ -0,0 +1,170 @@
+"""Incremental building of the training set of the cascade classifier from the annotation index.
+
+Images which go to positives/ and negatives/ unchanged are hardlinked, symlinked when the directories are on different
+file systems and copied only when links aren't supported. Negative crops are written by a pool of worker processes.
+Outputs which are newer than their sources are skipped, so rebuilding of the unchanged dataset reads no images.
+
+    index = load_index(xml_paths, image_paths, 'output/cards_index.npz')
+    build_dataset(index, '../data/PlayingCards', crop=True)
+"""
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from functools import partial
+
+import numpy as np
+
+from lazy_imports import lazy_import
+from opencv_.annotations import AnnotationIndex, get_negative_path, get_negative_regions, write_bg, write_info
+
+cv2 = lazy_import('cv2')
+
+POSITIVES_DIR: str = 'positives'
+NEGATIVES_DIR: str = 'negatives'
+
+
+class LinkType(Enum):
+    SKIPPED = 'skipped'  # destination is up to date
+    HARDLINK = 'hardlink'
+    SYMLINK = 'symlink'
+    COPY = 'copy'
+
+
+@dataclass
+class DatasetStats:
+    positives: int = 0
+    boxes: int = 0
+    negatives: int = 0
+    linked: int = 0
+    copied: int = 0
+    cropped: int = 0  # images read to write their crops
+    skipped: int = 0  # images and crops which were up to date
+
+
+def is_up_to_date(destination: str, *sources: str) -> bool:
+    """Whether the destination exists and isn't older than any of the sources"""
+    try:
+        destination_mtime: int = os.stat(destination).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+    return all(os.stat(source).st_mtime_ns <= destination_mtime for source in sources)
+
+
+def link_or_copy(source: str, destination: str) -> LinkType:
+    """Makes the destination refer to the content of the source without copying it when possible"""
+    if is_up_to_date(destination, source):
+        return LinkType.SKIPPED
+    if os.path.lexists(destination):
+        os.remove(destination)
+    os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+    try:
+        os.link(source, destination)
+        return LinkType.HARDLINK
+    except OSError:
+        pass
+    try:
+        os.symlink(os.path.relpath(source, os.path.dirname(destination)), destination)
+        return LinkType.SYMLINK
+    except OSError:
+        shutil.copy2(source, destination)
+        return LinkType.COPY
+
+
+def link_images(image_paths: list[str], output_dir: str, stats: DatasetStats) -> list[str]:
+    """Links the images into the directory by their names, returns the paths of the links"""
+    paths: list[str] = []
+    for image_path in image_paths:
+        path: str = os.path.join(output_dir, os.path.basename(image_path))
+        link_type: LinkType = link_or_copy(image_path, path)
+        if link_type == LinkType.SKIPPED:
+            stats.skipped += 1
+        elif link_type == LinkType.COPY:
+            stats.copied += 1
+        else:
+            stats.linked += 1
+        paths.append(path)
+
+    return paths
+
+
+def _init_worker() -> None:
+    # images are processed in parallel by the processes, threads of opencv would only compete with each other
+    cv2.setNumThreads(1)
+
+
+def _crop(output_dir: str, min_size: tuple[int, int], task: tuple[str, str, tuple[int, ...]]) -> tuple[list[str], bool]:
+    """Writes the crops of the image unless all of them are up to date, returns their paths and whether the image was
+    read"""
+    image_path, xml_path, extent = task
+    existing: list[str] = [path for path in (get_negative_path(output_dir, image_path, side)
+                                             for side in ('left', 'top', 'right', 'bottom')) if os.path.exists(path)]
+    if len(existing) > 0 and all(is_up_to_date(path, image_path, xml_path) for path in existing):
+        return existing, False
+
+    image: np.ndarray | None = cv2.imread(image_path)
+    if image is None:
+        raise OSError(f'Unable to read the image: {image_path}')
+    for path in existing:
+        # the boxes have changed, crops of the sides which aren't large enough anymore must not stay
+        os.remove(path)
+    paths: list[str] = []
+    for side, region in get_negative_regions(np.array(extent), image.shape, min_size).items():
+        path: str = get_negative_path(output_dir, image_path, side)
+        cv2.imwrite(path, image[region])
+        paths.append(path)
+
+    return paths, True
+
+
+def crop_negatives(index: AnnotationIndex, output_dir: str, stats: DatasetStats,
+                   min_size: tuple[int, int] = (128, 128), workers: int | None = None) -> list[str]:
+    """Writes the parts of the images outside of the boxes in parallel, returns paths of the crops.
+
+    Crops of the image are kept while they are newer than the image and its annotation. Images without any crop large
+    enough are read on every build because there is nothing to compare with.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    extents: np.ndarray = index.get_extents()
+    tasks: list[tuple[str, str, tuple[int, ...]]] = [
+        (image_path, xml_path, tuple(extent)) for image_path, xml_path, extent
+        in zip(index.image_paths.tolist(), index.xml_paths.tolist(), extents.tolist()) if extent[0] >= 0
+    ]
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    paths: list[str] = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+        for crop_paths, read in executor.map(partial(_crop, output_dir, min_size), tasks,
+                                             chunksize=max(1, len(tasks) // (workers * 4))):
+            paths.extend(crop_paths)
+            if read:
+                stats.cropped += 1
+            else:
+                stats.skipped += len(crop_paths)
+
+    return paths
+
+
+# pylint: disable=too-many-arguments
+def build_dataset(index: AnnotationIndex, dataset_dir: str, *, crop: bool = True,
+                  min_size: tuple[int, int] = (128, 128), workers: int | None = None) -> DatasetStats:
+    """Creates positives/, negatives/, info.dat and bg.txt in the dataset directory.
+
+    Negatives are the crops of the images around the boxes (CascadeClassifierCards.ipynb) or the whole images
+    (CascadeClassifier.ipynb) when crop is False.
+    """
+    stats: DatasetStats = DatasetStats()
+    positives_dir: str = os.path.join(dataset_dir, POSITIVES_DIR)
+    negatives_dir: str = os.path.join(dataset_dir, NEGATIVES_DIR)
+    image_paths: list[str] = index.image_paths.tolist()
+
+    stats.positives = len(link_images(image_paths, positives_dir, stats))
+    stats.boxes = write_info(index, os.path.join(dataset_dir, 'info.dat'), positives_dir)
+
+    negative_paths: list[str] = crop_negatives(index, negatives_dir, stats, min_size, workers) if crop else \
+        link_images(image_paths, negatives_dir, stats)
+    write_bg(negative_paths, os.path.join(dataset_dir, 'bg.txt'))
+    stats.negatives = len(negative_paths)
+
+    return stats
@@ -0,0 +1,237 @@
+"""Multi-scale detection on large images split into overlapping tiles which are processed by a thread pool.
+
+The scale pyramid is built once with a factor of 2 between the levels. Every level is searched only for the objects
+from one size to twice that size (in the pixels of the level), so the detector never scans windows which are
+searched at the other levels and the tiles of the level need to overlap only by the largest object size of the level.
+cv2 releases the GIL, so the tiles of all the levels are detected in parallel by threads sharing the pyramid. Objects
+which touch the inner edges of the tiles are dropped because the neighbour tile contains them entirely, duplicates at
+the boundaries of the size ranges of the levels are merged by non-maximum suppression.
+
+Run from the repository root: python -m opencv_.cascade_detection <cascade.xml> <image>
+"""
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+
+# detects objects with sizes between min size and max size (width, height) in the tile, returns (objects, 4) int32
+# [x, y, width, height] boxes and (objects,) float32 scores
+TileDetector = Callable[[np.ndarray, tuple[int, int], tuple[int, int]], tuple[np.ndarray, np.ndarray]]
+# scale of the level, [y0, y1, x0, x1] of the tile, the smallest and the largest (width, height) of the objects
+_Task = tuple[int, tuple[int, int, int, int], tuple[int, int], tuple[int, int]]
+
+
+class CascadeTileDetector:
+    """cv2.CascadeClassifier loaded once per thread, the classifier isn't safe to share between the threads.
+    Scores are the numbers of the neighbour detections grouped into the object."""
+    path: str
+    scale_factor: float
+    min_neighbors: int
+    window_size: tuple[int, int]
+    _local: threading.local
+
+    def __init__(self, path: str, scale_factor: float = 1.1, min_neighbors: int = 3):
+        self.path = path
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self._local = threading.local()
+        self.window_size = tuple(self._get_classifier().getOriginalWindowSize())
+
+    def __call__(self, tile: np.ndarray, min_size: tuple[int, int],
+                 max_size: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        boxes, neighbors = self._get_classifier().detectMultiScale2(tile, scaleFactor=self.scale_factor,
+                                                                    minNeighbors=self.min_neighbors,
+                                                                    minSize=min_size, maxSize=max_size)
+
+        return np.asarray(boxes, dtype=np.int32).reshape(-1, 4), np.asarray(neighbors, dtype=np.float32).reshape(-1)
+
+    def _get_classifier(self) -> 'cv2.CascadeClassifier':
+        classifier: 'cv2.CascadeClassifier | None' = getattr(self._local, 'classifier', None)
+        if classifier is None:
+            classifier = cv2.CascadeClassifier()
+            if not classifier.load(self.path):
+                raise OSError(f'Unable to load the cascade: {self.path}')
+            self._local.classifier = classifier
+
+        return classifier
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float = 0.3) -> np.ndarray:
+    """Returns indices of the kept [x, y, width, height] boxes, the best first. A box is dropped when its
+    intersection over union with a kept box with a higher score is greater than the threshold."""
+    order: np.ndarray = np.argsort(-scores, kind='stable')
+    boxes = boxes[order].astype(np.float64)
+    x0, y0 = boxes[:, 0], boxes[:, 1]
+    x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+    areas: np.ndarray = boxes[:, 2] * boxes[:, 3]
+
+    # overlaps of all the pairs at once, only the greedy pass over the rows is sequential
+    widths: np.ndarray = np.clip(np.minimum(x1[:, None], x1) - np.maximum(x0[:, None], x0), 0, None)
+    heights: np.ndarray = np.clip(np.minimum(y1[:, None], y1) - np.maximum(y0[:, None], y0), 0, None)
+    intersections: np.ndarray = widths * heights
+    overlapping: np.ndarray = intersections > iou_threshold * (areas[:, None] + areas - intersections)
+
+    kept: np.ndarray = np.ones(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if kept[i]:
+            kept[i + 1:] &= ~overlapping[i, i + 1:]
+
+    return order[kept]
+
+
+def get_tiles(shape: tuple[int, ...], tile_size: int, overlap: int) -> list[tuple[int, int, int, int]]:
+    """Returns [y0, y1, x0, x1] of the tiles covering the image, neighbour tiles overlap by at least overlap pixels"""
+    tile_size = max(tile_size, 2 * overlap)
+    step: int = tile_size - overlap
+    starts: list[list[int]] = [list(range(0, max(size - tile_size, 0) + step, step)) for size in shape[:2]]
+    for axis_starts, size in zip(starts, shape[:2]):
+        # the last tile is aligned with the edge of the image instead of sticking out
+        axis_starts[-1] = max(min(axis_starts[-1], size - tile_size), 0)
+
+    return [(y, min(y + tile_size, shape[0]), x, min(x + tile_size, shape[1])) for y in starts[0] for x in starts[1]]
+
+
+def _build_octaves(image: np.ndarray, max_scale: int) -> dict[int, np.ndarray]:
+    """Returns the image downscaled by the powers of 2 up to max_scale, every level is made from the previous one"""
+    pyramid: dict[int, np.ndarray] = {1: image}
+    scale: int = 1
+    while scale < max_scale:
+        previous: np.ndarray = pyramid[scale]
+        scale *= 2
+        pyramid[scale] = cv2.resize(previous, (previous.shape[1] // 2, previous.shape[0] // 2),
+                                    interpolation=cv2.INTER_AREA)
+
+    return pyramid
+
+
+class TiledDetector:
+    """Detects objects of the image at full resolution by tiles of the scale pyramid levels.
+
+    detector = TiledDetector(CascadeTileDetector('cascade.xml'), (24, 24))
+    boxes, scores = detector.detect(gray)
+    """
+    detector: TileDetector
+    window_size: tuple[int, int]
+    tile_size: int
+    iou_threshold: float
+    workers: int
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, detector: TileDetector, window_size: tuple[int, int] | None = None, *, tile_size: int = 1024,
+                 iou_threshold: float = 0.3, workers: int | None = None):
+        """window_size (width, height) is the smallest object size of the detector, taken from the cascade by
+        default"""
+        self.detector = detector
+        self.window_size = detector.window_size if window_size is None else window_size
+        self.tile_size = tile_size
+        self.iou_threshold = iou_threshold
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+
+    def get_levels(self, shape: tuple[int, ...], min_size: int | None = None,
+                   max_size: int | None = None) -> list[int]:
+        """Returns scales of the pyramid levels (powers of 2) for the objects of the sizes in pixels of the image"""
+        window: int = min(self.window_size)
+        first: int = 0 if min_size is None else max(int(math.log2(max(min_size, window) / window)), 0)
+        last: int = int(math.log2(min(shape[:2]) / window))
+        if max_size is not None:
+            last = min(last, int(math.log2(max(max_size, window) / window)))
+
+        return [2 ** level for level in range(first, last + 1)]
+
+    def detect(self, image: np.ndarray, min_size: int | None = None,
+               max_size: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Returns [x, y, width, height] int32 boxes of the objects in the image and their scores, the best first"""
+        scales: list[int] = self.get_levels(image.shape, min_size, max_size)
+        pyramid: dict[int, np.ndarray] = _build_octaves(image, max(scales, default=1))
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            results: list[tuple[np.ndarray, np.ndarray]] = list(executor.map(
+                lambda task: self.__detect_tile(pyramid[task[0]], *task),
+                self.__get_tasks(pyramid, scales, min_size, max_size)))
+
+        boxes: np.ndarray = np.concatenate([result[0] for result in results] + [np.empty((0, 4), dtype=np.int32)])
+        scores: np.ndarray = np.concatenate([result[1] for result in results] + [np.empty(0, dtype=np.float32)])
+        kept: np.ndarray = non_max_suppression(boxes, scores, self.iou_threshold)
+
+        return boxes[kept], scores[kept]
+
+    def __get_tasks(self, pyramid: dict[int, np.ndarray], scales: list[int], min_size: int | None,
+                    max_size: int | None) -> list[_Task]:
+        tasks: list[_Task] = []
+        for scale in scales:
+            smallest, largest = self.__get_size_range(scale, pyramid[scale].shape if scale == scales[-1] else None,
+                                                      min_size, max_size)
+            # objects must not touch the inner edges of at least one tile
+            overlap: int = max(largest) + 2
+            tasks.extend((scale, tile, smallest, largest) for tile in get_tiles(pyramid[scale].shape, self.tile_size,
+                                                                                overlap))
+
+        return tasks
+
+    def __get_size_range(self, scale: int, last_shape: tuple[int, ...] | None, min_size: int | None,
+                         max_size: int | None) -> tuple[tuple[int, int], tuple[int, int]]:
+        """Returns the smallest and the largest (width, height) of the objects searched at the level, the last level
+        of the pyramid is searched for the objects of any size"""
+        smallest: tuple[int, int] = self.window_size
+        if min_size is not None:
+            smallest = tuple(max(size, math.ceil(min_size / scale)) for size in self.window_size)
+        largest: tuple[int, int] = tuple(2 * size - 1 for size in self.window_size)
+        if last_shape is not None:
+            largest = last_shape[1], last_shape[0]
+        if max_size is not None:
+            largest = tuple(min(size, max(max_size // scale, window)) for size, window in zip(largest,
+                                                                                                self.window_size))
+
+        return smallest, largest
+
+    # pylint: disable=too-many-arguments
+    def __detect_tile(self, level: np.ndarray, scale: int, tile: tuple[int, int, int, int],
+                      smallest: tuple[int, int], largest: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        y0, y1, x0, x1 = tile
+        boxes, scores = self.detector(level[y0:y1, x0:x1], smallest, largest)
+        # boxes touching the edges of the tile which are inside the level are detected whole by the neighbour tile
+        inner: np.ndarray = np.ones(len(boxes), dtype=bool)
+        if x0 > 0:
+            inner &= boxes[:, 0] > 0
+        if y0 > 0:
+            inner &= boxes[:, 1] > 0
+        if x1 < level.shape[1]:
+            inner &= boxes[:, 0] + boxes[:, 2] < x1 - x0
+        if y1 < level.shape[0]:
+            inner &= boxes[:, 1] + boxes[:, 3] < y1 - y0
+        boxes = (boxes[inner] + np.array([x0, y0, 0, 0], dtype=np.int32)) * scale
+
+        return boxes.astype(np.int32), scores[inner]
+
+
+def _benchmark(cascade_path: str, image_path: str, repeats: int = 3) -> None:
+    image: np.ndarray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    detector: CascadeTileDetector = CascadeTileDetector(cascade_path)
+
+    start: float = time.perf_counter()
+    for _ in range(repeats):
+        full_boxes, _ = detector(image, detector.window_size, image.shape[::-1])
+    full_time: float = (time.perf_counter() - start) / repeats
+
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        tiled: TiledDetector = TiledDetector(detector, workers=workers)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            boxes, _ = tiled.detect(image)
+        tiled_time: float = (time.perf_counter() - start) / repeats
+        print(f'{image.shape[1]}x{image.shape[0]}: detectMultiScale {full_time:.2f}s ({len(full_boxes)} objects), '
+              f'tiled with {workers} threads {tiled_time:.2f}s ({len(boxes)} objects)')
+
+
+if __name__ == '__main__':
+    import sys
+
+    _benchmark(sys.argv[1], sys.argv[2])
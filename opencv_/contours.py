@@ -0,0 +1,187 @@
+"""Batch extraction of the contours of Canny edges for all the images in a directory.
+
+Images are processed by a pool of worker processes, every worker reads the image, detects the contours and writes them
+to the output directory itself, so only paths and counts travel between the processes. Errors of an image are
+recorded with its path and don't stop the others. Contours of the image are
+stored in columnar form in a .npz file next to the relative path of the image:
+    points - (total points, 2) int32 array of all the contours one after another
+    offsets - (contours + 1,) int64 array, points of the contour i are points[offsets[i]:offsets[i + 1]]
+    hierarchy - (contours, 4) int32 array [next, previous, first child, parent] as returned by cv2.findContours
+
+Run from the repository root: python -m opencv_.contours images --mode tree --method simple
+"""
+import os
+import time
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Iterator, Sequence
+
+import numpy as np
+
+from constants import OUTPUT_PATH
+from lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+
+MODES: dict[str, str] = {'external': 'RETR_EXTERNAL', 'list': 'RETR_LIST', 'ccomp': 'RETR_CCOMP', 'tree': 'RETR_TREE'}
+METHODS: dict[str, str] = {'none': 'CHAIN_APPROX_NONE', 'simple': 'CHAIN_APPROX_SIMPLE',
+                           'tc89_l1': 'CHAIN_APPROX_TC89_L1', 'tc89_kcos': 'CHAIN_APPROX_TC89_KCOS'}
+IMAGE_EXTENSIONS: tuple[str, ...] = ('.bmp', '.jpeg', '.jpg', '.png', '.tif', '.tiff', '.webp')
+DEFAULT_OUTPUT_DIR: str = os.path.join(OUTPUT_PATH, 'contours')
+
+
+@dataclass
+class Contours:
+    points: np.ndarray
+    offsets: np.ndarray
+    hierarchy: np.ndarray
+
+    @staticmethod
+    def from_list(contours: Sequence[np.ndarray], hierarchy: np.ndarray | None) -> 'Contours':
+        """Packs the output of cv2.findContours"""
+        lengths: np.ndarray = np.fromiter((len(contour) for contour in contours), dtype=np.int64, count=len(contours))
+        offsets: np.ndarray = np.zeros(len(contours) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        points: np.ndarray = np.concatenate(contours).reshape(-1, 2) if len(contours) > 0 else \
+            np.empty((0, 2), dtype=np.int32)
+
+        return Contours(points.astype(np.int32, copy=False), offsets,
+                        np.empty((0, 4), dtype=np.int32) if hierarchy is None else hierarchy.reshape(-1, 4))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """Returns (points, 1, 2) view of the contour as cv2.drawContours expects"""
+        return self.points[self.offsets[index]:self.offsets[index + 1], np.newaxis]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def save(self, path: str) -> None:
+        np.savez(path, points=self.points, offsets=self.offsets, hierarchy=self.hierarchy)
+
+    @staticmethod
+    def load(path: str) -> 'Contours':
+        with np.load(path) as data:
+            return Contours(data['points'], data['offsets'], data['hierarchy'])
+
+
+def detect_contours(image: np.ndarray, mode: int, method: int,
+                    thresholds: tuple[float, float] = (100, 300)) -> Contours:
+    """Contours of the Canny edges of the image, the same as in Contour_detection.ipynb for the BGR image (True
+    passed there after the thresholds is the edges argument, the L1 gradient norm is used)"""
+    edges: np.ndarray = cv2.Canny(image, thresholds[0], thresholds[1])
+    contours, hierarchy = cv2.findContours(edges, mode, method)
+
+    return Contours.from_list(contours, hierarchy)
+
+
+@dataclass
+class ExtractionStats:
+    images: int = 0
+    contours: int = 0
+    points: int = 0
+    elapsed: float = 0.0  # seconds
+    failed: dict[str, str] = field(default_factory=dict)  # relative path: error
+
+
+def find_images(input_dir: str, extensions: tuple[str, ...] = IMAGE_EXTENSIONS) -> list[str]:
+    """Returns paths of the images relative to the directory in a stable order"""
+    paths: list[str] = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        paths.extend(os.path.relpath(os.path.join(root, name), input_dir) for name in sorted(files)
+                     if name.lower().endswith(extensions))
+
+    return paths
+
+
+def get_output_path(output_dir: str, relative_path: str) -> str:
+    return os.path.join(output_dir, f'{relative_path}.npz')
+
+
+def _init_worker() -> None:
+    # images are processed in parallel by the processes, threads of opencv would only compete with each other
+    cv2.setNumThreads(1)
+
+
+# pylint: disable=too-many-arguments
+def _extract(input_dir: str, output_dir: str, relative_path: str, *, mode: int, method: int,
+             thresholds: tuple[float, float]) -> tuple[int, int] | str:
+    """Returns the numbers of the contours and their points or the error"""
+    try:
+        image: np.ndarray | None = cv2.imread(os.path.join(input_dir, relative_path), cv2.IMREAD_COLOR)
+        if image is None:
+            return 'Unable to read the image'
+        contours: Contours = detect_contours(image, mode, method, thresholds)
+        output_path: str = get_output_path(output_dir, relative_path)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        contours.save(output_path)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        # an exception would end the map of the executor and lose the results of the other images
+        return f'{type(error).__name__}: {error}'
+
+    return len(contours), len(contours.points)
+
+
+# pylint: disable=too-many-arguments
+def extract_directory(input_dir: str, output_dir: str = DEFAULT_OUTPUT_DIR, *, mode: int | None = None,
+                      method: int | None = None, thresholds: tuple[float, float] = (100, 300),
+                      workers: int | None = None) -> ExtractionStats:
+    """Writes contours of every image of the directory tree to the output directory, RETR_TREE and
+    CHAIN_APPROX_SIMPLE are used by default"""
+    mode = cv2.RETR_TREE if mode is None else mode
+    method = cv2.CHAIN_APPROX_SIMPLE if method is None else method
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    paths: list[str] = find_images(input_dir)
+    stats: ExtractionStats = ExtractionStats()
+
+    start: float = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+        extract: partial = partial(_extract, input_dir, output_dir, mode=mode, method=method, thresholds=thresholds)
+        results = executor.map(extract, paths, chunksize=max(1, len(paths) // (workers * 4)))
+        for path, result in zip(paths, results):
+            if isinstance(result, str):
+                stats.failed[path] = result
+                continue
+            stats.images += 1
+            stats.contours += result[0]
+            stats.points += result[1]
+    stats.elapsed = time.perf_counter() - start
+
+    return stats
+
+
+def _parse_args() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(description='Extracts contours of the Canny edges of all the images in '
+                                                        'the directory tree')
+    parser.add_argument('input_dir', help='directory with the images')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR,
+                        help=f'output directory, {DEFAULT_OUTPUT_DIR} by default')
+    parser.add_argument('--mode', choices=MODES, default='tree', help='contour retrieval mode, tree by default')
+    parser.add_argument('--method', choices=METHODS, default='simple',
+                        help='contour approximation method, simple by default')
+    parser.add_argument('--thresholds', type=float, nargs=2, default=(100, 300), metavar=('LOW', 'HIGH'),
+                        help='thresholds of the Canny hysteresis, 100 300 by default')
+    parser.add_argument('--workers', type=int, help='number of the worker processes, number of CPUs by default')
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: Namespace = _parse_args()
+    stats: ExtractionStats = extract_directory(args.input_dir, args.output, mode=getattr(cv2, MODES[args.mode]),
+                                               method=getattr(cv2, METHODS[args.method]),
+                                               thresholds=tuple(args.thresholds), workers=args.workers)
+    print(f'{stats.images} images, {stats.contours} contours, {stats.points} points in {stats.elapsed:.2f}s '
+          f'written to {args.output}')
+    for path, error in stats.failed.items():
+        print(f'{path}: {error}')
+
+
+if __name__ == '__main__':
+    main()
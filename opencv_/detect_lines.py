@@ -0,0 +1,33 @@
+"""Canny edges and probabilistic Hough lines of every frame of the video computed by the parallel pipeline.
+
+Prints frames per second for the growing number of worker processes, run from the repository root:
+python -m opencv_.detect_lines
+"""
+import os
+from os.path import abspath, dirname, join
+
+import cv2
+import numpy as np
+
+from opencv_.pipeline import FrameResult, PipelineStats, process_video
+
+VIDEO_PATH: str = join(dirname(dirname(abspath(__file__))), 'images', 'puppies.avi')
+
+
+def detect_lines(frame: np.ndarray, edges: np.ndarray) -> np.ndarray | None:
+    gray: np.ndarray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    cv2.Canny(gray, 100, 200, edges=edges)
+
+    return cv2.HoughLinesP(edges, 1, np.pi / 180, 50, minLineLength=30, maxLineGap=10)
+
+
+if __name__ == '__main__':
+    lines_count: list[int] = []
+
+    def count_lines(frame_result: FrameResult) -> None:
+        lines_count.append(0 if frame_result.result is None else len(frame_result.result))
+
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        lines_count.clear()
+        stats: PipelineStats = process_video(VIDEO_PATH, detect_lines, count_lines, workers=workers)
+        print(f'{workers} workers: {stats.fps:.1f} fps, {sum(lines_count)} lines in {stats.frames} frames')
@@ -0,0 +1,115 @@
+"""Decoded frames of a video cached in a raw file which is memory-mapped for reading.
+
+The video is decoded once, following reads of any frame are zero-copy views of the mapped file. The header stores the
+size and the modification time of the video, the cache is rebuilt when they change.
+"""
+import hashlib
+import os
+import struct
+from types import TracebackType
+
+import numpy as np
+
+from constants import OUTPUT_PATH
+from opencv_.video import FrameSource
+
+DEFAULT_CACHE_DIR: str = os.path.join(OUTPUT_PATH, 'frame_cache')
+_MAGIC: bytes = b'FRAMES01'
+# magic, source size, source mtime_ns, frame count, height, width, channels, fps
+_HEADER: struct.Struct = struct.Struct('<8sqqqqqqd')
+_HEADER_SIZE: int = 64  # frames start aligned
+
+
+def get_cache_path(video_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    absolute_path: str = os.path.abspath(video_path)
+    digest: str = hashlib.sha1(absolute_path.encode('utf-8')).hexdigest()[:16]
+
+    return os.path.join(cache_dir, f'{os.path.basename(absolute_path)}.{digest}.frames')
+
+
+def _read_header(cache_path: str) -> tuple | None:
+    try:
+        with open(cache_path, 'rb') as file:
+            header: bytes = file.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+    fields: tuple = _HEADER.unpack(header)
+
+    return fields if fields[0] == _MAGIC else None
+
+
+def _is_valid(cache_path: str, video_stat: os.stat_result) -> bool:
+    fields: tuple | None = _read_header(cache_path)
+    if fields is None:
+        return False
+    _, size, mtime_ns, count, height, width, channels, _ = fields
+
+    return (size, mtime_ns) == (video_stat.st_size, video_stat.st_mtime_ns) and \
+        os.path.getsize(cache_path) == _HEADER_SIZE + count * height * width * channels
+
+
+def build_cache(video_path: str, cache_path: str) -> None:
+    """Decodes all the frames of the video to the cache file, the file is replaced atomically"""
+    video_stat: os.stat_result = os.stat(video_path)
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    temporary_path: str = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with open(temporary_path, 'wb') as file, FrameSource(video_path) as source:
+            file.write(bytes(_HEADER_SIZE))
+            count: int = 0
+            for frame in source:
+                file.write(frame.image.data)
+                count += 1
+            height, width, channels = source.frame_shape
+            file.seek(0)
+            file.write(_HEADER.pack(_MAGIC, video_stat.st_size, video_stat.st_mtime_ns, count, height, width,
+                                    channels, source.fps))
+        os.replace(temporary_path, cache_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+class FrameCache:
+    """Frames of the video by index, decoded once and memory-mapped afterwards.
+
+    with FrameCache('images/puppies.avi') as frames:
+        edges = cv2.Canny(frames[10], 100, 200)
+    """
+    fps: float
+    rebuilt: bool
+    frames: np.ndarray  # read-only (count, height, width, channels) array mapped to the cache file
+
+    def __init__(self, video_path: str, cache_dir: str = DEFAULT_CACHE_DIR):
+        cache_path: str = get_cache_path(video_path, cache_dir)
+        self.rebuilt = not _is_valid(cache_path, os.stat(video_path))
+        if self.rebuilt:
+            build_cache(video_path, cache_path)
+
+        _, _, _, count, height, width, channels, self.fps = _read_header(cache_path)
+        self.frames = np.memmap(cache_path, dtype=np.uint8, mode='r', offset=_HEADER_SIZE,
+                                shape=(count, height, width, channels))
+
+    def __enter__(self) -> 'FrameCache':
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None,
+                 exc_val: BaseException | None,
+                 exc_tb: TracebackType | None) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.frames[index]
+
+    @property
+    def frame_shape(self) -> tuple[int, ...]:
+        return self.frames.shape[1:]
+
+    def close(self) -> None:
+        """Drops the mapping, the file is unmapped when the views of its frames are deleted as well"""
+        del self.frames
@@ -0,0 +1,201 @@
+"""Decoded images cached in memory by path, read mode and modification time.
+
+Images are kept in an LRU cache bounded by the bytes of the decoded arrays and are handed out read-only, so one caller
+can't change the image another one gets. Gray images are converted from the cached color decode instead of decoding
+the file again. cv2.cvtColor weighs the channels slightly differently from the codecs which decode to gray directly,
+pixels can differ by a few levels from cv2.imread(path, IMREAD_GRAYSCALE), pass derive_gray=False to get those.
+
+With a cache directory the decoded arrays are also saved as .npy files which are memory-mapped by the next runs, so
+the codec runs once per file version. The .npy file gets the modification time of the image and is decoded again when
+the times differ. Failures to save the .npy files are logged and don't fail the reads.
+
+    image = read_image('images/animal.jpg')
+    gray = read_image('images/animal.jpg', IMREAD_GRAYSCALE)
+
+Run from the repository root to compare with cv2.imread: python -m opencv_.image_cache
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from constants import OUTPUT_PATH
+from lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+
+# values of the cv2 flags, the defaults of the arguments would import cv2
+IMREAD_UNCHANGED: int = -1
+IMREAD_GRAYSCALE: int = 0
+IMREAD_COLOR: int = 1
+
+DEFAULT_CACHE_DIR: str = os.path.join(OUTPUT_PATH, 'image_cache')
+DEFAULT_MAX_BYTES: int = 256 * 1024 * 1024
+
+_logger: logging.Logger = logging.getLogger(__name__)
+
+# absolute path, read mode, mtime_ns
+_Key = tuple[str, int, int]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    decoded: int = 0  # files read by the codec
+    loaded: int = 0  # arrays read from the .npy files
+
+
+def get_cache_path(path: str, mode: int, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    absolute_path: str = os.path.abspath(path)
+    digest: str = hashlib.sha1(f'{absolute_path}:{mode}'.encode('utf-8')).hexdigest()[:16]
+
+    return os.path.join(cache_dir, f'{os.path.basename(absolute_path)}.{digest}.npy')
+
+
+def _read_only(image: np.ndarray) -> np.ndarray:
+    image.flags.writeable = False
+    return image
+
+
+class ImageCache:
+    """LRU cache of the decoded images, safe to share between threads.
+
+    cache = ImageCache(64 * 1024 * 1024, cache_dir='output/image_cache')
+    image = cache.read('images/geometry.png')
+    """
+    max_bytes: int
+    cache_dir: str | None
+    derive_gray: bool
+    stats: CacheStats
+    _images: OrderedDict[_Key, np.ndarray]
+    _bytes: int
+    _lock: threading.RLock
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, cache_dir: str | None = None, derive_gray: bool = True):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.derive_gray = derive_gray
+        self.stats = CacheStats()
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def read(self, path: str, mode: int = IMREAD_COLOR) -> np.ndarray:
+        """Returns the read-only image as cv2.imread(path, mode) decodes it, raises OSError when it can't be read"""
+        absolute_path: str = os.path.abspath(path)
+        key: _Key = (absolute_path, mode, os.stat(absolute_path).st_mtime_ns)
+        with self._lock:
+            image: np.ndarray | None = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.stats.hits += 1
+                return image
+            self.stats.misses += 1
+
+        # files are decoded outside of the lock, cv2 releases the GIL and other images can be read meanwhile
+        image = self.__load(key)
+        with self._lock:
+            self.__put(key, image)
+
+        return image
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+    def __load(self, key: _Key) -> np.ndarray:
+        absolute_path, mode, mtime_ns = key
+        if mode == IMREAD_GRAYSCALE and self.derive_gray:
+            color: np.ndarray = self.read(absolute_path, IMREAD_COLOR)
+            return _read_only(cv2.cvtColor(color, cv2.COLOR_BGR2GRAY))
+
+        cache_path: str | None = None if self.cache_dir is None else get_cache_path(absolute_path, mode, self.cache_dir)
+        if cache_path is not None and os.path.exists(cache_path) and os.stat(cache_path).st_mtime_ns == mtime_ns:
+            with self._lock:
+                self.stats.loaded += 1
+            return np.load(cache_path, mmap_mode='r')
+
+        image: np.ndarray | None = cv2.imread(absolute_path, mode)
+        if image is None:
+            raise OSError(f'Unable to read the image: {absolute_path}')
+        with self._lock:
+            self.stats.decoded += 1
+        if cache_path is not None:
+            try:
+                _save(image, cache_path, mtime_ns)
+            except OSError as error:
+                # a full disk or a read-only cache directory only costs the decoding in the next runs
+                _logger.warning('Unable to save the decoded image %s to %s: %s', absolute_path, cache_path, error)
+
+        return _read_only(image)
+
+    def __put(self, key: _Key, image: np.ndarray) -> None:
+        if key in self._images or image.nbytes > self.max_bytes:
+            return
+        self._images[key] = image
+        self._bytes += image.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._images.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+
+def _save(image: np.ndarray, cache_path: str, mtime_ns: int) -> None:
+    """Writes the .npy file atomically with the modification time of the image"""
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    temporary_path: str = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temporary_path, 'wb') as file:
+            np.save(file, image)
+        os.utime(temporary_path, ns=(mtime_ns, mtime_ns))
+        os.replace(temporary_path, cache_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+# cache shared by read_image
+default_cache: ImageCache = ImageCache()
+
+
+def read_image(path: str, mode: int = IMREAD_COLOR) -> np.ndarray:
+    """cv2.imread with the shared cache, the image is read-only"""
+    return default_cache.read(path, mode)
+
+
+def _benchmark(path: str, repeats: int = 100) -> None:
+    timings: list[str] = []
+    for mode in (IMREAD_COLOR, IMREAD_GRAYSCALE, IMREAD_UNCHANGED):
+        start: float = time.perf_counter()
+        for _ in range(repeats):
+            cv2.imread(path, mode)
+        imread_time: float = (time.perf_counter() - start) / repeats
+
+        cache: ImageCache = ImageCache()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            cache.read(path, mode)
+        cache_time: float = (time.perf_counter() - start) / repeats
+        timings.append(f'mode {mode} imread {imread_time * 1e6:.0f}us, cached {cache_time * 1e6:.0f}us')
+
+    print(f'{os.path.basename(path)}: ' + ', '.join(timings))
+
+
+if __name__ == '__main__':
+    from os.path import abspath, dirname, join
+
+    for name in ('geometry.png', 'animal.jpg'):
+        _benchmark(join(dirname(dirname(abspath(__file__))), 'images', name))
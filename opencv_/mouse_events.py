@@ -13,35 +13,77 @@ IMG_ORIGINAL: np.ndarray = np.zeros((512, 512, 3), np.uint8)
 IMG_TO_SHOW: np.ndarray = IMG_ORIGINAL.copy()
 
 START_POINT: tuple[int, int] | None = None
+# region of IMG_TO_SHOW which differs from IMG_ORIGINAL, only it is restored when the circle moves
+DIRTY_BOX: tuple[slice, slice] | None = None
+# whether IMG_TO_SHOW changed since it was shown last time
+CHANGED: bool = True
+
+
+def get_circle(point_start: tuple[int, int], point_end: tuple[int, int]) -> tuple[tuple[int, int], int]:
+    center: tuple[int, int] = (point_start[0] + point_end[0]) // 2, (point_start[1] + point_end[1]) // 2
+    radius: int = max(abs(point_start[0] - point_end[0]), abs(point_start[1] - point_end[1])) // 2
+
+    return center, radius
+
+
+def get_circle_box(center: tuple[int, int], radius: int, thickness: int, shape: tuple[int, ...]) -> tuple[slice, slice]:
+    """Returns rows and columns of the image covered by the circle"""
+    # outline is drawn on both sides of the circle, 1 pixel more for the anti-aliasing
+    extent: int = radius + max(thickness, 0) // 2 + 1
+
+    return (slice(max(center[1] - extent, 0), min(center[1] + extent + 1, shape[0])),
+            slice(max(center[0] - extent, 0), min(center[0] + extent + 1, shape[1])))
 
 
 def draw(img_to_draw: np.ndarray,
          point_start: tuple[int, int],
          point_end: tuple[int, int],
          color: tuple[int, int, int] = (0, 255, 0),
-         thickness: int = -1) -> None:
-    center: tuple[int, int] = (point_start[0] + point_end[0]) // 2, (point_start[1] + point_end[1]) // 2
-    radius: int = max(abs(point_start[0] - point_end[0]), abs(point_start[1] - point_end[1])) // 2
+         thickness: int = -1) -> tuple[slice, slice]:
+    """Draws the circle inscribed in the square of the points, returns its bounding box"""
+    center, radius = get_circle(point_start, point_end)
     cv2.circle(img_to_draw, center, radius, color, thickness)
 
+    return get_circle_box(center, radius, thickness, img_to_draw.shape)
+
+
+def restore_dirty_box() -> None:
+    # pylint: disable=global-statement
+    global DIRTY_BOX
+    if DIRTY_BOX is not None:
+        IMG_TO_SHOW[DIRTY_BOX] = IMG_ORIGINAL[DIRTY_BOX]
+        DIRTY_BOX = None
+
 
 def draw_circle(event: int, x: int, y: int, flags: int, _) -> None:
     # pylint: disable=global-statement
-    global START_POINT, IMG_TO_SHOW
+    global START_POINT, DIRTY_BOX, CHANGED
     if event == cv2.EVENT_LBUTTONDOWN and flags & cv2.EVENT_FLAG_ALTKEY:
         START_POINT = x, y
     elif event == cv2.EVENT_LBUTTONUP and START_POINT is not None:
+        restore_dirty_box()
         draw(IMG_ORIGINAL, START_POINT, (x, y))
-        IMG_TO_SHOW = IMG_ORIGINAL.copy()
-    elif event == cv2.EVENT_MOUSEMOVE and flags & cv2.EVENT_FLAG_LBUTTON and START_POINT is not None:
-        IMG_TO_SHOW = IMG_ORIGINAL.copy()
         draw(IMG_TO_SHOW, START_POINT, (x, y))
+        CHANGED = True
+    elif event == cv2.EVENT_MOUSEMOVE and flags & cv2.EVENT_FLAG_LBUTTON and START_POINT is not None:
+        # only the pixels of the previous circle are restored instead of copying the whole image
+        restore_dirty_box()
+        DIRTY_BOX = draw(IMG_TO_SHOW, START_POINT, (x, y))
+        CHANGED = True
+
+
+def show_if_changed() -> None:
+    # pylint: disable=global-statement
+    global CHANGED
+    if CHANGED:
+        cv2.imshow('image', IMG_TO_SHOW)
+        CHANGED = False
 
 
 cv2.namedWindow('image')
 cv2.setMouseCallback('image', draw_circle)
 while True:
-    cv2.imshow('image', IMG_TO_SHOW)
+    show_if_changed()
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
 
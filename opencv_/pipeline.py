@@ -0,0 +1,210 @@
+"""Processing of the video frames by several processes with the results emitted in the frame order.
+
+Stages: the main process decodes frames directly into shared memory slots, worker processes run the frame function
+reading the frame from its slot and writing the output image to the paired output slot, the main process reassembles
+the results in the frame order and passes them to the sink. Only frame indices, slot numbers and small results (e.g.
+detected lines) are pickled, images never leave the shared memory.
+"""
+import os
+import queue
+import time
+from dataclasses import dataclass
+from multiprocessing import get_context
+from multiprocessing.context import SpawnProcess
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+
+# function writes the output image of the frame to the output array and returns a small picklable result
+FrameFunction = Callable[[np.ndarray, np.ndarray], Any]
+_WORKER_CHECK_INTERVAL: float = 1.0  # seconds
+
+
+@dataclass
+class FrameResult:
+    index: int
+    # views of the shared memory slots, valid only until the sink returns
+    frame: np.ndarray
+    output: np.ndarray
+    result: Any
+
+
+@dataclass
+class PipelineStats:
+    frames: int
+    workers: int
+    elapsed: float  # seconds
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class _SlotLayout:
+    slots: int
+    frame_shape: tuple[int, ...]
+    output_shape: tuple[int, ...]
+    output_dtype: str
+
+    def get_frames(self, memory: SharedMemory) -> np.ndarray:
+        return np.ndarray((self.slots,) + self.frame_shape, dtype=np.uint8, buffer=memory.buf)
+
+    def get_outputs(self, memory: SharedMemory) -> np.ndarray:
+        return np.ndarray((self.slots,) + self.output_shape, dtype=self.output_dtype, buffer=memory.buf)
+
+
+# pylint: disable=too-many-arguments
+def _worker_main(function: FrameFunction, layout: _SlotLayout, *, frames_name: str, outputs_name: str,
+                 tasks: queue.Queue, results: queue.Queue) -> None:
+    # frames are processed in parallel by the processes, threads of opencv would only compete with each other
+    cv2.setNumThreads(1)
+    frames_memory: SharedMemory = SharedMemory(frames_name)
+    outputs_memory: SharedMemory = SharedMemory(outputs_name)
+    frames: np.ndarray = layout.get_frames(frames_memory)
+    outputs: np.ndarray = layout.get_outputs(outputs_memory)
+    try:
+        while (task := tasks.get()) is not None:
+            index, slot = task
+            try:
+                results.put((index, slot, function(frames[slot], outputs[slot])))
+            # pylint: disable=broad-except
+            except Exception as error:
+                results.put((index, slot, error))
+    finally:
+        del frames, outputs
+        frames_memory.close()
+        outputs_memory.close()
+
+
+def _allocate(size: int) -> SharedMemory:
+    return SharedMemory(create=True, size=max(size, 1))
+
+
+# pylint: disable=too-many-instance-attributes
+class _Pipeline:
+    _capture: 'cv2.VideoCapture'
+    _frames_memory: SharedMemory
+    _outputs_memory: SharedMemory
+    _frames: np.ndarray
+    _outputs: np.ndarray
+    _tasks: queue.Queue
+    _results: queue.Queue
+    _processes: list[SpawnProcess]
+    _free_slots: list[int]
+    _pending: dict[int, tuple[int, Any]]
+    decoded: int
+    emitted: int
+
+    def __init__(self, capture: 'cv2.VideoCapture', layout: _SlotLayout):
+        self._capture = capture
+        self._frames_memory = _allocate(layout.slots * int(np.prod(layout.frame_shape)))
+        self._outputs_memory = _allocate(layout.slots * int(np.prod(layout.output_shape))
+                                         * np.dtype(layout.output_dtype).itemsize)
+        self._frames = layout.get_frames(self._frames_memory)
+        self._outputs = layout.get_outputs(self._outputs_memory)
+        self._free_slots = list(range(layout.slots))
+        self._pending = {}
+        self.decoded = 0
+        self.emitted = 0
+
+    def start(self, function: FrameFunction, layout: _SlotLayout, workers: int) -> None:
+        context = get_context('spawn')
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._processes = [context.Process(target=_worker_main, daemon=True, args=(function, layout),
+                                           kwargs={'frames_name': self._frames_memory.name,
+                                                   'outputs_name': self._outputs_memory.name,
+                                                   'tasks': self._tasks, 'results': self._results})
+                           for _ in range(workers)]
+        for process in self._processes:
+            process.start()
+
+    def decode(self, first: np.ndarray | None) -> bool:
+        """Fills all the free slots with the next frames, returns False at the end of the video"""
+        while len(self._free_slots) > 0:
+            slot: int = self._free_slots.pop()
+            if first is not None:
+                self._frames[slot] = first
+                first = None
+            elif not self._capture.read(self._frames[slot])[0]:
+                self._free_slots.append(slot)
+                return False
+            self._tasks.put((self.decoded, slot))
+            self.decoded += 1
+
+        return True
+
+    def collect(self) -> None:
+        """Waits for the next processed frame"""
+        try:
+            index, slot, result = self._results.get(timeout=_WORKER_CHECK_INTERVAL)
+        except queue.Empty:
+            if not all(process.is_alive() for process in self._processes):
+                raise RuntimeError('Worker process of the video pipeline died') from None
+            return
+        if isinstance(result, Exception):
+            raise RuntimeError(f'Processing of the frame {index} failed') from result
+        self._pending[index] = slot, result
+
+    def emit(self, sink: Callable[[FrameResult], None] | None) -> None:
+        """Passes the processed frames to the sink in the frame order"""
+        while self.emitted in self._pending:
+            slot, result = self._pending.pop(self.emitted)
+            if sink is not None:
+                sink(FrameResult(self.emitted, self._frames[slot], self._outputs[slot], result))
+            self._free_slots.append(slot)
+            self.emitted += 1
+
+    def close(self) -> None:
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        del self._frames, self._outputs
+        for memory in (self._frames_memory, self._outputs_memory):
+            memory.close()
+            memory.unlink()
+
+
+# pylint: disable=too-many-arguments
+def process_video(path: str, function: FrameFunction, sink: Callable[[FrameResult], None] | None = None, *,
+                  workers: int | None = None, output_shape: tuple[int, ...] | None = None,
+                  output_dtype: type = np.uint8, slots_per_worker: int = 2) -> PipelineStats:
+    """Runs the function for every frame of the video in worker processes, the sink gets the results in frame order.
+
+    The function must be picklable (defined at module level), output array has output_shape or the shape of the gray
+    frame by default.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    capture: cv2.VideoCapture = cv2.VideoCapture(path)
+    try:
+        ok, first = capture.read()
+        if not ok:
+            raise OSError(f'Unable to decode the video: {path}')
+        layout: _SlotLayout = _SlotLayout(workers * slots_per_worker, first.shape,
+                                          first.shape[:2] if output_shape is None else output_shape,
+                                          np.dtype(output_dtype).str)
+
+        start: float = time.perf_counter()
+        pipeline: _Pipeline = _Pipeline(capture, layout)
+        try:
+            pipeline.start(function, layout, workers)
+            decoding: bool = pipeline.decode(first)
+            while pipeline.emitted < pipeline.decoded:
+                pipeline.collect()
+                pipeline.emit(sink)
+                decoding = decoding and pipeline.decode(None)
+        finally:
+            pipeline.close()
+    finally:
+        capture.release()
+
+    return PipelineStats(pipeline.decoded, workers, time.perf_counter() - start)
@@ -1,20 +1,28 @@
+import sys
+import time
+from os.path import abspath, dirname, join
+
 import cv2
 import numpy as np
 
-cap = cv2.VideoCapture('../images/puppies.avi')
-while cap.isOpened():
-    ret: bool
-    frame: np.ndarray
-
-    ret, frame = cap.read()
-    if not ret:
-        break
+# the script is run by path from opencv_/, python puts only opencv_/ on the path then
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+from opencv_.video import Backpressure, FrameSource  # pylint: disable=wrong-import-position
 
-    gray: np.ndarray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+# frames are decoded on a background thread, the oldest frames are dropped if display falls behind
+with FrameSource(join(dirname(dirname(abspath(__file__))), 'images', 'puppies.avi'),
+                 backpressure=Backpressure.DROP_OLDEST) as source:
+    # CAP_PROP_FPS is 0 when the container doesn't store it, the frames are shown as they are decoded then
+    frame_time: float = 1 / source.fps if source.fps > 0 else 0
+    gray: np.ndarray = np.empty(source.frame_shape[:2], dtype=np.uint8)
+    next_frame_at: float = time.perf_counter()
+    for frame in source:
+        cv2.cvtColor(frame.image, cv2.COLOR_BGR2GRAY, dst=gray)
 
-    cv2.imshow('frame', gray)
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+        cv2.imshow('frame', gray)
+        # keep the pace of the video instead of showing frames as fast as they are decoded
+        next_frame_at += frame_time
+        if cv2.waitKey(max(1, int((next_frame_at - time.perf_counter()) * 1000))) & 0xFF == ord('q'):
+            break
 
-cap.release()
 cv2.destroyAllWindows()
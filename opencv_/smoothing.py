@@ -0,0 +1,179 @@
+"""Smoothing filters whose cost per pixel doesn't depend on the kernel size.
+
+    box - window sums of the summed-area table, 4 lookups per pixel
+    Gaussian - 3 box passes with the widths matched to sigma or the recursive filter of Young and van Vliet
+
+The median is always cv2.medianBlur, for uint8 it's a histogram filter already and about 30 times faster than sliding
+the column histograms down the image with NumPy.
+
+smooth() picks the implementation or the cv2 function by the kernel size, the thresholds come from the benchmark which
+runs over the kernel sizes from 3 to 101 on animal.jpg: python -m opencv_.smoothing
+"""
+import math
+import time
+from enum import Enum
+from typing import Callable
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+class SmoothingMethod(Enum):
+    BOX = 'box'
+    GAUSSIAN = 'gaussian'
+    MEDIAN = 'median'
+
+
+# the smallest kernel sizes from which the constant time implementations are used, None keeps cv2 for all the sizes:
+# cv2.blur is a running sum, it's constant time and faster than the summed-area table, cv2.GaussianBlur is linear in
+# the kernel size and loses to the box passes
+CONSTANT_TIME_MIN_KSIZE: dict[SmoothingMethod, int | None] = {
+    SmoothingMethod.BOX: None,
+    SmoothingMethod.GAUSSIAN: 65,
+}
+
+
+def _to_image_dtype(result: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    if np.issubdtype(dtype, np.integer):
+        info: np.iinfo = np.iinfo(dtype)
+        return np.clip(np.rint(result), info.min, info.max).astype(dtype)
+
+    return result.astype(dtype, copy=False)
+
+
+def _box_sums(image: np.ndarray, ksize: tuple[int, int]) -> np.ndarray:
+    """Returns float64 sums of the windows of the (width, height) size anchored at the center as cv2.blur does"""
+    width, height = ksize
+    padded: np.ndarray = cv2.copyMakeBorder(image, height // 2, height - 1 - height // 2, width // 2,
+                                            width - 1 - width // 2, cv2.BORDER_REFLECT_101)
+    table: np.ndarray = cv2.integral(padded, sdepth=cv2.CV_64F)
+    if table.ndim == 2 and image.ndim == 3:
+        table = table[..., np.newaxis]
+
+    return table[height:, width:] - table[:-height, width:] - table[height:, :-width] + table[:-height, :-width]
+
+
+def box_blur(image: np.ndarray, ksize: tuple[int, int]) -> np.ndarray:
+    """The same as cv2.blur with the default border up to rounding, the cost doesn't depend on the kernel size"""
+    return _to_image_dtype(_box_sums(image, ksize) / (ksize[0] * ksize[1]), image.dtype)
+
+
+def get_box_sizes(sigma: float, passes: int = 3) -> list[int]:
+    """Returns odd widths of the boxes whose consecutive passes have the variance of the Gaussian with the sigma"""
+    ideal: float = math.sqrt(12 * sigma ** 2 / passes + 1)
+    lower: int = int(ideal) - (1 - int(ideal) % 2)
+    # number of the passes of the narrower box, the rest use the box wider by 2 pixels
+    count: int = round((12 * sigma ** 2 - passes * lower ** 2 - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+
+    return [lower if i < count else lower + 2 for i in range(passes)]
+
+
+def gaussian_blur_boxes(image: np.ndarray, sigma: float, passes: int = 3) -> np.ndarray:
+    """Approximates the Gaussian by the passes of the box blur"""
+    result: np.ndarray = image.astype(np.float32)
+    for size in get_box_sizes(sigma, passes):
+        result = (_box_sums(result, (size, size)) / (size * size)).astype(np.float32)
+
+    return _to_image_dtype(result, image.dtype)
+
+
+def _get_recursive_coefficients(sigma: float) -> tuple[np.ndarray, np.ndarray]:
+    """Returns numerator and denominator of the third order recursive Gaussian of Young and van Vliet (1995)"""
+    q: float = 0.98711 * sigma - 0.96330 if sigma >= 2.5 else 3.97156 - 4.14554 * math.sqrt(1 - 0.26891 * sigma)
+    b0: float = 1.57825 + 2.44413 * q + 1.4281 * q ** 2 + 0.422205 * q ** 3
+    b1: float = 2.44413 * q + 2.85619 * q ** 2 + 1.26661 * q ** 3
+    b2: float = -(1.4281 * q ** 2 + 1.26661 * q ** 3)
+    b3: float = 0.422205 * q ** 3
+
+    return np.array([1 - (b1 + b2 + b3) / b0]), np.array([1, -b1 / b0, -b2 / b0, -b3 / b0])
+
+
+def _filter_pass(lines: np.ndarray, gain: float, feedback: np.ndarray, order: range) -> np.ndarray:
+    """One pass of the recursive filter over the lines of the first axis in the order, all the other axes are
+    filtered at once. The filter starts in the steady state of the first line, i.e. the edge is extended with it."""
+    output: np.ndarray = np.empty_like(lines)
+    history: list[np.ndarray] = [lines[order[0]]] * len(feedback)
+    for i in order:
+        line: np.ndarray = np.multiply(lines[i], gain, out=output[i])
+        for coefficient, previous in zip(feedback, history):
+            line -= coefficient * previous
+        history = [line] + history[:-1]
+
+    return output
+
+
+def _filter_both_ways(signal: np.ndarray, numerator: np.ndarray, denominator: np.ndarray, axis: int) -> np.ndarray:
+    """Causal and anti-causal passes of the recursive filter, the edges are extended with their values"""
+    lines: np.ndarray = np.moveaxis(signal, axis, 0)
+    forward: np.ndarray = _filter_pass(lines, numerator[0], denominator[1:], range(len(lines)))
+    backward: np.ndarray = _filter_pass(forward, numerator[0], denominator[1:], range(len(lines) - 1, -1, -1))
+
+    return np.moveaxis(backward, 0, axis)
+
+
+def gaussian_blur_recursive(image: np.ndarray, sigma: float) -> np.ndarray:
+    """Approximates the Gaussian by the recursive filter, it costs the same for any sigma"""
+    numerator, denominator = _get_recursive_coefficients(sigma)
+    result: np.ndarray = image.astype(np.float64)
+    for axis in (0, 1):
+        result = _filter_both_ways(result, numerator, denominator, axis)
+
+    return _to_image_dtype(result, image.dtype)
+
+
+def get_gaussian_sigma(ksize: int) -> float:
+    """Sigma which cv2.GaussianBlur uses when it's 0"""
+    return 0.3 * ((ksize - 1) * 0.5 - 1) + 0.8
+
+
+def smooth(image: np.ndarray, method: SmoothingMethod, ksize: int, sigma: float = 0) -> np.ndarray:
+    """Smooths the image with the square kernel by the faster of cv2 and the constant time implementation"""
+    if method == SmoothingMethod.MEDIAN:
+        return cv2.medianBlur(image, ksize)
+    threshold: int | None = CONSTANT_TIME_MIN_KSIZE[method]
+    constant_time: bool = threshold is not None and ksize >= threshold
+    if method == SmoothingMethod.BOX:
+        return box_blur(image, (ksize, ksize)) if constant_time else cv2.blur(image, (ksize, ksize))
+    if constant_time:
+        return gaussian_blur_boxes(image, sigma if sigma > 0 else get_gaussian_sigma(ksize))
+
+    return cv2.GaussianBlur(image, (ksize, ksize), sigma)
+
+
+def _measure(function: Callable[[], np.ndarray], repeats: int = 3) -> tuple[float, np.ndarray]:
+    start: float = time.perf_counter()
+    for _ in range(repeats):
+        result: np.ndarray = function()
+
+    return (time.perf_counter() - start) / repeats * 1000, result
+
+
+def _benchmark(image: np.ndarray, ksize: int) -> None:
+    sigma: float = get_gaussian_sigma(ksize)
+    timings: dict[str, tuple[float, np.ndarray]] = {
+        'blur': _measure(lambda: cv2.blur(image, (ksize, ksize))),
+        'box': _measure(lambda: box_blur(image, (ksize, ksize))),
+        'GaussianBlur': _measure(lambda: cv2.GaussianBlur(image, (ksize, ksize), sigma)),
+        'boxes': _measure(lambda: gaussian_blur_boxes(image, sigma)),
+        'recursive': _measure(lambda: gaussian_blur_recursive(image, sigma)),
+    }
+    references: dict[str, str] = {'box': 'blur', 'boxes': 'GaussianBlur', 'recursive': 'GaussianBlur'}
+    cells: list[str] = []
+    for name, (milliseconds, result) in timings.items():
+        cell: str = f'{name} {milliseconds:.1f}ms'
+        if name in references:
+            error: float = np.abs(result.astype(np.float64) - timings[references[name]][1]).mean()
+            cell += f' (error {error:.2f})'
+        cells.append(cell)
+    print(f'ksize {ksize}: ' + ', '.join(cells))
+
+
+if __name__ == '__main__':
+    from os.path import abspath, dirname, join
+
+    animal: np.ndarray = cv2.imread(join(dirname(dirname(abspath(__file__))), 'images', 'animal.jpg'))
+    for kernel_size in range(3, 102, 14):
+        _benchmark(animal, kernel_size)
@@ -0,0 +1,293 @@
+"""Coarse-to-fine template matching on Gaussian pyramids.
+
+cv2.matchTemplate compares the template with every position of the image, what costs O(image * template). Here the
+exhaustive search runs only at the coarsest level of the pyramids, where both the image and the template are
+2 ** (levels - 1) times smaller in every dimension, and the best candidates are refined at every finer level within
+small windows around their upscaled positions.
+
+When many templates are searched in the same scene, SceneMatcher computes the spectrum and the integral images of the
+scene once and correlates the templates with it in the frequency domain.
+
+Run from the repository root to compare with the full search: python -m opencv_.template_matching
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+scipy_fft = lazy_import('scipy.fft')
+
+# value of cv2.TM_CCOEFF_NORMED, the default of the method arguments would import cv2
+TM_CCOEFF_NORMED: int = 5
+
+
+@dataclass
+class Match:
+    location: tuple[int, int]  # (x, y) of the top left corner as returned by cv2.minMaxLoc
+    score: float
+
+
+def build_pyramid(image: np.ndarray, levels: int) -> list[np.ndarray]:
+    pyramid: list[np.ndarray] = [image]
+    for _ in range(levels - 1):
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+
+    return pyramid
+
+
+def _is_min_method(method: int) -> bool:
+    return method in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED)
+
+
+def find_peaks(result: np.ndarray, count: int, suppression: tuple[int, int], minimize: bool) -> list[Match]:
+    """Returns the best positions of the matchTemplate result which are at least suppression (x, y) apart"""
+    scores: np.ndarray = -result if minimize else result.copy()
+    peaks: list[Match] = []
+    for _ in range(count):
+        _, max_value, _, (x, y) = cv2.minMaxLoc(scores)
+        if not np.isfinite(max_value):
+            break
+        peaks.append(Match((x, y), -max_value if minimize else max_value))
+        scores[max(y - suppression[1], 0):y + suppression[1] + 1, max(x - suppression[0], 0):x + suppression[0] + 1] \
+            = -np.inf
+
+    return peaks
+
+
+class PyramidMatcher:
+    """Finds the template in the images, pyramid of the template is built once.
+
+    Results are equal to the full search with cv2.matchTemplate within 1 pixel as long as the template is distinctive
+    at the coarsest level. top_k best coarse matches are refined to recover from the ambiguous ones, the worse half of
+    the candidates is dropped at every finer level because refinement at the finest levels costs the most.
+    """
+    method: int
+    top_k: int
+    window: int
+    _templates: list[np.ndarray]
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, template: np.ndarray, *, levels: int | None = None, method: int = TM_CCOEFF_NORMED,
+                 top_k: int = 5, window: int = 2, min_template_size: int = 12):
+        """Number of levels is chosen to keep the coarsest template not smaller than min_template_size by default,
+        window is the distance in pixels from the upscaled position which is searched at the finer levels"""
+        if levels is None:
+            levels = 1
+            while min(template.shape[:2]) >> levels >= min_template_size:
+                levels += 1
+        self.method = method
+        self.top_k = top_k
+        self.window = window
+        self._templates = build_pyramid(template, levels)
+
+    @property
+    def levels(self) -> int:
+        return len(self._templates)
+
+    def match(self, image: np.ndarray) -> Match:
+        images: list[np.ndarray] = build_pyramid(image, self.levels)
+        minimize: bool = _is_min_method(self.method)
+
+        coarse_template: np.ndarray = self._templates[-1]
+        result: np.ndarray = cv2.matchTemplate(images[-1], coarse_template, self.method)
+        candidates: list[Match] = find_peaks(result, self.top_k,
+                                             (coarse_template.shape[1] // 2, coarse_template.shape[0] // 2), minimize)
+
+        for level in range(self.levels - 2, -1, -1):
+            refined: dict[tuple[int, int], Match] = {}
+            for candidate in candidates:
+                match: Match = self._refine(images[level], self._templates[level], candidate.location, minimize)
+                refined[match.location] = match
+            candidates = sorted(refined.values(), key=lambda match: match.score, reverse=not minimize)
+            candidates = candidates[:max(1, len(candidates) // 2)]
+
+        return candidates[0]
+
+    def _refine(self, image: np.ndarray, template: np.ndarray, coarse_location: tuple[int, int],
+                minimize: bool) -> Match:
+        """Searches the window around the upscaled position of the match at the coarser level"""
+        # (x, y) ranges of the window clipped to the positions where the template fits into the image
+        limits: tuple[int, int] = image.shape[1] - template.shape[1], image.shape[0] - template.shape[0]
+        starts: list[int] = [min(max(coarse_location[i] * 2 - self.window, 0), limits[i]) for i in (0, 1)]
+        ends: list[int] = [min(coarse_location[i] * 2 + self.window, limits[i]) + 1 for i in (0, 1)]
+
+        result: np.ndarray = cv2.matchTemplate(image[starts[1]:ends[1] + template.shape[0] - 1,
+                                                     starts[0]:ends[0] + template.shape[1] - 1], template, self.method)
+        min_value, max_value, min_location, max_location = cv2.minMaxLoc(result)
+        location: tuple[int, int] = min_location if minimize else max_location
+
+        return Match((starts[0] + location[0], starts[1] + location[1]), min_value if minimize else max_value)
+
+
+# pylint: disable=too-many-instance-attributes
+class SceneMatcher:
+    """Matches many templates against the same scene, spectrum and integral images of the scene are computed once.
+
+    Correlation of every template is a product of the cached scene spectrum with the template spectrum, sums of the
+    scene patches required by the normalized methods are read from the integral images, so every template costs one
+    FFT of its own and one inverse FFT. Templates of the batch are transformed together in chunks whose spectra take
+    about max_chunk_bytes. Scenes smaller than min_fft_pixels are matched by cv2.matchTemplate, the FFTs don't pay off
+    there, the templates are converted to the type of the scene then.
+    Supports TM_CCOEFF_NORMED, TM_CCORR_NORMED and TM_SQDIFF, scores are equal to cv2.matchTemplate up to rounding.
+    """
+    method: int
+    max_chunk_bytes: int
+    _shape: tuple[int, int]
+    _scene: np.ndarray | None  # uint8 or float32 scene matched by cv2.matchTemplate, None on the FFT path
+    _fft_shape: tuple[int, int]
+    _spectrum: np.ndarray  # (channels, fft height, fft width // 2 + 1)
+    _sums: np.ndarray  # (channels, height + 1, width + 1) integral image
+    _squared_sums: np.ndarray
+
+    def __init__(self, scene: np.ndarray, method: int = TM_CCOEFF_NORMED, *, min_fft_pixels: int = 128 * 128,
+                 max_chunk_bytes: int = 256 * 1024 * 1024):
+        if method not in (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF):
+            raise ValueError(f'Unsupported method: {method}')
+        self.method = method
+        self.max_chunk_bytes = max_chunk_bytes
+        self._shape = scene.shape[:2]
+        self._scene = None
+        if self._shape[0] * self._shape[1] < min_fft_pixels:
+            self._scene = scene if scene.dtype in (np.uint8, np.float32) else scene.astype(np.float32)
+            return
+
+        channels: np.ndarray = _to_channels(scene)
+        # valid positions of the template never wrap around, so the scene size is enough for the circular correlation
+        self._fft_shape = cv2.getOptimalDFTSize(self._shape[0]), cv2.getOptimalDFTSize(self._shape[1])
+        self._spectrum = scipy_fft.rfft2(channels, self._fft_shape)
+        self._sums = np.stack([cv2.integral(channel) for channel in channels])
+        self._squared_sums = np.stack([cv2.integral(channel ** 2) for channel in channels])
+
+    def match(self, templates: list[np.ndarray], top_k: int = 1) -> list[list[Match]]:
+        """Returns top_k best matches of every template, the best first"""
+        matches: list[tuple[int, list[Match]]] = []
+        for shape, indices in _group_by_shape(templates).items():
+            results: np.ndarray = self.get_results([templates[i] for i in indices])
+            for i, result in zip(indices, results):
+                matches.append((i, find_peaks(result, top_k, (shape[1] // 2, shape[0] // 2),
+                                              self.method == cv2.TM_SQDIFF)))
+
+        return [template_matches for _, template_matches in sorted(matches, key=lambda item: item[0])]
+
+    def get_results(self, templates: list[np.ndarray]) -> np.ndarray:
+        """Returns (templates, height - template height + 1, width - template width + 1) float64 scores of the
+        templates which have the same shape as cv2.matchTemplate does"""
+        if self._scene is not None:
+            scene: np.ndarray = self._scene
+            return np.stack([cv2.matchTemplate(scene, template.astype(scene.dtype, copy=False), self.method)
+                             for template in templates]).astype(np.float64)
+
+        height, width = templates[0].shape[:2]
+        patch_squared_sums: np.ndarray = _get_window_sums(self._squared_sums, height, width).sum(axis=0)
+        if self.method == cv2.TM_CCOEFF_NORMED:
+            patch_sums: np.ndarray = _get_window_sums(self._sums, height, width)
+            patch_squared_sums = patch_squared_sums - (patch_sums ** 2).sum(axis=0) / (height * width)
+
+        results: np.ndarray = np.empty((len(templates),) + patch_squared_sums.shape)
+        # the spectra of the chunk and their products with the scene spectrum are the largest arrays
+        chunk_size: int = max(1, self.max_chunk_bytes // (2 * self._spectrum.nbytes))
+        for start in range(0, len(templates), chunk_size):
+            results[start:start + chunk_size] = self._correlate(templates[start:start + chunk_size], patch_squared_sums)
+
+        return results
+
+    def _correlate(self, templates: list[np.ndarray], patch_squared_sums: np.ndarray) -> np.ndarray:
+        """Scores of the chunk of the templates, patch_squared_sums are the (centered for TM_CCOEFF_NORMED) sums of
+        the squares of the scene patches"""
+        channels: np.ndarray = np.stack([_to_channels(template) for template in templates])
+        height, width = channels.shape[2:]
+        if self.method == cv2.TM_CCOEFF_NORMED:
+            # correlation with the zero mean template doesn't depend on the mean of the scene patch
+            channels = channels - channels.mean(axis=(2, 3), keepdims=True)
+
+        # correlation is the convolution with the template rotated by 180 degrees
+        spectra: np.ndarray = scipy_fft.rfft2(channels[..., ::-1, ::-1], self._fft_shape)
+        correlations: np.ndarray = scipy_fft.irfft2((spectra * self._spectrum).sum(axis=1), self._fft_shape)
+        correlations = correlations[:, height - 1:self._shape[0], width - 1:self._shape[1]]
+
+        squared_norms: np.ndarray = (channels ** 2).sum(axis=(1, 2, 3))[:, np.newaxis, np.newaxis]
+        if self.method == cv2.TM_SQDIFF:
+            return patch_squared_sums - 2 * correlations + squared_norms
+        denominators: np.ndarray = np.sqrt(np.maximum(patch_squared_sums, 0) * squared_norms)
+
+        return np.divide(correlations, denominators, out=np.zeros_like(correlations), where=denominators > 1e-6)
+
+
+def _to_channels(image: np.ndarray) -> np.ndarray:
+    """Returns (channels, height, width) float64 array"""
+    return image.astype(np.float64)[np.newaxis] if image.ndim == 2 else np.moveaxis(image, -1, 0).astype(np.float64)
+
+
+def _group_by_shape(templates: list[np.ndarray]) -> dict[tuple[int, ...], list[int]]:
+    groups: dict[tuple[int, ...], list[int]] = {}
+    for i, template in enumerate(templates):
+        groups.setdefault(template.shape, []).append(i)
+
+    return groups
+
+
+def _get_window_sums(integral: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Returns sums of all the height x width windows of every channel of the integral image"""
+    return integral[:, height:, width:] - integral[:, :-height, width:] - integral[:, height:, :-width] \
+        + integral[:, :-height, :-width]
+
+
+def _benchmark(image: np.ndarray, template: np.ndarray, method: int, repeats: int = 5) -> None:
+    start: float = time.perf_counter()
+    for _ in range(repeats):
+        result: np.ndarray = cv2.matchTemplate(image, template, method)
+        _, _, min_location, max_location = cv2.minMaxLoc(result)
+    full_time: float = (time.perf_counter() - start) / repeats
+    expected: tuple[int, int] = min_location if _is_min_method(method) else max_location
+
+    matcher: PyramidMatcher = PyramidMatcher(template, method=method)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        match: Match = matcher.match(image)
+    pyramid_time: float = (time.perf_counter() - start) / repeats
+
+    error: int = max(abs(match.location[0] - expected[0]), abs(match.location[1] - expected[1]))
+    print(f'image {image.shape[1]}x{image.shape[0]}, template {template.shape[1]}x{template.shape[0]}, '
+          f'{matcher.levels} levels: full {full_time * 1000:.1f}ms, pyramid {pyramid_time * 1000:.1f}ms '
+          f'(x{full_time / pyramid_time:.1f}), error {error}px')
+
+
+def _benchmark_batch(scene: np.ndarray, templates: list[np.ndarray], method: int) -> None:
+    start: float = time.perf_counter()
+    expected: list[tuple[int, int]] = []
+    for template in templates:
+        _, _, min_location, max_location = cv2.minMaxLoc(cv2.matchTemplate(scene, template, method))
+        expected.append(min_location if _is_min_method(method) else max_location)
+    loop_time: float = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches: list[list[Match]] = SceneMatcher(scene, method).match(templates)
+    batch_time: float = time.perf_counter() - start
+
+    mismatches: int = sum(match[0].location != location for match, location in zip(matches, expected))
+    print(f'scene {scene.shape[1]}x{scene.shape[0]}, {len(templates)} templates: '
+          f'matchTemplate loop {loop_time * 1000:.1f}ms, batch {batch_time * 1000:.1f}ms '
+          f'(x{loop_time / batch_time:.1f}), {mismatches} mismatches')
+
+
+if __name__ == '__main__':
+    from os.path import abspath, dirname, join
+
+    animal: np.ndarray = cv2.imread(join(dirname(dirname(abspath(__file__))), 'images', 'animal.jpg'))
+    for scale in (1, 2, 4, 8):
+        resized: np.ndarray = cv2.resize(animal, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        # the same part of the image as in Template_matching.ipynb
+        _benchmark(resized, resized[12 * scale:, 30 * scale:232 * scale], cv2.TM_CCOEFF_NORMED)
+        _benchmark(resized, resized[40 * scale:100 * scale, 60 * scale:120 * scale], cv2.TM_CCOEFF_NORMED)
+
+    # import of scipy.fft takes about 0.25s, it's paid once and not by the first batch
+    scipy_fft.rfft2(np.zeros((2, 2)))
+    for scale in (1, 2, 4):
+        resized = cv2.resize(animal, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        size: int = 40 * scale
+        patches: list[np.ndarray] = [resized[y:y + size, x:x + size] for y in range(0, resized.shape[0] - size, size)
+                                     for x in range(0, resized.shape[1] - size, size)]
+        _benchmark_batch(resized, patches, cv2.TM_CCOEFF_NORMED)
@@ -0,0 +1,45 @@
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.adaptive_threshold import adaptive_thresholds, get_gaussian_means, get_local_means
+
+_image: np.ndarray = cv2.imread(join(dirname(dirname(abspath(__file__))), 'images', 'animal.jpg'),
+                                cv2.IMREAD_GRAYSCALE)
+_parameters: list[tuple[int, float]] = [(11, 1), (15, 2), (3, 0), (11, -2.5), (41, 0.5), (15, 7)]
+
+
+class TestAdaptiveThresholds(TestCase):
+    def test_mean(self) -> None:
+        maps: np.ndarray = adaptive_thresholds(_image, _parameters)
+
+        self.assertEqual(maps.shape, (len(_parameters),) + _image.shape)
+        for result, (block_size, c) in zip(maps, _parameters):
+            np.testing.assert_array_equal(result, cv2.adaptiveThreshold(
+                _image, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, block_size, c))
+
+    def test_gaussian_inverted(self) -> None:
+        maps: np.ndarray = adaptive_thresholds(_image, _parameters, method=cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                               threshold_type=cv2.THRESH_BINARY_INV, max_value=100)
+
+        for result, (block_size, c) in zip(maps, _parameters):
+            np.testing.assert_array_equal(result, cv2.adaptiveThreshold(
+                _image, 100, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, block_size, c))
+
+    def test_means(self) -> None:
+        for block_size, mean, gaussian in zip([3, 25], get_local_means(_image, [3, 25]),
+                                              get_gaussian_means(_image, [3, 25])):
+            np.testing.assert_array_equal(mean, cv2.blur(_image, (block_size, block_size),
+                                                         borderType=cv2.BORDER_REPLICATE))
+            expected: np.ndarray = cv2.GaussianBlur(_image, (block_size, block_size), 0,
+                                                    borderType=cv2.BORDER_REPLICATE)
+            # float32 blur of cv2.adaptiveThreshold differs by the rounding from the fixed point blur of uint8
+            self.assertLessEqual(np.abs(gaussian.astype(int) - expected).max(), 1)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            adaptive_thresholds(_image, [(4, 0)])
+        with self.assertRaises(ValueError):
+            adaptive_thresholds(_image, [(5, 0)], threshold_type=cv2.THRESH_TRUNC)
@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.annotations import (AnnotationIndex, build_index, get_negative_regions, get_prima_image_path,
+                                 load_index, parse_annotation, write_bg, write_info)
+
+PRIMA_XML: str = '''<?xml version="1.0" encoding="UTF-8"?>
+<PcGts xmlns="http://schema.primaresearch.org/PAGE/gts/pagecontent/2010-03-19"
+       xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+       xsi:schemaLocation="http://schema.primaresearch.org/PAGE/gts/pagecontent/2010-03-19 pagecontent.xsd">
+  <Page imageWidth="400" imageHeight="300">
+    <TextRegion id="r1">
+      <Coords><Point x="10" y="20"/><Point x="50" y="20"/><Point x="50" y="60"/><Point x="10" y="60"/></Coords>
+    </TextRegion>
+    <ImageRegion id="i1">
+      <Coords><Point x="0" y="0"/><Point x="399" y="0"/><Point x="399" y="299"/><Point x="0" y="299"/></Coords>
+    </ImageRegion>
+    <TextRegion id="r2">
+      <Coords><Point x="5" y="5"/><Point x="6" y="6"/></Coords>
+    </TextRegion>
+    <TextRegion id="r3">
+      <Coords points="100,90 180,80 190,150 95,160 120,120"/>
+    </TextRegion>
+  </Page>
+</PcGts>
+'''
+
+VOC_XML: str = '''<annotation>
+  <filename>{name}.jpg</filename>
+  <size><width>400</width><height>300</height><depth>3</depth></size>
+  <object>
+    <name>card</name>
+    <bndbox><xmin>150</xmin><ymin>140</ymin><xmax>200</xmax><ymax>180</ymax></bndbox>
+    <part><name>corner</name><bndbox><xmin>150</xmin><ymin>140</ymin><xmax>160</xmax><ymax>150</ymax></bndbox></part>
+  </object>
+  <object>
+    <name>card</name>
+    <bndbox><xmin>210.0</xmin><ymin>145</ymin><xmax>260</xmax><ymax>190</ymax></bndbox>
+  </object>
+</annotation>
+'''
+
+
+class TestAnnotations(TestCase):
+    _dir: str
+
+    def setUp(self) -> None:
+        self._dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self._dir)
+
+    def _write(self, name: str, text: str) -> str:
+        path: str = join(self._dir, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+        return path
+
+    def _write_voc(self, name: str) -> str:
+        cv2.imwrite(join(self._dir, f'{name}.jpg'), np.full((300, 400, 3), 128, dtype=np.uint8))
+
+        return self._write(f'{name}.xml', VOC_XML.format(name=name))
+
+    def test_parse_prima(self) -> None:
+        boxes: np.ndarray = parse_annotation(self._write('pc-00000001.xml', PRIMA_XML))
+
+        np.testing.assert_array_equal(boxes, [[10, 20, 50, 60], [95, 80, 190, 160]])
+        self.assertEqual(boxes.dtype, np.int32)
+
+    def test_parse_voc(self) -> None:
+        np.testing.assert_array_equal(parse_annotation(self._write_voc('card')),
+                                      [[150, 140, 200, 180], [210, 145, 260, 190]])
+
+    def test_unknown_format(self) -> None:
+        with self.assertRaises(ValueError):
+            parse_annotation(self._write('unknown.xml', '<root/>'))
+
+    def test_index(self) -> None:
+        xml_paths: list[str] = [self._write_voc('a'), self._write('empty.xml', '<annotation/>'), self._write_voc('b')]
+        index: AnnotationIndex = build_index(xml_paths, [path.replace('.xml', '.jpg') for path in xml_paths])
+
+        self.assertEqual(len(index), 3)
+        np.testing.assert_array_equal(index.offsets, [0, 2, 2, 4])
+        np.testing.assert_array_equal(index.get_boxes(2), [[150, 140, 200, 180], [210, 145, 260, 190]])
+        np.testing.assert_array_equal(index.get_extents(), [[150, 140, 260, 190], [-1, -1, -1, -1],
+                                                            [150, 140, 260, 190]])
+        self.assertEqual(index.get_max_box_size(), (50, 45))
+
+    def test_cache(self) -> None:
+        xml_paths: list[str] = [self._write_voc('a')]
+        image_paths: list[str] = [join(self._dir, 'a.jpg')]
+        cache_path: str = join(self._dir, 'cache', 'index.npz')
+        index: AnnotationIndex = load_index(xml_paths, image_paths, cache_path)
+        cached: AnnotationIndex = load_index(xml_paths, image_paths, cache_path)
+
+        np.testing.assert_array_equal(cached.boxes, index.boxes)
+        self.assertEqual(cached.xml_paths.tolist(), xml_paths)
+
+        self._write('a.xml', '<annotation/>')
+        os.utime(xml_paths[0], ns=(0, int(index.mtimes[0]) + 10 ** 9))
+        self.assertEqual(len(load_index(xml_paths, image_paths, cache_path).boxes), 0)
+
+    def test_info_and_bg(self) -> None:
+        prima_path: str = self._write('pc-00000001.xml', PRIMA_XML)
+        image_path: str = get_prima_image_path(prima_path, join(self._dir, 'Images'))
+        index: AnnotationIndex = build_index([prima_path], [image_path])
+
+        self.assertEqual(write_info(index, join(self._dir, 'info.dat'), join(self._dir, 'positives')), 2)
+        write_bg([join(self._dir, 'negatives', 'a_left.jpg')], join(self._dir, 'bg.txt'))
+
+        with open(join(self._dir, 'info.dat'), encoding='utf-8') as file:
+            self.assertEqual(file.read(), f'{join(".", "positives", "00000001.tif")} 2 10 20 40 40  95 80 95 80\n')
+        with open(join(self._dir, 'bg.txt'), encoding='utf-8') as file:
+            self.assertEqual(file.read(), f'{join(".", "negatives", "a_left.jpg")}\n')
+
+    def test_negative_regions(self) -> None:
+        self.assertEqual(set(get_negative_regions(np.array([150, 140, 260, 190]), (300, 400, 3))),
+                         {'left', 'top', 'right'})
+        self.assertEqual(get_negative_regions(np.array([-1, -1, -1, -1]), (300, 400, 3)), {})
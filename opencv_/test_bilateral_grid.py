@@ -0,0 +1,70 @@
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.bilateral_grid import FilterError, bilateral_grid, compare_with_exact, get_effective_sigma_space, get_error
+
+# cv2.bilateralFilter with the large diameters is slow on the whole image
+_image: np.ndarray = cv2.imread(join(dirname(dirname(abspath(__file__))), 'images', 'animal.jpg'))[60:156, 100:228]
+
+
+class TestBilateralGrid(TestCase):
+    def test_close_to_exact(self) -> None:
+        gray: np.ndarray = cv2.cvtColor(_image, cv2.COLOR_BGR2GRAY)
+        for image, arguments in ((_image, (50, 100, 75)), (_image, (20, 50, 10)), (gray, (30, 30, 15))):
+            with self.subTest(channels=image.ndim, arguments=arguments):
+                error: FilterError = compare_with_exact(image, *arguments)
+
+                self.assertGreater(error.psnr, 35)
+                self.assertLess(error.mean_absolute, 2.5)
+
+    def test_small_sigma_color(self) -> None:
+        # the range axis has more than 256 levels, the grid is large and the smaller image is enough
+        small: np.ndarray = _image[:48, :64]
+        gray: np.ndarray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        for image, arguments in ((gray, (15, 1, 5)), (small, (15, 3, 5)), (gray, (15, 0, 5))):
+            with self.subTest(channels=image.ndim, arguments=arguments):
+                error: FilterError = compare_with_exact(image, *arguments)
+
+                self.assertGreater(error.psnr, 35)
+                self.assertLess(error.max_absolute, 40)
+
+    def test_isoluminant_edges_smoothed(self) -> None:
+        image: np.ndarray = np.zeros((40, 60, 3), dtype=np.uint8)
+        image[:, :30, 2] = 200
+        image[:, 30:, 1] = 102
+        self.assertEqual(np.ptp(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)), 0)
+
+        result: np.ndarray = bilateral_grid(image, 15, 30, 5)
+
+        # cv2 compares the colors and keeps the edge, the grid is guided by the gray image which has no edge
+        np.testing.assert_array_equal(cv2.bilateralFilter(image, 15, 30, 5), image)
+        self.assertGreater(np.abs(result[:, 28:32].astype(int) - image[:, 28:32]).max(axis=2).min(), 50)
+
+    def test_edges_preserved(self) -> None:
+        image: np.ndarray = np.full((100, 120), 40, dtype=np.uint8)
+        image[:, 60:] = 200
+        noise: np.ndarray = np.random.default_rng(42).normal(0, 5, image.shape)
+        noisy: np.ndarray = np.clip(image + noise, 0, 255).astype(np.uint8)
+
+        result: np.ndarray = bilateral_grid(noisy, 31, 30, 20)
+
+        self.assertEqual(result.dtype, np.uint8)
+        self.assertLess(np.abs(result.astype(int) - image).max(), 12)
+        self.assertLess(result[:, :60].std(), noisy[:, :60].std() / 2)
+
+    def test_effective_sigma_space(self) -> None:
+        # weights are almost uniform over the disk when sigma is much larger than its radius
+        self.assertAlmostEqual(get_effective_sigma_space(41, 1e6), 10.0, delta=0.2)
+        # cv2 truncates the weights at 1.5 sigma when the diameter isn't given
+        self.assertAlmostEqual(get_effective_sigma_space(0, 4), 2.7, delta=0.1)
+        self.assertLess(get_effective_sigma_space(9, 75), 3)
+
+    def test_error(self) -> None:
+        error: FilterError = get_error(np.array([10, 20], dtype=np.uint8), np.array([10, 24], dtype=np.uint8))
+
+        self.assertEqual((error.mean_absolute, error.max_absolute), (2.0, 4.0))
+        self.assertAlmostEqual(error.psnr, 10 * np.log10(255 ** 2 / 8))
+        self.assertEqual(get_error(_image, _image).psnr, float('inf'))
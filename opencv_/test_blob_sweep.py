@@ -0,0 +1,63 @@
+from os.path import abspath, dirname, join
+from typing import Sequence
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.blob_sweep import BlobSweep, ContourStats, get_blob_mask, get_contour_stats, get_thresholds
+
+_image: np.ndarray = cv2.imread(join(dirname(dirname(abspath(__file__))), 'images', 'geometry.png'),
+                                cv2.IMREAD_GRAYSCALE)
+
+
+def _get_params(min_threshold: float, max_threshold: float, filters: bool) -> cv2.SimpleBlobDetector_Params:
+    params: cv2.SimpleBlobDetector_Params = cv2.SimpleBlobDetector_Params()
+    params.minThreshold, params.maxThreshold = min_threshold, max_threshold
+    params.filterByArea = params.filterByCircularity = params.filterByConvexity = params.filterByInertia = filters
+
+    return params
+
+
+def _to_tuples(keypoints: Sequence[cv2.KeyPoint]) -> list[tuple[tuple[float, float], float]]:
+    return [(keypoint.pt, keypoint.size) for keypoint in keypoints]
+
+
+class TestBlobSweep(TestCase):
+    def test_detect(self) -> None:
+        sweep: BlobSweep = BlobSweep(cv2.cvtColor(_image, cv2.COLOR_GRAY2BGR))
+        # the parameters of Blob_detection.ipynb, the defaults and the light blobs
+        light: cv2.SimpleBlobDetector_Params = cv2.SimpleBlobDetector_Params()
+        light.blobColor = 255
+        for params in [_get_params(90, 220, False), _get_params(150, 251, False), _get_params(50, 220, True),
+                       cv2.SimpleBlobDetector_Params(), light]:
+            self.assertEqual(_to_tuples(sweep.detect(params)),
+                             _to_tuples(cv2.SimpleBlobDetector.create(params).detect(_image)))
+
+    def test_cached_thresholds(self) -> None:
+        sweep: BlobSweep = BlobSweep(_image)
+        sweep.detect(_get_params(50, 220, False))
+        stats: ContourStats = sweep.get_stats(120.0)
+
+        sweep.detect(_get_params(100, 200, True))
+        self.assertIs(sweep.get_stats(120.0), stats)
+        self.assertEqual(len(sweep._levels), 17)  # pylint: disable=protected-access
+
+    def test_get_thresholds(self) -> None:
+        self.assertEqual(get_thresholds(_get_params(90, 220, False)), list(range(90, 220, 10)))
+        self.assertEqual(get_thresholds(_get_params(100, 100, False)), [])
+
+    def test_get_blob_mask(self) -> None:
+        binary: np.ndarray = np.full((100, 100), 255, dtype=np.uint8)
+        cv2.rectangle(binary, (10, 10), (29, 29), 0, cv2.FILLED)
+        cv2.circle(binary, (70, 70), 15, 0, cv2.FILLED)
+        stats: ContourStats = get_contour_stats(binary)
+        params: cv2.SimpleBlobDetector_Params = _get_params(0, 0, False)
+
+        # the outer border of the image and the two dark shapes
+        self.assertEqual(len(stats), 3)
+        np.testing.assert_array_equal(get_blob_mask(stats, params), stats.colors == 0)
+        params.filterByCircularity, params.minCircularity = True, 0.85
+        dark_circles: np.ndarray = get_blob_mask(stats, params)
+        self.assertEqual(dark_circles.sum(), 1)
+        np.testing.assert_allclose(stats.centers[dark_circles], [[70, 70]], atol=0.5)
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.annotations import AnnotationIndex, build_index
+from opencv_.cascade_dataset import DatasetStats, LinkType, build_dataset, is_up_to_date, link_or_copy
+
+VOC_XML: str = '''<annotation>
+  <object><bndbox><xmin>150</xmin><ymin>140</ymin><xmax>200</xmax><ymax>180</ymax></bndbox></object>
+</annotation>
+'''
+
+
+class TestCascadeDataset(TestCase):
+    _dir: str
+    _dataset_dir: str
+
+    def setUp(self) -> None:
+        self._dir = tempfile.mkdtemp()
+        self._dataset_dir = join(self._dir, 'dataset')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self._dir)
+
+    def _build_index(self, names: list[str]) -> AnnotationIndex:
+        for name in names:
+            cv2.imwrite(join(self._dir, f'{name}.jpg'), np.full((300, 400, 3), 128, dtype=np.uint8))
+            with open(join(self._dir, f'{name}.xml'), 'w', encoding='utf-8') as file:
+                file.write(VOC_XML)
+
+        return build_index([join(self._dir, f'{name}.xml') for name in names],
+                           [join(self._dir, f'{name}.jpg') for name in names])
+
+    def test_link_or_copy(self) -> None:
+        source: str = join(self._dir, 'source.txt')
+        with open(source, 'w', encoding='utf-8') as file:
+            file.write('content')
+        destination: str = join(self._dir, 'links', 'destination.txt')
+
+        self.assertIn(link_or_copy(source, destination), (LinkType.HARDLINK, LinkType.SYMLINK, LinkType.COPY))
+        self.assertEqual(link_or_copy(source, destination), LinkType.SKIPPED)
+        with open(destination, encoding='utf-8') as file:
+            self.assertEqual(file.read(), 'content')
+
+        os.remove(source)
+        with open(source, 'w', encoding='utf-8') as file:
+            file.write('new content')
+        os.utime(source, ns=(0, os.stat(destination).st_mtime_ns + 10 ** 9))
+        self.assertFalse(is_up_to_date(destination, source))
+        self.assertNotEqual(link_or_copy(source, destination), LinkType.SKIPPED)
+        with open(destination, encoding='utf-8') as file:
+            self.assertEqual(file.read(), 'new content')
+
+    def test_build_with_crops(self) -> None:
+        index: AnnotationIndex = self._build_index(['a', 'b'])
+
+        stats: DatasetStats = build_dataset(index, self._dataset_dir, workers=2)
+
+        self.assertEqual((stats.positives, stats.boxes, stats.negatives, stats.cropped), (2, 2, 6, 2))
+        self.assertEqual(stats.linked + stats.copied, 2)
+        self.assertTrue(os.path.samefile(join(self._dir, 'a.jpg'), join(self._dataset_dir, 'positives', 'a.jpg')))
+        self.assertEqual(cv2.imread(join(self._dataset_dir, 'negatives', 'a_right.jpg')).shape, (300, 200, 3))
+        with open(join(self._dataset_dir, 'bg.txt'), encoding='utf-8') as file:
+            self.assertEqual(len(file.readlines()), 6)
+        with open(join(self._dataset_dir, 'info.dat'), encoding='utf-8') as file:
+            self.assertEqual(file.readline(), f'{join(".", "positives", "a.jpg")} 1 150 140 50 40\n')
+
+        stats = build_dataset(index, self._dataset_dir, workers=2)
+        self.assertEqual((stats.negatives, stats.cropped, stats.linked, stats.skipped), (6, 0, 0, 8))
+
+        # the box of b moved, so its left crop isn't large enough anymore
+        xml_path: str = join(self._dir, 'b.xml')
+        with open(xml_path, 'w', encoding='utf-8') as file:
+            file.write(VOC_XML.replace('<xmin>150', '<xmin>100').replace('<xmax>200', '<xmax>350'))
+        os.utime(xml_path, ns=(0, os.stat(join(self._dataset_dir, 'negatives', 'b_top.jpg')).st_mtime_ns + 10 ** 9))
+        stats = build_dataset(build_index(index.xml_paths.tolist(), index.image_paths.tolist()), self._dataset_dir)
+        self.assertEqual((stats.negatives, stats.cropped), (4, 1))
+        self.assertFalse(os.path.exists(join(self._dataset_dir, 'negatives', 'b_left.jpg')))
+
+    def test_build_with_whole_images(self) -> None:
+        stats: DatasetStats = build_dataset(self._build_index(['a']), self._dataset_dir, crop=False)
+
+        self.assertEqual((stats.positives, stats.negatives, stats.cropped), (1, 1, 0))
+        self.assertTrue(os.path.samefile(join(self._dataset_dir, 'positives', 'a.jpg'),
+                                         join(self._dataset_dir, 'negatives', 'a.jpg')))
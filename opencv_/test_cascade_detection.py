@@ -0,0 +1,129 @@
+import os
+import tempfile
+from unittest import TestCase, skipUnless
+
+import cv2
+import numpy as np
+
+from opencv_.cascade_detection import CascadeTileDetector, TiledDetector, get_tiles, non_max_suppression
+
+# one stage with one Haar feature which responds to a bright square in the middle of the 24x24 window
+CASCADE_XML: str = '''<?xml version="1.0"?>
+<opencv_storage>
+<cascade>
+  <stageType>BOOST</stageType>
+  <featureType>HAAR</featureType>
+  <height>24</height>
+  <width>24</width>
+  <stageParams><boostType>GAB</boostType><minHitRate>0.995</minHitRate><maxFalseAlarm>0.5</maxFalseAlarm>
+    <weightTrimRate>0.95</weightTrimRate><maxDepth>1</maxDepth><maxWeakCount>1</maxWeakCount></stageParams>
+  <featureParams><maxCatCount>0</maxCatCount><featSize>1</featSize><mode>BASIC</mode></featureParams>
+  <stageNum>1</stageNum>
+  <stages>
+    <_>
+      <maxWeakCount>1</maxWeakCount>
+      <stageThreshold>0.</stageThreshold>
+      <weakClassifiers><_><internalNodes>0 -1 0 1.</internalNodes><leafValues>-1. 1.</leafValues></_></weakClassifiers>
+    </_>
+  </stages>
+  <features><_><rects><_>0 0 24 24 -1.</_><_>6 6 12 12 4.</_></rects></_></features>
+</cascade>
+</opencv_storage>
+'''
+
+
+class SquareDetector:
+    """Finds bright squares as the cascade would, sizes of the squares are the sizes of the objects"""
+    window_size: tuple[int, int] = (24, 24)
+    calls: int = 0
+
+    def __call__(self, tile: np.ndarray, min_size: tuple[int, int],
+                 max_size: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        self.calls += 1
+        _, _, stats, _ = cv2.connectedComponentsWithStats((tile > 128).astype(np.uint8))
+        boxes: np.ndarray = stats[1:, :4]
+        sizes: np.ndarray = boxes[:, 2:]
+        found: np.ndarray = ((sizes >= min_size) & (sizes <= max_size)).all(axis=1)
+
+        return boxes[found].astype(np.int32), sizes[found, 0].astype(np.float32)
+
+
+def _greedy_nms(boxes: np.ndarray, scores: np.ndarray, threshold: float) -> list[int]:
+    def get_iou(a: np.ndarray, b: np.ndarray) -> float:
+        width: int = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+        height: int = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+        intersection: int = width * height
+
+        return intersection / (a[2] * a[3] + b[2] * b[3] - intersection)
+
+    kept: list[int] = []
+    for i in sorted(range(len(boxes)), key=lambda j: -scores[j]):
+        if all(get_iou(boxes[i], boxes[j]) <= threshold for j in kept):
+            kept.append(i)
+
+    return kept
+
+
+class TestCascadeDetection(TestCase):
+    def test_non_max_suppression(self) -> None:
+        rng: np.random.Generator = np.random.default_rng(42)
+        boxes: np.ndarray = np.hstack([rng.integers(0, 40, (100, 2)), rng.integers(5, 60, (100, 2))])
+        scores: np.ndarray = rng.random(100).astype(np.float32)
+
+        for threshold in (0.1, 0.3, 0.7):
+            with self.subTest(threshold=threshold):
+                self.assertEqual(non_max_suppression(boxes, scores, threshold).tolist(),
+                                 _greedy_nms(boxes, scores, threshold))
+        self.assertEqual(len(non_max_suppression(np.empty((0, 4), dtype=np.int32), np.empty(0))), 0)
+
+    def test_tiles(self) -> None:
+        tiles: list[tuple[int, int, int, int]] = get_tiles((1000, 2500), 1024, 100)
+        covered: np.ndarray = np.zeros((1000, 2500), dtype=bool)
+        for y0, y1, x0, x1 in tiles:
+            covered[y0:y1, x0:x1] = True
+
+        self.assertTrue(covered.all())
+        self.assertEqual(tiles, [(0, 1000, 0, 1024), (0, 1000, 924, 1948), (0, 1000, 1476, 2500)])
+        self.assertEqual(get_tiles((50, 60), 1024, 10), [(0, 50, 0, 60)])
+
+    def test_objects_across_tiles_and_levels(self) -> None:
+        image: np.ndarray = np.zeros((1500, 2600), dtype=np.uint8)
+        squares: list[tuple[int, int, int]] = [(100, 100, 30), (1010, 300, 40), (500, 1000, 100), (2000, 200, 300),
+                                               (1200, 900, 500), (240, 600, 60)]
+        for x, y, size in squares:
+            image[y:y + size, x:x + size] = 255
+        detector: SquareDetector = SquareDetector()
+
+        boxes, scores = TiledDetector(detector, tile_size=512, workers=3).detect(image)
+
+        self.assertGreater(detector.calls, 10)
+        self.assertEqual(len(boxes), len(squares))
+        self.assertEqual(scores.dtype, np.float32)
+        for x, y, size in squares:
+            errors: np.ndarray = np.abs(boxes - np.array([x, y, size, size])).max(axis=1)
+            self.assertLessEqual(errors.min(), size // 20 + 2, (x, y, size))
+
+    def test_size_limits(self) -> None:
+        image: np.ndarray = np.zeros((600, 800), dtype=np.uint8)
+        image[10:40, 10:40] = 255
+        image[96:296, 96:296] = 255
+        tiled: TiledDetector = TiledDetector(SquareDetector(), tile_size=256)
+
+        self.assertEqual(tiled.get_levels(image.shape), [1, 2, 4, 8, 16])
+        self.assertEqual(tiled.get_levels(image.shape, min_size=100, max_size=250), [4, 8])
+        np.testing.assert_array_equal(tiled.detect(image, max_size=100)[0], [[10, 10, 30, 30]])
+        np.testing.assert_array_equal(tiled.detect(image, min_size=100)[0], [[96, 96, 200, 200]])
+
+    @skipUnless(hasattr(cv2, 'CascadeClassifier'), 'CascadeClassifier was moved out of the main OpenCV 5 modules')
+    def test_cascade(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, 'cascade.xml')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(CASCADE_XML)
+            detector: CascadeTileDetector = CascadeTileDetector(path)
+
+            boxes, scores = TiledDetector(detector, tile_size=256, workers=2).detect(np.zeros((300, 400), np.uint8))
+
+        self.assertEqual(detector.window_size, (24, 24))
+        self.assertEqual(boxes.shape, (0, 4))
+        self.assertEqual(len(scores), 0)
@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.contours import (Contours, ExtractionStats, detect_contours, extract_directory, find_images,
+                              get_output_path)
+
+IMAGES_DIR: str = join(dirname(dirname(abspath(__file__))), 'images')
+
+
+class TestContours(TestCase):
+    def test_same_as_find_contours(self) -> None:
+        # edges of the BGR image as in Contour_detection.ipynb
+        image: np.ndarray = cv2.imread(join(IMAGES_DIR, 'geometry.png'))
+        expected_contours, expected_hierarchy = cv2.findContours(cv2.Canny(image, 100, 300), cv2.RETR_TREE,
+                                                                 cv2.CHAIN_APPROX_SIMPLE)
+
+        contours: Contours = detect_contours(image, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+
+        self.assertEqual(len(contours), len(expected_contours))
+        for contour, expected in zip(contours, expected_contours):
+            np.testing.assert_array_equal(contour, expected)
+        np.testing.assert_array_equal(contours.hierarchy, expected_hierarchy[0])
+        self.assertEqual(contours.points.dtype, np.int32)
+
+    def test_empty(self) -> None:
+        contours: Contours = detect_contours(np.zeros((20, 20), dtype=np.uint8), cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+
+        self.assertEqual(len(contours), 0)
+        self.assertEqual(contours.points.shape, (0, 2))
+        self.assertEqual(contours.hierarchy.shape, (0, 4))
+
+
+class TestExtractDirectory(TestCase):
+    _input_dir: str
+    _output_dir: str
+
+    def setUp(self) -> None:
+        self._input_dir = tempfile.mkdtemp()
+        self._output_dir = tempfile.mkdtemp()
+        os.makedirs(join(self._input_dir, 'nested'))
+        shutil.copy(join(IMAGES_DIR, 'geometry.png'), self._input_dir)
+        shutil.copy(join(IMAGES_DIR, 'animal.jpg'), join(self._input_dir, 'nested'))
+        with open(join(self._input_dir, 'broken.png'), 'wb') as file:
+            file.write(b'not an image')
+        with open(join(self._input_dir, 'notes.txt'), 'w', encoding='utf-8') as file:
+            file.write('not an image either')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self._input_dir)
+        shutil.rmtree(self._output_dir)
+
+    def test_find_images(self) -> None:
+        self.assertEqual(find_images(self._input_dir), ['broken.png', 'geometry.png', join('nested', 'animal.jpg')])
+
+    def test_extract(self) -> None:
+        stats: ExtractionStats = extract_directory(self._input_dir, self._output_dir, mode=cv2.RETR_EXTERNAL,
+                                                   method=cv2.CHAIN_APPROX_NONE, workers=2)
+
+        self.assertEqual(stats.images, 2)
+        self.assertEqual(stats.failed, {'broken.png': 'Unable to read the image'})
+        total: int = 0
+        for relative_path in ('geometry.png', join('nested', 'animal.jpg')):
+            image: np.ndarray = cv2.imread(join(self._input_dir, relative_path))
+            saved: Contours = Contours.load(get_output_path(self._output_dir, relative_path))
+            expected: Contours = detect_contours(image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+
+            np.testing.assert_array_equal(saved.points, expected.points)
+            np.testing.assert_array_equal(saved.offsets, expected.offsets)
+            np.testing.assert_array_equal(saved.hierarchy, expected.hierarchy)
+            total += len(saved)
+        self.assertEqual(stats.contours, total)
+
+    def test_failed_image(self) -> None:
+        # the output directory of the nested image can't be created
+        with open(join(self._output_dir, 'nested'), 'w', encoding='utf-8') as file:
+            file.write('not a directory')
+
+        stats: ExtractionStats = extract_directory(self._input_dir, self._output_dir, workers=1)
+
+        self.assertEqual(stats.images, 1)
+        self.assertEqual(list(stats.failed), ['broken.png', join('nested', 'animal.jpg')])
+        self.assertTrue(stats.failed[join('nested', 'animal.jpg')].startswith('FileExistsError'))
+        self.assertTrue(os.path.exists(get_output_path(self._output_dir, 'geometry.png')))
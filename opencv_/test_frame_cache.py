@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.frame_cache import FrameCache, get_cache_path
+
+_FRAMES: int = 24
+
+
+class TestFrameCache(TestCase):
+    _directory: str
+    _video_path: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # short small video decodes fast, the caching doesn't depend on the size
+        cls._directory = tempfile.mkdtemp()
+        cls._video_path = join(cls._directory, 'noise.avi')
+        writer: cv2.VideoWriter = cv2.VideoWriter(cls._video_path, cv2.VideoWriter_fourcc(*'MJPG'), 25, (64, 48))
+        for frame in np.random.default_rng(42).integers(0, 256, (_FRAMES, 48, 64, 3), dtype=np.uint8):
+            writer.write(frame)
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls._directory)
+
+    def test_frames_equal_decoded(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            with FrameCache(self._video_path, directory) as frames:
+                self.assertTrue(frames.rebuilt)
+                self.assertEqual(len(frames), _FRAMES)
+                self.assertAlmostEqual(frames.fps, 25, places=2)
+
+                capture: cv2.VideoCapture = cv2.VideoCapture(self._video_path)
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 10)
+                ok, expected = capture.read()
+                capture.release()
+                self.assertTrue(ok)
+                frame: np.ndarray = frames[10]
+                self.assertTrue((frame == expected).all())
+                self.assertIsInstance(frame.base, np.memmap)
+                self.assertFalse(frame.flags.writeable)
+                del frame
+
+            with FrameCache(self._video_path, directory) as frames:
+                self.assertFalse(frames.rebuilt)
+
+    def test_invalidated_by_source_change(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            video_path: str = join(directory, 'video.avi')
+            shutil.copyfile(self._video_path, video_path)
+            with FrameCache(video_path, directory) as frames:
+                self.assertTrue(frames.rebuilt)
+
+            os.utime(video_path, ns=(0, 0))
+            with FrameCache(video_path, directory) as frames:
+                self.assertTrue(frames.rebuilt)
+
+            with open(get_cache_path(video_path, directory), 'r+b') as file:
+                file.truncate(1000)
+            with FrameCache(video_path, directory) as frames:
+                self.assertTrue(frames.rebuilt)
+                self.assertEqual(len(frames), _FRAMES)
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.image_cache import IMREAD_COLOR, IMREAD_GRAYSCALE, IMREAD_UNCHANGED, ImageCache, get_cache_path
+
+_images_dir: str = join(dirname(dirname(abspath(__file__))), 'images')
+_geometry_path: str = join(_images_dir, 'geometry.png')
+_animal_path: str = join(_images_dir, 'animal.jpg')
+
+
+class TestImageCache(TestCase):
+    def test_read(self) -> None:
+        cache: ImageCache = ImageCache()
+        for mode in (IMREAD_COLOR, IMREAD_UNCHANGED):
+            image: np.ndarray = cache.read(_geometry_path, mode)
+            np.testing.assert_array_equal(image, cv2.imread(_geometry_path, mode))
+            self.assertFalse(image.flags.writeable)
+            self.assertIs(cache.read(_geometry_path, mode), image)
+        with self.assertRaises(ValueError):
+            image[0, 0] = 0
+
+        self.assertEqual((cache.stats.hits, cache.stats.misses, cache.stats.decoded), (2, 2, 2))
+        with self.assertRaises(OSError):
+            cache.read(join(_images_dir, 'puppies.avi'))
+
+    def test_gray_from_color(self) -> None:
+        cache: ImageCache = ImageCache()
+        gray: np.ndarray = cache.read(_animal_path, IMREAD_GRAYSCALE)
+
+        self.assertEqual(cache.stats.decoded, 1)
+        self.assertIs(cache.read(_animal_path, IMREAD_COLOR), cache.read(_animal_path))
+        np.testing.assert_array_equal(gray, cv2.cvtColor(cv2.imread(_animal_path), cv2.COLOR_BGR2GRAY))
+        # the codec decodes the luma of JPEG directly
+        self.assertLessEqual(np.abs(gray.astype(int) - cv2.imread(_animal_path, IMREAD_GRAYSCALE)).mean(), 0.1)
+        np.testing.assert_array_equal(ImageCache(derive_gray=False).read(_animal_path, IMREAD_GRAYSCALE),
+                                      cv2.imread(_animal_path, IMREAD_GRAYSCALE))
+
+    def test_eviction(self) -> None:
+        geometry_bytes: int = cv2.imread(_geometry_path).nbytes
+        animal_bytes: int = cv2.imread(_animal_path).nbytes
+        cache: ImageCache = ImageCache(2 * geometry_bytes)
+        cache.read(_geometry_path)
+        cache.read(_animal_path)
+        cache.read(_geometry_path)
+        self.assertEqual(cache.nbytes, geometry_bytes + animal_bytes)
+
+        # the least recently used animal.jpg makes room for the unchanged decode
+        cache.read(_geometry_path, IMREAD_UNCHANGED)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, 2 * geometry_bytes)
+        cache.read(_geometry_path)
+        self.assertEqual(cache.stats.misses, 3)
+
+        small: ImageCache = ImageCache(animal_bytes)
+        small.read(_geometry_path)
+        self.assertEqual(len(small), 0)
+
+    def test_modified_file(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = join(directory, 'image.png')
+            shutil.copyfile(_geometry_path, path)
+            cache: ImageCache = ImageCache(cache_dir=join(directory, 'cache'))
+            cache.read(path)
+            self.assertTrue(os.path.exists(get_cache_path(path, IMREAD_COLOR, join(directory, 'cache'))))
+
+            loaded: np.ndarray = ImageCache(cache_dir=join(directory, 'cache')).read(path)
+            np.testing.assert_array_equal(loaded, cv2.imread(path))
+            self.assertFalse(loaded.flags.writeable)
+
+            cv2.imwrite(path, cv2.imread(_animal_path))
+            stat: os.stat_result = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            # the first reader decodes the new version and saves it for the second one
+            for reader, loaded_count in ((cache, 0), (ImageCache(cache_dir=join(directory, 'cache')), 1)):
+                np.testing.assert_array_equal(reader.read(path), cv2.imread(_animal_path))
+                self.assertEqual(reader.stats.loaded, loaded_count)
+
+    def test_failed_save(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            # the cache directory can't be created where a file is
+            cache_dir: str = join(directory, 'cache')
+            with open(cache_dir, 'wb'):
+                pass
+            cache: ImageCache = ImageCache(cache_dir=cache_dir)
+
+            with self.assertLogs('opencv_.image_cache', 'WARNING'):
+                image: np.ndarray = cache.read(_geometry_path)
+
+            np.testing.assert_array_equal(image, cv2.imread(_geometry_path))
+            self.assertIs(cache.read(_geometry_path), image)
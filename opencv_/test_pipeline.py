@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.pipeline import FrameResult, PipelineStats, process_video
+
+_FRAMES: int = 24
+
+
+# functions run by the worker processes have to be importable
+def to_gray(frame: np.ndarray, gray: np.ndarray) -> int:
+    cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+    return int(gray.sum())
+
+
+def fail(frame: np.ndarray, _: np.ndarray) -> None:
+    raise ValueError(frame.shape)
+
+
+class TestPipeline(TestCase):
+    _directory: str
+    _video_path: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # a short small video is enough for the reordering of the frames, the throughput on puppies.avi is measured
+        # by python -m opencv_.detect_lines
+        cls._directory = tempfile.mkdtemp()
+        cls._video_path = join(cls._directory, 'noise.avi')
+        writer: cv2.VideoWriter = cv2.VideoWriter(cls._video_path, cv2.VideoWriter_fourcc(*'MJPG'), 25, (64, 48))
+        for frame in np.random.default_rng(42).integers(0, 256, (_FRAMES, 48, 64, 3), dtype=np.uint8):
+            writer.write(frame)
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls._directory)
+
+    def test_results_in_frame_order(self) -> None:
+        capture: cv2.VideoCapture = cv2.VideoCapture(self._video_path)
+        indices: list[int] = []
+
+        def check(frame_result: FrameResult) -> None:
+            ok, frame = capture.read()
+            self.assertTrue(ok)
+            self.assertTrue((frame_result.frame == frame).all())
+            self.assertTrue((frame_result.output == cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)).all())
+            self.assertEqual(frame_result.result, int(frame_result.output.sum()))
+            indices.append(frame_result.index)
+
+        # more frames than the slots make the slots reused
+        stats: PipelineStats = process_video(self._video_path, to_gray, check, workers=2, slots_per_worker=2)
+        capture.release()
+
+        self.assertEqual(stats.frames, _FRAMES)
+        self.assertEqual(indices, list(range(_FRAMES)))
+
+    def test_worker_error(self) -> None:
+        with self.assertRaises(RuntimeError) as context:
+            process_video(self._video_path, fail, workers=1)
+
+        self.assertIsInstance(context.exception.__cause__, ValueError)
@@ -0,0 +1,55 @@
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.smoothing import (SmoothingMethod, box_blur, gaussian_blur_boxes, gaussian_blur_recursive,
+                               get_box_sizes, get_gaussian_sigma, smooth)
+
+_image: np.ndarray = cv2.imread(join(dirname(dirname(abspath(__file__))), 'images', 'animal.jpg'))
+
+
+def _mean_error(result: np.ndarray, expected: np.ndarray) -> float:
+    return float(np.abs(result.astype(np.float64) - expected).mean())
+
+
+class TestSmoothing(TestCase):
+    def test_box_blur(self) -> None:
+        for ksize in ((3, 3), (50, 50), (7, 20), (101, 101)):
+            with self.subTest(ksize=ksize):
+                result: np.ndarray = box_blur(_image, ksize)
+
+                self.assertEqual(result.dtype, np.uint8)
+                self.assertLessEqual(np.abs(result.astype(int) - cv2.blur(_image, ksize)).max(), 1)
+        gray: np.ndarray = cv2.cvtColor(_image, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        np.testing.assert_allclose(box_blur(gray, (9, 9)), cv2.blur(gray, (9, 9)), atol=1e-3)
+
+    def test_box_sizes(self) -> None:
+        for sigma in (5.0, 11.0, 30.0):
+            with self.subTest(sigma=sigma):
+                sizes: list[int] = get_box_sizes(sigma)
+                variance: float = sum((size ** 2 - 1) / 12 for size in sizes)
+
+                self.assertTrue(all(size % 2 == 1 for size in sizes))
+                self.assertAlmostEqual(variance, sigma ** 2, delta=sigma ** 2 * 0.1)
+
+    def test_gaussian(self) -> None:
+        for ksize in (11, 51, 101):
+            sigma: float = get_gaussian_sigma(ksize)
+            expected: np.ndarray = cv2.GaussianBlur(_image, (ksize, ksize), sigma)
+            with self.subTest(ksize=ksize):
+                self.assertLess(_mean_error(gaussian_blur_boxes(_image, sigma), expected), 1.0)
+                self.assertLess(_mean_error(gaussian_blur_recursive(_image, sigma), expected), 2.0)
+
+    def test_smooth(self) -> None:
+        for method in SmoothingMethod:
+            for ksize in (5, 99):
+                with self.subTest(method=method, ksize=ksize):
+                    result: np.ndarray = smooth(_image, method, ksize)
+
+                    self.assertEqual(result.shape, _image.shape)
+                    self.assertEqual(result.dtype, np.uint8)
+        self.assertLess(_mean_error(smooth(_image, SmoothingMethod.GAUSSIAN, 99),
+                                    cv2.GaussianBlur(_image, (99, 99), 0)), 1.0)
+        np.testing.assert_array_equal(smooth(_image, SmoothingMethod.MEDIAN, 99), cv2.medianBlur(_image, 99))
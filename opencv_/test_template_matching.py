@@ -0,0 +1,113 @@
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.template_matching import TM_CCOEFF_NORMED, Match, PyramidMatcher, SceneMatcher, find_peaks
+
+_image: np.ndarray = cv2.imread(join(dirname(dirname(abspath(__file__))), 'images', 'animal.jpg'))
+
+
+def _full_search(image: np.ndarray, template: np.ndarray, method: int) -> tuple[int, int]:
+    _, _, min_location, max_location = cv2.minMaxLoc(cv2.matchTemplate(image, template, method))
+
+    return min_location if method in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED) else max_location
+
+
+class TestPyramidMatcher(TestCase):
+    def test_same_as_full_search(self) -> None:
+        noise: np.ndarray = np.random.default_rng(42).normal(0, 8, _image.shape)
+        noisy_scene: np.ndarray = np.clip(_image + noise, 0, 255).astype(np.uint8)
+        # the templates have from 2 to 4 pyramid levels
+        templates: list[np.ndarray] = [_image[12:, 30:232], _image[40:100, 60:120], _image[100:134, 166:213]]
+
+        for method in (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF, cv2.TM_CCOEFF):
+            for i, template in enumerate(templates):
+                with self.subTest(method=method, template=i):
+                    expected: tuple[int, int] = _full_search(noisy_scene, template, method)
+                    match: Match = PyramidMatcher(template, method=method).match(noisy_scene)
+
+                    self.assertLessEqual(abs(match.location[0] - expected[0]), 1)
+                    self.assertLessEqual(abs(match.location[1] - expected[1]), 1)
+
+    def test_default_method(self) -> None:
+        self.assertEqual(TM_CCOEFF_NORMED, cv2.TM_CCOEFF_NORMED)
+        self.assertEqual(PyramidMatcher(_image[:60, :100]).method, cv2.TM_CCOEFF_NORMED)
+
+    def test_levels(self) -> None:
+        self.assertEqual(PyramidMatcher(_image[:60, :100]).levels, 3)
+        self.assertEqual(PyramidMatcher(_image[:60, :100], levels=1).match(_image).location, (0, 0))
+
+    def test_find_peaks_suppression(self) -> None:
+        result: np.ndarray = np.zeros((10, 10), dtype=np.float32)
+        result[2, 2], result[2, 3], result[7, 8] = 1.0, 0.9, 0.8
+
+        peaks: list[Match] = find_peaks(result, 2, (2, 2), minimize=False)
+
+        self.assertEqual([peak.location for peak in peaks], [(2, 2), (8, 7)])
+
+
+class TestSceneMatcher(TestCase):
+    def test_same_as_match_template(self) -> None:
+        noise: np.ndarray = np.random.default_rng(42).normal(0, 8, _image.shape)
+        scene: np.ndarray = np.clip(_image + noise, 0, 255).astype(np.uint8)
+        templates: list[np.ndarray] = [_image[12:, 30:232], _image[40:100, 60:120], _image[100:140, 150:190],
+                                       _image[:40, :40]]
+
+        for method in (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF):
+            for image in (scene, cv2.cvtColor(scene, cv2.COLOR_BGR2GRAY)):
+                with self.subTest(method=method, channels=image.ndim):
+                    gray: bool = image.ndim == 2
+                    batch: list[np.ndarray] = [cv2.cvtColor(template, cv2.COLOR_BGR2GRAY) if gray else template
+                                               for template in templates]
+                    matcher: SceneMatcher = SceneMatcher(image, method)
+
+                    for template, matches in zip(batch, matcher.match(batch)):
+                        expected: np.ndarray = cv2.matchTemplate(image, template, method)
+                        result: np.ndarray = matcher.get_results([template])[0]
+
+                        self.assertEqual(matches[0].location, _full_search(image, template, method))
+                        np.testing.assert_allclose(result, expected, rtol=1e-4, atol=1e-3 * np.abs(expected).max())
+
+    def test_top_k(self) -> None:
+        matches: list[list[Match]] = SceneMatcher(_image).match([_image[40:100, 60:120], _image[:20, :30]], top_k=3)
+
+        self.assertEqual([len(template_matches) for template_matches in matches], [3, 3])
+        self.assertEqual(matches[0][0].location, (60, 40))
+        self.assertAlmostEqual(matches[0][0].score, 1.0, places=5)
+        self.assertGreater(matches[0][0].score, matches[0][1].score)
+
+    def test_flat_patches(self) -> None:
+        scene: np.ndarray = np.zeros((50, 50), dtype=np.uint8)
+        scene[20:30, 20:30] = 255
+
+        result: np.ndarray = SceneMatcher(scene, min_fft_pixels=0).get_results([scene[15:35, 15:35]])[0]
+
+        self.assertTrue(np.isfinite(result).all())
+        self.assertEqual(np.unravel_index(result.argmax(), result.shape), (15, 15))
+
+    def test_chunks(self) -> None:
+        templates: list[np.ndarray] = [_image[y:y + 30, x:x + 30] for y in (0, 50, 100) for x in (0, 100, 200)]
+
+        results: np.ndarray = SceneMatcher(_image).get_results(templates)
+        chunked: np.ndarray = SceneMatcher(_image, max_chunk_bytes=1).get_results(templates)
+
+        np.testing.assert_allclose(chunked, results)
+
+    def test_small_scene(self) -> None:
+        scene: np.ndarray = _image[:60, :80]
+        templates: list[np.ndarray] = [scene[10:30, 20:40], scene[30:50, 50:70]]
+
+        for method in (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_SQDIFF):
+            with self.subTest(method=method):
+                results: np.ndarray = SceneMatcher(scene, method).get_results(templates)
+                fft_results: np.ndarray = SceneMatcher(scene, method, min_fft_pixels=0).get_results(templates)
+
+                for template, result in zip(templates, results):
+                    np.testing.assert_array_equal(result, cv2.matchTemplate(scene, template, method))
+                np.testing.assert_allclose(fft_results, results, rtol=1e-4, atol=1e-3 * np.abs(results).max())
+
+    def test_unsupported_method(self) -> None:
+        with self.assertRaises(ValueError):
+            SceneMatcher(_image, cv2.TM_SQDIFF_NORMED)
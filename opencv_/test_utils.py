@@ -0,0 +1,42 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from opencv_.utils import HeadlessRenderer, show, show_grid, to_rgb_view
+
+
+class TestUtils(TestCase):
+    def test_rgb_view_shares_memory(self) -> None:
+        img: np.ndarray = np.zeros((4, 6, 3), dtype=np.uint8)
+        img[..., 0] = 255  # blue
+
+        rgb: np.ndarray = to_rgb_view(img)
+
+        self.assertTrue(np.shares_memory(img, rgb))
+        self.assertTrue((rgb[..., 2] == 255).all())
+        self.assertIs(to_rgb_view(img[..., 0]).base, img)
+
+    def test_headless_renderer(self) -> None:
+        images: list[np.ndarray] = [np.full((20, 30, 3), i * 50, dtype=np.uint8) for i in range(5)]
+        with tempfile.TemporaryDirectory() as directory:
+            # low dpi keeps the figures small and fast to render
+            with HeadlessRenderer(directory) as renderer:
+                show_grid(images, titles=[f'image {i}' for i in range(5)], dpi=10)
+                show(images[0][..., 0], dpi=10, title='gray')
+
+            self.assertEqual([os.path.basename(path) for path in renderer.paths],
+                             ['0000_image_0.png', '0001_gray.png'])
+            for path in renderer.paths:
+                self.assertGreater(os.path.getsize(path), 0)
+
+    def test_headless_renderer_error(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ZeroDivisionError):
+                with HeadlessRenderer(directory) as renderer:
+                    show(np.zeros((0, 0, 3), dtype=np.uint8), dpi=10, title='empty')
+                    show(np.zeros((20, 30), dtype=np.uint8), dpi=10, title='gray')
+
+            self.assertFalse(os.path.exists(renderer.paths[0]))
+            self.assertTrue(os.path.exists(renderer.paths[1]))
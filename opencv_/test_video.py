@@ -0,0 +1,75 @@
+import shutil
+import tempfile
+import time
+from os.path import join
+from unittest import TestCase
+
+import cv2
+import numpy as np
+
+from opencv_.video import Backpressure, Frame, FrameSource
+
+_FRAMES: int = 24
+
+
+class TestFrameSource(TestCase):
+    _directory: str
+    _video_path: str
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # short small video decodes fast, the prefetching doesn't depend on the size
+        cls._directory = tempfile.mkdtemp()
+        cls._video_path = join(cls._directory, 'noise.avi')
+        writer: cv2.VideoWriter = cv2.VideoWriter(cls._video_path, cv2.VideoWriter_fourcc(*'MJPG'), 25, (64, 48))
+        for frame in np.random.default_rng(42).integers(0, 256, (_FRAMES, 48, 64, 3), dtype=np.uint8):
+            writer.write(frame)
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls._directory)
+
+    def test_same_frames_as_video_capture(self) -> None:
+        capture: cv2.VideoCapture = cv2.VideoCapture(self._video_path)
+        with FrameSource(self._video_path, capacity=4) as source:
+            count: int = 0
+            for frame in source:
+                ok, expected = capture.read()
+                self.assertTrue(ok)
+                self.assertEqual(frame.index, count)
+                self.assertTrue((frame.image == expected).all())
+                count += 1
+        capture.release()
+
+        self.assertEqual(count, _FRAMES)
+        self.assertEqual(source.stats.dropped, 0)
+        self.assertEqual(source.stats.decode.count, _FRAMES)
+
+    def test_drop_oldest(self) -> None:
+        with FrameSource(self._video_path, capacity=2, backpressure=Backpressure.DROP_OLDEST) as source:
+            indices: list[int] = []
+            for frame in source:
+                indices.append(frame.index)
+                time.sleep(0.005)  # processing is slower than decoding
+
+        self.assertEqual(len(indices) + source.stats.dropped, _FRAMES)
+        self.assertGreater(source.stats.dropped, 0)
+        self.assertEqual(indices, sorted(indices))
+
+    def test_read_to_preallocated_array(self) -> None:
+        with FrameSource(self._video_path) as source:
+            out: np.ndarray = np.empty(source.frame_shape, dtype=np.uint8)
+            first: tuple[int, np.ndarray] | None = source.read(out)
+            second: Frame | None = source.next_frame()
+
+        self.assertIsNotNone(first)
+        self.assertIs(first[1], out)
+        self.assertEqual(second.index, 1)
+        self.assertFalse((out == second.image).all())
+
+    def test_stop_before_end(self) -> None:
+        with FrameSource(self._video_path, capacity=2) as source:
+            source.next_frame()
+
+        self.assertIsNone(source.next_frame())
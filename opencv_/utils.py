@@ -1,12 +1,137 @@
-import cv2
+import math
+import os
+import queue
+import re
+import threading
+from types import TracebackType
+from typing import Sequence
+
 import numpy as np
-from matplotlib import pyplot as plt
 
+from constants import OUTPUT_PATH
+from lazy_imports import lazy_import
+
+plt = lazy_import('matplotlib.pyplot')
+matplotlib_figure = lazy_import('matplotlib.figure')
+
+_CELL_SIZE: float = 4.0  # inches
+
+
+def to_rgb_view(img: np.ndarray) -> np.ndarray:
+    """Returns BGR (or BGRA) image with reversed channels as a view without copying, gray images are returned as is"""
+    return img if img.ndim == 2 else img[..., 2::-1]
+
+
+def _draw_grid(figure: 'matplotlib_figure.Figure', images: Sequence[np.ndarray], titles: Sequence[str | None] | None,
+               columns: int) -> None:
+    rows: int = math.ceil(len(images) / columns)
+    axes: np.ndarray = figure.subplots(rows, columns, squeeze=False)
+    for i, ax in enumerate(axes.flat):
+        if i >= len(images):
+            ax.set_visible(False)
+            continue
+        img: np.ndarray = images[i]
+        ax.imshow(to_rgb_view(img), cmap='gray' if img.ndim == 2 else None)
+        ax.set_axis_off()
+        if titles is not None and titles[i] is not None:
+            ax.set_title(titles[i])
+
+
+def _get_figsize(images: Sequence[np.ndarray], columns: int) -> tuple[float, float]:
+    height, width = images[0].shape[:2]
+    rows: int = math.ceil(len(images) / columns)
+
+    return columns * _CELL_SIZE, rows * _CELL_SIZE * height / width
+
+
+class HeadlessRenderer:
+    """Saves the figures to PNG files instead of showing them, figures are rendered by a background thread.
+
+    Use as a context manager, all the figures are written on exit:
+    with HeadlessRenderer():
+        show_grid([img, edges])
+    The first error of the rendering is raised on exit, the figures after it are still rendered.
+    """
+    # renderer used by show and show_grid instead of pyplot
+    active: 'HeadlessRenderer | None' = None
+    _output_dir: str
+    _queue: queue.Queue
+    _thread: threading.Thread
+    _count: int
+    _error: Exception | None
+    paths: list[str]
+
+    def __init__(self, output_dir: str = OUTPUT_PATH):
+        self._output_dir = output_dir
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self.__render_queued, daemon=True)
+        self._count = 0
+        self._error = None
+        self.paths = []
+
+    def __enter__(self) -> 'HeadlessRenderer':
+        os.makedirs(self._output_dir, exist_ok=True)
+        self._thread.start()
+        HeadlessRenderer.active = self
+
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None,
+                 exc_val: BaseException | None,
+                 exc_tb: TracebackType | None) -> None:
+        HeadlessRenderer.active = None
+        self._queue.put(None)
+        self._thread.join()
+        # the error of the with block isn't replaced by the rendering error
+        if self._error is not None and exc_type is None:
+            raise self._error
+
+    def submit(self, images: Sequence[np.ndarray], titles: Sequence[str | None] | None, columns: int,
+               dpi: int) -> str:
+        """Returns path of the PNG file which will be written"""
+        name: str = re.sub(r'[^\w-]+', '_', next((title for title in titles or () if title is not None), 'figure'))
+        path: str = os.path.join(self._output_dir, f'{self._count:04d}_{name}.png')
+        self._count += 1
+        self.paths.append(path)
+        # images could be changed by the caller after the call returns
+        self._queue.put((path, [img.copy() for img in images], titles, columns, dpi))
+
+        return path
+
+    def __render_queued(self) -> None:
+        while (item := self._queue.get()) is not None:
+            path, images, titles, columns, dpi = item
+            try:
+                # pyplot is not thread-safe, figures created directly are not managed by it
+                figure: 'matplotlib_figure.Figure' = matplotlib_figure.Figure(figsize=_get_figsize(images, columns),
+                                                                              dpi=dpi)
+                _draw_grid(figure, images, titles, columns)
+                figure.savefig(path)
+            # pylint: disable=broad-except
+            except Exception as error:
+                self._error = self._error or error
+
+
+def show_grid(images: Sequence[np.ndarray], titles: Sequence[str | None] | None = None, columns: int | None = None,
+              dpi: int = 100) -> None:
+    """Shows the images in one figure, saves it to PNG file instead if it's called within HeadlessRenderer"""
+    columns = min(len(images), math.ceil(math.sqrt(len(images))) if columns is None else columns)
+    if HeadlessRenderer.active is not None:
+        HeadlessRenderer.active.submit(images, titles, columns, dpi)
+        return
+
+    plt.figure(figsize=_get_figsize(images, columns), dpi=dpi)
+    _draw_grid(plt.gcf(), images, titles, columns)
+    plt.show()
+
+
+def show(img: np.ndarray, dpi: int = 100, title: str | None = None) -> None:
+    if HeadlessRenderer.active is not None:
+        HeadlessRenderer.active.submit([img], [title], 1, dpi)
+        return
 
-def show(img: np.ndarray, dpi=100, title=None) -> None:
-    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
     plt.figure(dpi=dpi)
-    plt.imshow(img_rgb)
+    plt.imshow(to_rgb_view(img), cmap='gray' if img.ndim == 2 else None)
     if title is not None:
         plt.title(title)
     plt.show()
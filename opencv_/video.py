@@ -0,0 +1,212 @@
+"""Reading of the video frames on a background thread.
+
+Frames are decoded by cv2.VideoCapture directly into the slots of a preallocated ring buffer, so decoding of the next
+frames overlaps with processing of the current one and no frame array is allocated after the start.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from types import TracebackType
+from typing import Iterator
+
+import numpy as np
+
+from lazy_imports import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+class Backpressure(Enum):
+    BLOCK = 'block'  # decoding waits until the consumer frees a slot, no frames are lost
+    DROP_OLDEST = 'drop_oldest'  # the oldest frame which isn't read yet is overwritten, for real-time display
+
+
+@dataclass
+class StageLatency:
+    count: int = 0
+    total: float = 0.0  # seconds
+    max: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+
+@dataclass
+class FrameSourceStats:
+    decode: StageLatency = field(default_factory=StageLatency)
+    # time between the end of decoding and the moment the consumer got the frame
+    buffered: StageLatency = field(default_factory=StageLatency)
+    # time the consumer waited for a frame and the decoding thread waited for a free slot
+    consumer_wait: StageLatency = field(default_factory=StageLatency)
+    producer_wait: StageLatency = field(default_factory=StageLatency)
+    dropped: int = 0
+
+
+@dataclass
+class Frame:
+    index: int
+    # view of the ring buffer slot, valid until the next frame is requested
+    image: np.ndarray
+
+
+# pylint: disable=too-many-instance-attributes
+class FrameSource:
+    """Decodes frames of the video on a background thread into a bounded ring buffer.
+
+    with FrameSource('images/puppies.avi') as source:
+        for frame in source:
+            process(frame.image)
+    """
+    stats: FrameSourceStats
+    _path: str
+    _backpressure: Backpressure
+    _capture: 'cv2.VideoCapture'
+    _buffer: np.ndarray
+    _frame_indices: list[int]
+    _decoded_at: list[float]
+    _ready: deque[int]
+    _free: deque[int]
+    _held: int | None
+    _finished: bool
+    _closed: bool
+    _condition: threading.Condition
+    _thread: threading.Thread
+
+    def __init__(self, path: str, capacity: int = 8, backpressure: Backpressure = Backpressure.BLOCK):
+        if capacity < 1:
+            raise ValueError(f'Capacity must be positive: {capacity}')
+        self.stats = FrameSourceStats()
+        self._path = path
+        self._backpressure = backpressure
+        self._frame_indices = [-1] * (capacity + 1)
+        self._decoded_at = [0.0] * (capacity + 1)
+        # one more slot than the capacity is held by the consumer
+        self._free = deque(range(capacity + 1))
+        self._ready = deque()
+        self._held = None
+        self._finished = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self.__decode_frames, daemon=True)
+
+    def __enter__(self) -> 'FrameSource':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None,
+                 exc_val: BaseException | None,
+                 exc_tb: TracebackType | None) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Frame]:
+        while (frame := self.next_frame()) is not None:
+            yield frame
+
+    @property
+    def fps(self) -> float:
+        return self._capture.get(cv2.CAP_PROP_FPS)
+
+    @property
+    def frame_shape(self) -> tuple[int, ...]:
+        return self._buffer.shape[1:]
+
+    def open(self) -> None:
+        self._capture = cv2.VideoCapture(self._path)
+        if not self._capture.isOpened():
+            raise OSError(f'Unable to open the video: {self._path}')
+
+        # the first frame is decoded here to find out the shape of the buffer
+        start: float = time.perf_counter()
+        ok, first = self._capture.read()
+        self.stats.decode.add(time.perf_counter() - start)
+        if not ok:
+            self._capture.release()
+            raise OSError(f'Unable to decode the video: {self._path}')
+        self._buffer = np.empty((len(self._frame_indices),) + first.shape, dtype=first.dtype)
+        slot: int = self._free.popleft()
+        self._buffer[slot] = first
+        self._frame_indices[slot] = 0
+        self._decoded_at[slot] = time.perf_counter()
+        self._ready.append(slot)
+
+        self._thread.start()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._capture.release()
+
+    def next_frame(self) -> Frame | None:
+        """Returns the next decoded frame or None at the end of the video, previous frame becomes invalid"""
+        with self._condition:
+            if self._held is not None:
+                self._free.append(self._held)
+                self._held = None
+                self._condition.notify_all()
+
+            start: float = time.perf_counter()
+            while len(self._ready) == 0 and not self._finished and not self._closed:
+                self._condition.wait()
+            now: float = time.perf_counter()
+            if len(self._ready) == 0 or self._closed:
+                return None
+            self.stats.consumer_wait.add(now - start)
+
+            slot: int = self._ready.popleft()
+            self._held = slot
+            self.stats.buffered.add(now - self._decoded_at[slot])
+
+            return Frame(self._frame_indices[slot], self._buffer[slot])
+
+    def read(self, out: np.ndarray | None = None) -> tuple[int, np.ndarray] | None:
+        """Returns index of the next frame and its copy written to the output array if it's given"""
+        frame: Frame | None = self.next_frame()
+        if frame is None:
+            return None
+        if out is None:
+            return frame.index, frame.image.copy()
+        np.copyto(out, frame.image)
+
+        return frame.index, out
+
+    def __acquire_slot(self) -> int | None:
+        start: float = time.perf_counter()
+        with self._condition:
+            while not self._closed and len(self._free) == 0:
+                if self._backpressure == Backpressure.DROP_OLDEST and len(self._ready) > 0:
+                    self.stats.dropped += 1
+                    return self._ready.popleft()
+                self._condition.wait()
+            self.stats.producer_wait.add(time.perf_counter() - start)
+
+            return None if self._closed else self._free.popleft()
+
+    def __decode_frames(self) -> None:
+        index: int = 1
+        while (slot := self.__acquire_slot()) is not None:
+            start: float = time.perf_counter()
+            ok, _ = self._capture.read(self._buffer[slot])
+            decoded_at: float = time.perf_counter()
+            with self._condition:
+                if not ok:
+                    self._free.append(slot)
+                    self._finished = True
+                    self._condition.notify_all()
+                    return
+                self.stats.decode.add(decoded_at - start)
+                self._frame_indices[slot] = index
+                self._decoded_at[slot] = decoded_at
+                self._ready.append(slot)
+                self._condition.notify_all()
+            index += 1
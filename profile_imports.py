@@ -0,0 +1,4 @@
+from runner.import_profile import main
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,14 @@
 from typing import Callable
 from unittest import TestCase
 
-import torch
-from torch.utils.data import Dataset, DataLoader
+from lazy_imports import lazy_import
+
+torch = lazy_import('torch')
 
 
 class TestDataset(TestCase):
     def test_custom_dataset(self) -> None:
-        class RandomDataset(Dataset):
+        class RandomDataset(torch.utils.data.Dataset):
             __data: torch.Tensor
             __labels: torch.Tensor
             __transform: Callable[[torch.Tensor], torch.Tensor]
@@ -34,7 +35,7 @@ class TestDataset(TestCase):
                 return item, label
 
         random_dataset = RandomDataset((4, 1))
-        data_loader = DataLoader(random_dataset, batch_size=2, shuffle=False)
+        data_loader = torch.utils.data.DataLoader(random_dataset, batch_size=2, shuffle=False)
 
         batch_list: list[list[torch.Tensor]] = list(iter(data_loader))
         self.assertEqual(len(batch_list), 2)
@@ -8,6 +8,7 @@ from torch.nn import Parameter
 from constants import OUTPUT_PATH
 
 _save_path: str = join(OUTPUT_PATH, 'model.pth')
+SHARD_GROUP: str = OUTPUT_PATH  # modules saving to OUTPUT_PATH can't be run in parallel
 
 
 class CustomModel(torch.nn.Module):
@@ -1,7 +1,10 @@
 from unittest import TestCase
 
 import numpy as np
-import torch
+
+from lazy_imports import lazy_import
+
+torch = lazy_import('torch')
 
 
 class TestTensors(TestCase):
@@ -0,0 +1,104 @@
+import os
+import sys
+import unittest
+from argparse import ArgumentParser, Namespace
+from unittest import TestResult, TestSuite, TextTestResult
+
+from runner.discovery import (Selection, TestSource, build_index, iter_test_files, load_tests, matches,
+                              select_tests)
+from runner.import_graph import build_graph, get_changed_files, select_affected_modules
+from runner.sharding import ShardedTestRunner
+from runner.timing import TimingTestResult, find_regressions, print_regressions, read_report, write_report
+from runner.worker_pool import DEFAULT_PORT, run_in_worker_pool
+
+
+def _parse_args() -> Namespace:
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument('--select', action='append', metavar='GLOB',
+                        help='run only tests which ids or their module, class, package prefixes match the glob, '
+                             'test modules are found without importing them (could be repeated)')
+    parser.add_argument('--changed', nargs='?', const='HEAD', default=None, metavar='COMMIT',
+                        help='run only test modules importing (directly or not) the files changed since the commit, '
+                             'HEAD by default')
+    parser.add_argument('--list', action='store_true', help='print ids of the selected tests instead of running them')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='number of processes to run test modules in, tests are run sequentially by default')
+    parser.add_argument('--worker-pool', type=int, nargs='?', const=DEFAULT_PORT, default=None, metavar='PORT',
+                        help='run tests in the resident worker pool listening on the port (see runner.worker_pool)')
+    parser.add_argument('--timing-report', metavar='PATH',
+                        help='write wall time, CPU time and memory peak of every test to the JSON file')
+    parser.add_argument('--timing-baseline', metavar='PATH',
+                        help='report tests which became slower than in the JSON file written by --timing-report')
+    parser.add_argument('--regression-threshold', type=float, default=0.5,
+                        help='relative increase of a metric to be reported as a regression, 0.5 by default')
+
+    return parser.parse_args()
+
+
+def _get_source(args: Namespace, pattern: str, selection: Selection | None) -> TestSource:
+    module_names: tuple[str, ...] | None = None if selection is None else selection.module_names
+    if args.changed is not None:
+        test_modules: list[str] = [name for _, name in iter_test_files('.', pattern, os.path.abspath('.'))] \
+            if module_names is None else list(module_names)
+        changed_files: list[str] = get_changed_files(args.changed)
+        affected: list[str] | None = select_affected_modules(build_graph('.'), changed_files, test_modules)
+        if affected is not None:
+            print(f'{len(changed_files)} changed files affect {len(affected)} of {len(test_modules)} test modules',
+                  file=sys.stderr)
+            module_names = tuple(affected)
+
+    return TestSource('.', pattern, module_names=module_names)
+
+
+def _load_suite(args: Namespace, source: TestSource) -> TestSuite:
+    if args.select is None:
+        return source.load()
+
+    return TestSuite(test for test in load_tests(source) if matches(test.id(), args.select))
+
+
+def _list(args: Namespace, source: TestSource, selection: Selection | None) -> None:
+    if selection is None:
+        test_ids: list[str] = [test.id() for test in load_tests(source)]
+    else:
+        # only dynamic modules are imported
+        module_names: set[str] = set(source.module_names)
+        test_ids = [test_id for module, module_test_ids in selection.test_ids.items() if module in module_names
+                    for test_id in module_test_ids]
+        dynamic_source: TestSource = TestSource(source.start_dir, source.pattern, module_names=tuple(
+                module for module in selection.dynamic_modules if module in module_names))
+        test_ids += [test.id() for test in load_tests(dynamic_source) if matches(test.id(), args.select)]
+    for test_id in test_ids:
+        print(test_id)
+
+
+def _run(args: Namespace, source: TestSource, resultclass: type[TextTestResult]) -> TestResult:
+    if args.worker_pool is not None:
+        # tests are loaded by the workers to avoid importing the heavy dependencies here
+        return run_in_worker_pool(args.worker_pool, source, verbosity=2, resultclass=resultclass,
+                                  patterns=args.select)
+
+    tests: TestSuite = _load_suite(args, source)
+    if args.jobs > 1:
+        return ShardedTestRunner(args.jobs, source, verbosity=2, resultclass=resultclass).run(tests)
+
+    return unittest.TextTestRunner(verbosity=2, resultclass=resultclass).run(tests)
+
+
+def main(pattern: str) -> None:
+    args: Namespace = _parse_args()
+    selection: Selection | None = None if args.select is None else select_tests(build_index('.', pattern),
+                                                                                 args.select)
+    source: TestSource = _get_source(args, pattern, selection)
+    if args.list:
+        _list(args, source, selection)
+        return
+
+    measure: bool = args.timing_report is not None or args.timing_baseline is not None
+    result: TestResult = _run(args, source, TimingTestResult if measure else TextTestResult)
+
+    if args.timing_report is not None:
+        write_report(args.timing_report, result.timings)
+    if args.timing_baseline is not None:
+        print_regressions(sys.stderr, find_regressions(result.timings, read_report(args.timing_baseline),
+                                                       args.regression_threshold), args.regression_threshold)
@@ -0,0 +1,238 @@
+"""Test discovery without importing the test modules.
+
+Test modules are parsed with ast to find TestCase subclasses and their test methods, the result is cached on disk and
+is invalidated by modification time of the files. Modules which could add tests at runtime (custom load_tests hook,
+star imports) are marked as dynamic and have to be imported to get their tests.
+"""
+import ast
+import os
+import sys
+import unittest
+from dataclasses import asdict, dataclass, field
+from fnmatch import fnmatch
+from functools import cache
+from typing import Iterator
+from unittest import TestCase, TestSuite
+
+from constants import OUTPUT_PATH
+from runner.json_cache import read_cache, write_cache
+from runner.suite_filter import compile_globs, flatten_suite
+
+DEFAULT_INDEX_PATH: str = os.path.join(OUTPUT_PATH, 'test_index.json')
+_INDEX_VERSION: int = 1
+
+
+@dataclass(frozen=True)
+class TestSource:
+    """Describes how to load the tests, workers of the parallel runners load the tests from the same source.
+
+    Tests are discovered in start_dir unless module_names are given, in which case only these modules are imported.
+    """
+    start_dir: str
+    pattern: str
+    top_level_dir: str | None = None
+    module_names: tuple[str, ...] | None = None
+
+    def load(self) -> TestSuite:
+        loader: unittest.TestLoader = unittest.defaultTestLoader
+        if self.module_names is None:
+            return loader.discover(self.start_dir, self.pattern, self.top_level_dir)
+
+        top_level_dir: str = os.path.abspath(self.start_dir if self.top_level_dir is None else self.top_level_dir)
+        if top_level_dir not in sys.path:
+            sys.path.insert(0, top_level_dir)
+
+        return TestSuite(loader.loadTestsFromName(name) for name in self.module_names)
+
+
+@cache
+def load_tests(source: TestSource) -> tuple[TestCase, ...]:
+    return tuple(flatten_suite(source.load()))
+
+
+@dataclass
+class ClassInfo:
+    name: str
+    bases: list[str]
+    methods: list[str]
+
+
+@dataclass
+class ModuleInfo:
+    name: str
+    mtime_ns: int
+    size: int
+    dynamic: bool
+    classes: list[ClassInfo] = field(default_factory=list)
+    # (module, name) pairs of "from module import name" statements
+    imports: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _get_dotted_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Attribute):
+        return f'{_get_dotted_name(node.value)}.{node.attr}'
+
+    return node.id if isinstance(node, ast.Name) else ''
+
+
+def _resolve_relative_import(module_name: str, node: ast.ImportFrom) -> str:
+    if node.level == 0:
+        return node.module or ''
+    package: list[str] = module_name.split('.')[:-node.level]
+
+    return '.'.join(package + ([node.module] if node.module else []))
+
+
+def parse_module(path: str, module_name: str) -> ModuleInfo:
+    with open(path, 'rb') as file:
+        tree: ast.Module = ast.parse(file.read(), path)
+    stat: os.stat_result = os.stat(path)
+    info: ModuleInfo = ModuleInfo(module_name, stat.st_mtime_ns, stat.st_size, dynamic=False)
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            methods: list[str] = [item.name for item in node.body
+                                  if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                                  and item.name.startswith(unittest.defaultTestLoader.testMethodPrefix)]
+            info.classes.append(ClassInfo(node.name, [_get_dotted_name(base) for base in node.bases], methods))
+        elif isinstance(node, ast.FunctionDef) and node.name == 'load_tests':
+            info.dynamic = True
+        elif isinstance(node, ast.ImportFrom):
+            imported_module: str = _resolve_relative_import(module_name, node)
+            for alias in node.names:
+                if alias.name == '*':
+                    info.dynamic = True
+                else:
+                    info.imports.append((imported_module, alias.name))
+
+    return info
+
+
+class StaticIndex:
+    _modules: dict[str, ModuleInfo]
+    _test_methods_cache: dict[tuple[str, str], list[str] | None]
+
+    def __init__(self, modules: list[ModuleInfo]):
+        self._modules = {module.name: module for module in modules}
+        self._test_methods_cache = {}
+
+    @property
+    def modules(self) -> list[ModuleInfo]:
+        return list(self._modules.values())
+
+    def _find_class(self, module_name: str, class_name: str) -> tuple[str, ClassInfo] | None:
+        """Returns the module where the class is defined and its description"""
+        module: ModuleInfo | None = self._modules.get(module_name)
+        if module is None:
+            return None
+        for class_info in module.classes:
+            if class_info.name == class_name:
+                return module_name, class_info
+        for imported_module, name in module.imports:
+            if name == class_name:
+                return self._find_class(imported_module, name)
+
+        return None
+
+    def _get_test_methods(self, module_name: str, class_info: ClassInfo) -> list[str] | None:
+        """Returns sorted test methods if the class is a TestCase subclass, None otherwise"""
+        key: tuple[str, str] = module_name, class_info.name
+        if key not in self._test_methods_cache:
+            self._test_methods_cache[key] = None  # protects from cyclic definitions
+            is_test_case: bool = False
+            methods: set[str] = set(class_info.methods)
+            for base in class_info.bases:
+                found: tuple[str, ClassInfo] | None = self._find_class(module_name, base)
+                base_methods: list[str] | None = None if found is None else self._get_test_methods(*found)
+                if base_methods is not None:
+                    is_test_case = True
+                    methods.update(base_methods)
+                elif found is None and base.rpartition('.')[2].endswith('TestCase'):
+                    is_test_case = True
+            self._test_methods_cache[key] = sorted(methods) if is_test_case else None
+
+        return self._test_methods_cache[key]
+
+    def get_test_ids(self, module_name: str) -> list[str]:
+        """Mimics unittest.TestLoader.loadTestsFromModule which collects classes sorted by name"""
+        module: ModuleInfo = self._modules[module_name]
+        names: set[str] = {class_info.name for class_info in module.classes} | {name for _, name in module.imports}
+        test_ids: list[str] = []
+        for name in sorted(names):
+            found: tuple[str, ClassInfo] | None = self._find_class(module_name, name)
+            methods: list[str] | None = None if found is None else self._get_test_methods(*found)
+            if methods is not None:
+                test_ids.extend(f'{found[0]}.{found[1].name}.{method}' for method in methods)
+
+        return test_ids
+
+
+def iter_test_files(start_dir: str, pattern: str, top_level_dir: str) -> Iterator[tuple[str, str]]:
+    """Yields paths and module names of the files unittest discovery would import"""
+    for dir_path, dir_names, file_names in os.walk(start_dir):
+        dir_names[:] = sorted(name for name in dir_names if os.path.isfile(os.path.join(dir_path, name, '__init__.py')))
+        for file_name in sorted(file_names):
+            if file_name.endswith('.py') and fnmatch(file_name, pattern):
+                path: str = os.path.join(dir_path, file_name)
+                relative_path: str = os.path.relpath(os.path.splitext(path)[0], top_level_dir)
+                yield path, relative_path.replace(os.sep, '.')
+
+
+def _read_cache(path: str) -> dict[str, ModuleInfo]:
+    return {file_path: ModuleInfo(**{**info, 'classes': [ClassInfo(**class_info) for class_info in info['classes']],
+                                     'imports': [tuple(item) for item in info['imports']]})
+            for file_path, info in read_cache(path, _INDEX_VERSION).items()}
+
+
+def _write_cache(path: str, modules: dict[str, ModuleInfo]) -> None:
+    write_cache(path, _INDEX_VERSION, {file_path: asdict(info) for file_path, info in modules.items()})
+
+
+def build_index(start_dir: str, pattern: str, top_level_dir: str | None = None,
+                cache_path: str | None = DEFAULT_INDEX_PATH) -> StaticIndex:
+    """Parses the test files which were changed since the cached index was written"""
+    top_level_dir = os.path.abspath(start_dir if top_level_dir is None else top_level_dir)
+    cached: dict[str, ModuleInfo] = {} if cache_path is None else _read_cache(cache_path)
+
+    modules: dict[str, ModuleInfo] = {}
+    for path, module_name in iter_test_files(os.path.abspath(start_dir), pattern, top_level_dir):
+        stat: os.stat_result = os.stat(path)
+        info: ModuleInfo | None = cached.get(path)
+        if info is None or info.name != module_name or (info.mtime_ns, info.size) != (stat.st_mtime_ns, stat.st_size):
+            info = parse_module(path, module_name)
+        modules[path] = info
+
+    if cache_path is not None and modules != cached:
+        _write_cache(cache_path, modules)
+
+    return StaticIndex(list(modules.values()))
+
+
+def matches(test_id: str, patterns: list[str]) -> bool:
+    """Patterns are globs matching either the whole test id or its prefix: module, class, package"""
+    return compile_globs(tuple(patterns)).match(test_id) is not None
+
+
+@dataclass
+class Selection:
+    # ids of the selected tests by the modules containing them
+    test_ids: dict[str, list[str]]
+    # modules which have to be imported to find out whether they contain the selected tests
+    dynamic_modules: list[str]
+
+    @property
+    def module_names(self) -> tuple[str, ...]:
+        return tuple(list(self.test_ids) + self.dynamic_modules)
+
+
+def select_tests(index: StaticIndex, patterns: list[str]) -> Selection:
+    selection: Selection = Selection({}, [])
+    for module in index.modules:
+        if module.dynamic:
+            selection.dynamic_modules.append(module.name)
+            continue
+        test_ids: list[str] = [test_id for test_id in index.get_test_ids(module.name) if matches(test_id, patterns)]
+        if len(test_ids) > 0:
+            selection.test_ids[module.name] = test_ids
+
+    return selection
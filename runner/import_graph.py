@@ -0,0 +1,174 @@
+"""Graph of imports between the modules of the repository used to run only the tests affected by a change.
+
+Imports are found with ast (including the ones inside functions), parsed files are cached on disk by modification time.
+Imports of modules which can't be found by path (e.g. namespace package portions) are attributed to the nearest
+existing parent package, so the graph could select more tests than needed, but not less.
+"""
+import ast
+import os
+import subprocess
+from collections import defaultdict, deque
+from typing import Iterator
+
+from constants import OUTPUT_PATH
+from runner.json_cache import read_cache, write_cache
+
+DEFAULT_GRAPH_PATH: str = os.path.join(OUTPUT_PATH, 'import_graph.json')
+_GRAPH_VERSION: int = 1
+# changes of the documentation don't affect the tests, changes of the other files which aren't python modules (images,
+# notebooks, environment files, ...) could affect any test
+_DOCUMENTATION_EXTENSIONS: tuple[str, ...] = ('.md',)
+
+
+def _is_environment_dir(path: str) -> bool:
+    return os.path.exists(os.path.join(path, 'pyvenv.cfg')) or os.path.isdir(os.path.join(path, 'conda-meta'))
+
+
+def get_module_name(relative_path: str) -> str:
+    parts: list[str] = os.path.splitext(os.path.normpath(relative_path))[0].split(os.sep)
+    if parts[-1] == '__init__':
+        parts.pop()
+
+    return '.'.join(parts)
+
+
+def get_node_name(root_dir: str, relative_path: str) -> str:
+    """Returns name of the module, files of namespace package portions (see python/imports/part1/__init__.py) are
+    attributed to the nearest regular package because they could be imported under the other package name"""
+    directory: str = os.path.dirname(os.path.normpath(relative_path))
+    package: str = directory
+    while package != '' and not os.path.isfile(os.path.join(root_dir, package, '__init__.py')):
+        package = os.path.dirname(package)
+    if package in ('', directory):
+        return get_module_name(relative_path)
+
+    return get_module_name(os.path.join(package, '__init__.py'))
+
+
+def iter_python_files(root_dir: str) -> Iterator[str]:
+    """Yields paths of the python files of the repository relative to the root directory"""
+    for dir_path, dir_names, file_names in os.walk(root_dir):
+        dir_names[:] = sorted(name for name in dir_names if not name.startswith(('.', '__pycache__'))
+                              and not _is_environment_dir(os.path.join(dir_path, name)))
+        for file_name in sorted(file_names):
+            if file_name.endswith('.py'):
+                yield os.path.relpath(os.path.join(dir_path, file_name), root_dir)
+
+
+def parse_imports(path: str, module_name: str, is_package: bool) -> list[str]:
+    """Returns absolute names of the imported modules, "from a import b" yields both "a" and "a.b"."""
+    with open(path, 'rb') as file:
+        tree: ast.Module = ast.parse(file.read(), path)
+
+    package: list[str] = module_name.split('.') if is_package else module_name.split('.')[:-1]
+    imports: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            parent_parts: list[str] = package[:len(package) - node.level + 1] if node.level > 0 else []
+            parent: str = '.'.join(parent_parts + ([node.module] if node.module else []))
+            imports.add(parent)
+            imports.update(f'{parent}.{alias.name}' for alias in node.names if alias.name != '*')
+    imports.discard('')
+
+    return sorted(imports)
+
+
+class ImportGraph:
+    _root_dir: str
+    _modules: set[str]
+    _importers: dict[str, set[str]]
+
+    def __init__(self, root_dir: str, imports: dict[str, list[str]]):
+        """Imports are names of the imported modules by the path of the importing file relative to the root"""
+        self._root_dir = root_dir
+        self._modules = {get_node_name(root_dir, path) for path in imports}
+        self._importers = defaultdict(set)
+        for path, imported_names in imports.items():
+            module: str = get_node_name(root_dir, path)
+            for imported in imported_names:
+                resolved: str | None = self.resolve(imported)
+                if resolved is None:
+                    continue
+                # importing of a module imports all of its parent packages
+                parts: list[str] = resolved.split('.')
+                for i in range(1, len(parts) + 1):
+                    parent: str = '.'.join(parts[:i])
+                    if parent in self._modules and parent != module:
+                        self._importers[parent].add(module)
+
+    def resolve(self, name: str) -> str | None:
+        """Returns the module itself or its nearest existing parent, None for the modules outside the repository"""
+        parts: list[str] = name.split('.')
+        while len(parts) > 0:
+            candidate: str = '.'.join(parts)
+            if candidate in self._modules:
+                return candidate
+            parts.pop()
+
+        return None
+
+    def get_affected(self, changed_files: list[str]) -> set[str]:
+        """Returns the modules of the changed files and all the modules which import them directly or transitively"""
+        affected: set[str] = set()
+        queue: deque[str] = deque(module for module in (self.resolve(get_node_name(self._root_dir, path))
+                                                        for path in changed_files if path.endswith('.py'))
+                                  if module is not None)
+        while len(queue) > 0:
+            module: str = queue.popleft()
+            if module in affected:
+                continue
+            affected.add(module)
+            queue.extend(self._importers[module] - affected)
+
+        return affected
+
+
+def build_graph(root_dir: str, cache_path: str | None = DEFAULT_GRAPH_PATH) -> ImportGraph:
+    cached: dict[str, dict] = {} if cache_path is None else read_cache(cache_path, _GRAPH_VERSION)
+
+    files: dict[str, dict] = {}
+    for relative_path in iter_python_files(root_dir):
+        stat: os.stat_result = os.stat(os.path.join(root_dir, relative_path))
+        entry: dict | None = cached.get(relative_path)
+        if entry is None or (entry['mtime_ns'], entry['size']) != (stat.st_mtime_ns, stat.st_size):
+            try:
+                imports: list[str] = parse_imports(os.path.join(root_dir, relative_path),
+                                                   get_module_name(relative_path),
+                                                   os.path.basename(relative_path) == '__init__.py')
+            except SyntaxError:
+                imports = []
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'imports': imports}
+        files[relative_path] = entry
+
+    if cache_path is not None and files != cached:
+        write_cache(cache_path, _GRAPH_VERSION, files)
+
+    return ImportGraph(root_dir, {path: entry['imports'] for path, entry in files.items()})
+
+
+def get_changed_files(base: str = 'HEAD', root_dir: str = '.') -> list[str]:
+    """Returns paths relative to the root directory changed since the commit including the untracked files"""
+    def git(*args: str) -> list[str]:
+        output: str = subprocess.run(('git', *args), cwd=root_dir, check=True, capture_output=True, text=True).stdout
+        return [line for line in output.splitlines() if len(line) > 0]
+
+    paths: list[str] = git('diff', '--name-only', '--relative', base) \
+        + git('ls-files', '--others', '--exclude-standard')
+
+    return sorted(set(path.replace('/', os.sep) for path in paths))
+
+
+def select_affected_modules(graph: ImportGraph, changed_files: list[str], test_modules: list[str]) -> list[str] | None:
+    """Returns test modules affected by the changes in the original order, None if all of them could be affected.
+
+    The graph knows only the imports, the data files read by the tests aren't tracked, so any change of a file which is
+    neither a python module nor the documentation selects all the tests.
+    """
+    if any(not path.endswith(('.py',) + _DOCUMENTATION_EXTENSIONS) for path in changed_files):
+        return None
+
+    affected: set[str] = graph.get_affected(changed_files)
+
+    return [module for module in test_modules if module in affected]
@@ -0,0 +1,166 @@
+"""Import time profile of the test discovery or of a single module.
+
+The target is imported in a subprocess with "python -X importtime", the printed tree of imports is aggregated by top
+level packages: self time of all the modules of the package and cumulative time of the imports entering the package
+from the other packages, which includes the dependencies the package pulls in. Every package is attributed to the
+modules of the repository which imported it first (python reports only the first import of a module), i.e. to the
+nearest ancestors in the tree which belong to the repository.
+"""
+import json
+import os
+import subprocess
+import sys
+from argparse import ArgumentParser, Namespace
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, TextIO
+
+from runner.import_graph import get_module_name, iter_python_files
+
+_DISCOVERY_CODE: str = 'import unittest; unittest.defaultTestLoader.discover({start_dir!r}, {pattern!r})'
+_REPORT_IMPORTERS: int = 3
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_time: int  # microseconds
+    cumulative_time: int
+    children: list['ImportRecord'] = field(default_factory=list)
+
+    @property
+    def package(self) -> str:
+        return self.name.partition('.')[0]
+
+
+@dataclass
+class PackageCost:
+    package: str
+    self_time: int  # microseconds, sum of the package modules import time without their dependencies
+    modules: int = 0
+    importers: list[str] = field(default_factory=list)
+    # microseconds, sum of the import time with the dependencies of the package modules imported by other packages
+    cumulative_time: int = 0
+
+
+def parse_importtime(lines: Iterable[str]) -> list[ImportRecord]:
+    """Returns the roots of the imports tree, children are printed before their parents with larger indentation"""
+    children_by_depth: dict[int, list[ImportRecord]] = {}
+    for line in lines:
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_part, cumulative_part, name_part = line.removeprefix('import time:').split('|')
+        name: str = name_part.rstrip()
+        depth: int = (len(name) - len(name.lstrip()) - 1) // 2
+        record: ImportRecord = ImportRecord(name.strip(), int(self_part), int(cumulative_part),
+                                            children_by_depth.pop(depth + 1, []))
+        children_by_depth.setdefault(depth, []).append(record)
+
+    return children_by_depth.get(0, [])
+
+
+def get_project_packages(root_dir: str) -> set[str]:
+    return {get_module_name(path).partition('.')[0] for path in iter_python_files(root_dir)}
+
+
+def aggregate(roots: list[ImportRecord], project_packages: set[str]) -> dict[str, PackageCost]:
+    costs: dict[str, PackageCost] = {}
+    # (record, the nearest module of the repository among the ancestors of the record, package of the parent)
+    stack: list[tuple[ImportRecord, str | None, str | None]] = [(root, None, None) for root in reversed(roots)]
+    while len(stack) > 0:
+        record, importer, parent_package = stack.pop()
+        cost: PackageCost = costs.setdefault(record.package, PackageCost(record.package, 0))
+        cost.self_time += record.self_time
+        cost.modules += 1
+        if parent_package != record.package:
+            # the children of the record from the same package are included in its cumulative time
+            cost.cumulative_time += record.cumulative_time
+        if importer is not None and importer.partition('.')[0] != record.package and importer not in cost.importers:
+            cost.importers.append(importer)
+
+        child_importer: str | None = record.name if record.package in project_packages else importer
+        stack.extend((child, child_importer, record.package) for child in reversed(record.children))
+
+    return costs
+
+
+def profile(code: str, cwd: str = '.') -> list[ImportRecord]:
+    """Runs the python code in a subprocess and returns its imports tree, raises RuntimeError with the errors of the
+    subprocess if the code fails"""
+    process: subprocess.CompletedProcess = subprocess.run((sys.executable, '-X', 'importtime', '-c', code), cwd=cwd,
+                                                          check=False, capture_output=True, text=True)
+    lines: list[str] = process.stderr.splitlines()
+    if process.returncode != 0:
+        errors: str = '\n'.join(line for line in lines if not line.startswith('import time:'))
+        raise RuntimeError(f'Profiled code exited with code {process.returncode}:\n{errors}')
+
+    return parse_importtime(lines)
+
+
+def write_report(path: str, costs: dict[str, PackageCost]) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'packages': {package: asdict(cost) for package, cost in sorted(costs.items())}}, file, indent=2)
+
+
+def read_report(path: str) -> dict[str, PackageCost]:
+    with open(path, encoding='utf-8') as file:
+        return {package: PackageCost(**cost) for package, cost in json.load(file)['packages'].items()}
+
+
+def _format_importers(importers: list[str]) -> str:
+    shown: str = ', '.join(importers[:_REPORT_IMPORTERS])
+
+    return shown if len(importers) <= _REPORT_IMPORTERS else f'{shown} (+{len(importers) - _REPORT_IMPORTERS})'
+
+
+def print_report(stream: TextIO, costs: dict[str, PackageCost], baseline: dict[str, PackageCost] | None = None,
+                 limit: int | None = None) -> None:
+    """Prints packages sorted by import time, changes are shown relative to the baseline if it is given"""
+    total: int = sum(cost.self_time for cost in costs.values())
+    stream.write(f'Total import time: {total / 1000:.1f}ms')
+    if baseline is not None:
+        stream.write(f' ({(total - sum(cost.self_time for cost in baseline.values())) / 1000:+.1f}ms)')
+    stream.write('\n')
+
+    ordered: list[PackageCost] = sorted(costs.values(), key=lambda cost: cost.self_time, reverse=True)
+    for cost in ordered[:limit]:
+        line: str = f'{cost.package:<30} {cost.self_time / 1000:>9.1f}ms {cost.self_time / max(total, 1):>6.1%}' \
+            f' {cost.cumulative_time / 1000:>9.1f}ms cumulative'
+        if baseline is not None:
+            previous: PackageCost | None = baseline.get(cost.package)
+            line += ' new' if previous is None else f' {(cost.self_time - previous.self_time) / 1000:+9.1f}ms'
+        if len(cost.importers) > 0:
+            line += f'  imported by {_format_importers(cost.importers)}'
+        stream.write(f'{line}\n')
+
+    if baseline is not None:
+        removed: list[str] = sorted(set(baseline) - set(costs), key=lambda name: baseline[name].self_time, reverse=True)
+        for package in removed[:limit]:
+            stream.write(f'{package:<30} removed ({baseline[package].self_time / 1000:.1f}ms)\n')
+
+
+def _parse_args() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(description='Reports import time of the packages by the test discovery '
+                                                        'or by the import of the module')
+    parser.add_argument('--module', help='dotted name of the module to import instead of the test discovery')
+    parser.add_argument('--pattern', default='test*.py', help='pattern of the test files, test*.py by default')
+    parser.add_argument('--limit', type=int, default=30, help='number of the most expensive packages to print')
+    parser.add_argument('--report', metavar='PATH', help='write import time of the packages to the JSON file')
+    parser.add_argument('--baseline', metavar='PATH', help='show changes relative to the JSON file written by --report')
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: Namespace = _parse_args()
+    root_dir: str = os.path.abspath('.')
+    code: str = f'import {args.module}' if args.module is not None else \
+        _DISCOVERY_CODE.format(start_dir='.', pattern=args.pattern)
+
+    try:
+        roots: list[ImportRecord] = profile(code, root_dir)
+    except RuntimeError as error:
+        sys.exit(str(error))
+    costs: dict[str, PackageCost] = aggregate(roots, get_project_packages(root_dir))
+    print_report(sys.stdout, costs, None if args.baseline is None else read_report(args.baseline), args.limit)
+    if args.report is not None:
+        write_report(args.report, costs)
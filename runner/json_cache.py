@@ -0,0 +1,20 @@
+"""Versioned JSON files caching the results of parsing the files of the repository, keyed by file path."""
+import json
+import os
+
+
+def read_cache(path: str, version: int) -> dict[str, dict]:
+    """Returns the cached entries, empty when the file is missing, corrupted or written by another version"""
+    try:
+        with open(path, encoding='utf-8') as file:
+            content: dict = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    return content['files'] if isinstance(content, dict) and content.get('version') == version else {}
+
+
+def write_cache(path: str, version: int, files: dict[str, dict]) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'version': version, 'files': files}, file)
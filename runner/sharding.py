@@ -0,0 +1,186 @@
+import io
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import TextIO
+from unittest import TestCase, TestResult, TestSuite, TextTestResult
+
+from runner.discovery import TestSource, load_tests
+from runner.suite_filter import flatten_suite
+from runner.timing import Measurement
+
+# test modules that share external state (e.g. files under constants.OUTPUT_PATH) declare the same
+# value of this attribute to be run sequentially by the same worker
+SHARD_GROUP_ATTRIBUTE: str = 'SHARD_GROUP'
+
+
+class WritelnStream:
+    _stream: TextIO
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+
+    def write(self, text: str) -> None:
+        self._stream.write(text)
+
+    def writeln(self, text: str = '') -> None:
+        self._stream.write(f'{text}\n')
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+class _RemoteTest:
+    """Stands for the tests which exist only in a worker process, e.g. failed setUpClass fixtures"""
+    _test_id: str
+
+    def __init__(self, test_id: str):
+        self._test_id = test_id
+
+    def id(self) -> str:
+        return self._test_id
+
+    def shortDescription(self) -> None:  # pylint: disable=invalid-name
+        return None
+
+    def __str__(self) -> str:
+        return self._test_id
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class ShardReport:
+    tests_run: int
+    output: str
+    failures: list[tuple[str, str]]
+    errors: list[tuple[str, str]]
+    skipped: list[tuple[str, str]]
+    expected_failures: list[tuple[str, str]]
+    unexpected_successes: list[str]
+    # filled by the result classes recording timings, e.g. runner.timing.TimingTestResult
+    timings: dict[str, Measurement] = field(default_factory=dict)
+
+
+def get_shard_key(test: TestCase) -> str:
+    module_name: str = type(test).__module__
+    if module_name.split('.')[0] == 'unittest':
+        # FunctionTestCase, _FailedTest and so on don't belong to the module they were loaded from
+        return test.id()
+
+    return getattr(sys.modules.get(module_name), SHARD_GROUP_ATTRIBUTE, module_name)
+
+
+def split_into_shards(tests: list[TestCase]) -> list[tuple[str, ...]]:
+    shards: dict[str, list[str]] = defaultdict(list)
+    for test in tests:
+        shards[get_shard_key(test)].append(test.id())
+
+    # the largest shards go first for the pool to balance the rest of them
+    return sorted((tuple(test_ids) for test_ids in shards.values()), key=len, reverse=True)
+
+
+def _get_ids(pairs: list[tuple[TestCase, str]]) -> list[tuple[str, str]]:
+    return [(test.id(), text) for test, text in pairs]
+
+
+def run_shard(source: TestSource, test_ids: tuple[str, ...], verbosity: int,
+              resultclass: type[TextTestResult] = TextTestResult) -> ShardReport:
+    selected: set[str] = set(test_ids)
+    suite: TestSuite = TestSuite(test for test in load_tests(source) if test.id() in selected)
+
+    output: io.StringIO = io.StringIO()
+    result: TextTestResult = resultclass(WritelnStream(output), True, verbosity)
+    result.startTestRun()
+    try:
+        suite.run(result)
+    finally:
+        result.stopTestRun()
+
+    return ShardReport(
+            tests_run=result.testsRun,
+            output=output.getvalue(),
+            failures=_get_ids(result.failures),
+            errors=_get_ids(result.errors),
+            skipped=_get_ids(result.skipped),
+            expected_failures=_get_ids(result.expectedFailures),
+            unexpected_successes=[test.id() for test in result.unexpectedSuccesses],
+            timings=getattr(result, 'timings', {}),
+    )
+
+
+def merge_report(result: TestResult, report: ShardReport, tests_by_id: dict[str, TestCase]) -> None:
+    def get_test(test_id: str) -> TestCase | _RemoteTest:
+        test: TestCase | None = tests_by_id.get(test_id)
+        return _RemoteTest(test_id) if test is None else test
+
+    result.testsRun += report.tests_run
+    result.failures.extend((get_test(test_id), text) for test_id, text in report.failures)
+    result.errors.extend((get_test(test_id), text) for test_id, text in report.errors)
+    result.skipped.extend((get_test(test_id), text) for test_id, text in report.skipped)
+    result.expectedFailures.extend((get_test(test_id), text) for test_id, text in report.expected_failures)
+    result.unexpectedSuccesses.extend(get_test(test_id) for test_id in report.unexpected_successes)
+    if hasattr(result, 'timings'):
+        result.timings.update(report.timings)
+
+
+def print_summary(stream: WritelnStream, result: TestResult, time_taken: float) -> None:
+    """Mimics the tail of the unittest.TextTestRunner.run output"""
+    stream.writeln(TextTestResult.separator2)
+    stream.writeln(f'Ran {result.testsRun} test{"" if result.testsRun == 1 else "s"} in {time_taken:.3f}s')
+    stream.writeln()
+
+    infos: list[str] = []
+    for name, items in (('failures', result.failures), ('errors', result.errors), ('skipped', result.skipped),
+                        ('expected failures', result.expectedFailures),
+                        ('unexpected successes', result.unexpectedSuccesses)):
+        if len(items) > 0:
+            infos.append(f'{name}={len(items)}')
+    status: str = 'OK' if result.wasSuccessful() else 'FAILED'
+    stream.writeln(f'{status} ({", ".join(infos)})' if len(infos) > 0 else status)
+    stream.flush()
+
+
+class ShardedTestRunner:
+    """Runs the test modules of a discovered suite in a pool of processes and merges their results.
+
+    Workers receive test ids only and load the tests from the same source on their side, so the suite does not have
+    to be picklable.
+    """
+    _jobs: int
+    _source: TestSource
+    _verbosity: int
+    _stream: WritelnStream
+    _resultclass: type[TextTestResult]
+
+    def __init__(self, jobs: int, source: TestSource, verbosity: int = 1, stream: TextIO | None = None,
+                 resultclass: type[TextTestResult] = TextTestResult):
+        self._jobs = jobs
+        self._source = source
+        self._verbosity = verbosity
+        self._stream = WritelnStream(sys.stderr if stream is None else stream)
+        self._resultclass = resultclass
+
+    def run(self, suite: TestSuite) -> TestResult:
+        tests: list[TestCase] = flatten_suite(suite)
+        tests_by_id: dict[str, TestCase] = {test.id(): test for test in tests}
+        result: TextTestResult = self._resultclass(self._stream, True, self._verbosity)
+
+        start_time: float = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self._jobs) as executor:
+            futures: list[Future] = [
+                executor.submit(run_shard, self._source, shard, self._verbosity, self._resultclass)
+                for shard in split_into_shards(tests)
+            ]
+            for future in as_completed(futures):
+                report: ShardReport = future.result()
+                self._stream.write(report.output)
+                self._stream.flush()
+                merge_report(result, report, tests_by_id)
+        time_taken: float = time.perf_counter() - start_time
+
+        result.printErrors()
+        print_summary(self._stream, result, time_taken)
+
+        return result
@@ -0,0 +1,121 @@
+"""Filtering of test suites which is cheap for large suites.
+
+Suites are flattened once and test ids are computed once, filtered suites are flat, what is enough for TestSuite.run
+to handle class and module fixtures.
+"""
+import re
+from fnmatch import translate
+from functools import lru_cache
+from typing import Callable, Iterable, TypeVar
+from unittest import TestCase, TestSuite
+
+TestPredicate = Callable[[str, TestCase], bool]
+_Decorated = TypeVar('_Decorated', bound=Callable | type)
+
+TAGS_ATTRIBUTE: str = 'test_tags'
+_END_ANCHOR: re.Pattern = re.compile(r'\\[Zz]$')
+
+
+def flatten_suite(test: TestSuite | TestCase) -> list[TestCase]:
+    """Returns test cases in the running order, suites and test cases could be mixed at any level"""
+    tests: list[TestCase] = []
+    stack: list[Iterable[TestSuite | TestCase]] = [iter((test,))]
+    while len(stack) > 0:
+        item: TestSuite | TestCase | None = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+        elif isinstance(item, TestSuite):
+            stack.append(iter(item))
+        else:
+            tests.append(item)
+
+    return tests
+
+
+class TestIndex:
+    tests: list[TestCase]
+    ids: list[str]
+    _positions: dict[str, list[int]]
+
+    def __init__(self, suite: TestSuite | TestCase):
+        self.tests = flatten_suite(suite)
+        self.ids = [test.id() for test in self.tests]
+        self._positions = {}
+        for position, test_id in enumerate(self.ids):
+            self._positions.setdefault(test_id, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.tests)
+
+    def __contains__(self, test_id: str) -> bool:
+        return test_id in self._positions
+
+    def get(self, test_id: str) -> TestCase | None:
+        positions: list[int] | None = self._positions.get(test_id)
+
+        return None if positions is None else self.tests[positions[0]]
+
+    def select(self, test_ids: Iterable[str]) -> TestSuite:
+        """Returns the tests with the given ids in the original order"""
+        positions: list[int] = sorted(position for test_id in set(test_ids)
+                                      for position in self._positions.get(test_id, ()))
+
+        return TestSuite(self.tests[position] for position in positions)
+
+    def filter(self, *predicates: TestPredicate) -> TestSuite:
+        """Returns the tests matching all the predicates in the original order"""
+        if len(predicates) == 1:
+            predicate: TestPredicate = predicates[0]
+            return TestSuite(test for test_id, test in zip(self.ids, self.tests) if predicate(test_id, test))
+
+        return TestSuite(test for test_id, test in zip(self.ids, self.tests)
+                         if all(predicate(test_id, test) for predicate in predicates))
+
+
+@lru_cache(maxsize=128)
+def compile_globs(patterns: tuple[str, ...]) -> re.Pattern:
+    """Globs match either the whole test id or its prefix: package, module, class"""
+    # the end of the glob is anchored to the end of the id or to a dot instead of matching "pattern.*" separately,
+    # translate ends the expression with \Z which is spelled \z since Python 3.14
+    globs: str = '|'.join(_END_ANCHOR.sub('', translate(pattern)) for pattern in patterns)
+
+    return re.compile(rf'(?:{globs})(?:\.|\Z)')
+
+
+def by_id(predicate: Callable[[str], bool]) -> TestPredicate:
+    return lambda test_id, _: predicate(test_id)
+
+
+def by_glob(*patterns: str) -> TestPredicate:
+    compiled: re.Pattern = compile_globs(patterns)
+
+    return lambda test_id, _: compiled.match(test_id) is not None
+
+
+def by_regex(pattern: str) -> TestPredicate:
+    compiled: re.Pattern = re.compile(pattern)
+
+    return lambda test_id, _: compiled.search(test_id) is not None
+
+
+def tag(*tags: str) -> Callable[[_Decorated], _Decorated]:
+    """Marks a test method or a test case class to be selected by by_tag predicate"""
+    def decorator(decorated: _Decorated) -> _Decorated:
+        setattr(decorated, TAGS_ATTRIBUTE, frozenset(tags) | getattr(decorated, TAGS_ATTRIBUTE, frozenset()))
+        return decorated
+
+    return decorator
+
+
+def get_tags(test: TestCase) -> frozenset[str]:
+    method_name: str = test.id().rpartition('.')[2]
+    method: Callable | None = getattr(type(test), method_name, None)
+
+    return getattr(type(test), TAGS_ATTRIBUTE, frozenset()) | getattr(method, TAGS_ATTRIBUTE, frozenset())
+
+
+def by_tag(*tags: str) -> TestPredicate:
+    """Selects tests having any of the tags"""
+    required: frozenset[str] = frozenset(tags)
+
+    return lambda _, test: not required.isdisjoint(get_tags(test))
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+from runner.discovery import ModuleInfo, Selection, StaticIndex, build_index, matches, parse_module, select_tests
+from runner.suite_filter import flatten_suite
+
+_root_dir: str = dirname(dirname(abspath(__file__)))
+
+
+class TestStaticDiscovery(TestCase):
+    def test_same_ids_as_loader(self) -> None:
+        index: StaticIndex = build_index(join(_root_dir, 'python'), 'test*.py', _root_dir, cache_path=None)
+
+        for module in index.modules:
+            if module.dynamic:
+                continue
+            with self.subTest(module=module.name):
+                loaded_ids: list[str] = [test.id() for test in
+                                         flatten_suite(unittest.defaultTestLoader.loadTestsFromName(module.name))]
+                self.assertEqual(index.get_test_ids(module.name), loaded_ids)
+
+    def test_custom_load_tests_is_dynamic(self) -> None:
+        module: ModuleInfo = parse_module(join(_root_dir, 'python', 'unittest', 'test_custom_test_case.py'),
+                                          'python.unittest.test_custom_test_case')
+
+        self.assertTrue(module.dynamic)
+
+    def test_selection(self) -> None:
+        index: StaticIndex = build_index(join(_root_dir, 'python'), 'test*.py', _root_dir, cache_path=None)
+        selection: Selection = select_tests(index, ['python.data_model.test_slots'])
+
+        self.assertEqual(selection.test_ids,
+                         {'python.data_model.test_slots': ['python.data_model.test_slots.TestSlots.test_slots']})
+        self.assertIn('python.imports.test_import_package_module', selection.dynamic_modules)
+
+    def test_cache_is_invalidated_by_modification(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path: str = join(directory, 'index.json')
+            test_path: str = join(directory, 'test_module.py')
+            with open(test_path, 'w', encoding='utf-8') as file:
+                file.write('from unittest import TestCase\n\n\nclass TestA(TestCase):\n    def test_a(self): pass\n')
+            self.assertEqual(build_index(directory, 'test*.py', cache_path=cache_path).get_test_ids('test_module'),
+                             ['test_module.TestA.test_a'])
+
+            with open(test_path, 'a', encoding='utf-8') as file:
+                file.write('\n    def test_b(self): pass\n')
+            os.utime(test_path, ns=(0, 0))
+            self.assertEqual(build_index(directory, 'test*.py', cache_path=cache_path).get_test_ids('test_module'),
+                             ['test_module.TestA.test_a', 'test_module.TestA.test_b'])
+
+
+class TestMatches(TestCase):
+    def test_prefixes(self) -> None:
+        test_id: str = 'numpy_.test_ndarrays.TestNdArrays.test_masking'
+
+        self.assertTrue(matches(test_id, ['numpy_']))
+        self.assertTrue(matches(test_id, ['numpy_.test_ndarrays.TestNdArrays']))
+        self.assertTrue(matches(test_id, ['*masking']))
+        self.assertFalse(matches(test_id, ['numpy']))
@@ -0,0 +1,52 @@
+import tempfile
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+from runner.import_graph import ImportGraph, build_graph, parse_imports, select_affected_modules
+
+_root_dir: str = dirname(dirname(abspath(__file__)))
+
+
+class TestImportGraph(TestCase):
+    _graph: ImportGraph
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._graph = build_graph(_root_dir, cache_path=None)
+
+    def test_transitive_importers(self) -> None:
+        affected: set[str] = self._graph.get_affected([join('python', 'statements', 'test_del_statement.py')])
+
+        self.assertEqual(affected, {'python.statements.test_del_statement',
+                                    'python.imports.test_import_package_module'})
+
+    def test_shared_module(self) -> None:
+        affected: set[str] = self._graph.get_affected([join('tensorflow_', 'suppress_tf_warning.py')])
+
+        self.assertIn('tensorflow_.keras_.tf_test_custom_loss_and_metric', affected)
+        self.assertNotIn('tensorflow_.tf_test_tensors', affected)
+
+    def test_namespace_package_portion(self) -> None:
+        affected: set[str] = self._graph.get_affected([join('python', 'imports', 'part2', 'variable.py')])
+
+        self.assertIn('python.imports.test_multiple_directories_package', affected)
+
+    def test_select_affected_modules(self) -> None:
+        test_modules: list[str] = ['numpy_.test_ndarrays', 'pytorch.test_saving_model', 'pandas_.test_dataframe']
+
+        self.assertEqual(select_affected_modules(self._graph, ['constants.py', 'Readme.md'], test_modules),
+                         ['pytorch.test_saving_model'])
+        self.assertIsNone(select_affected_modules(self._graph, ['environment.yml'], test_modules))
+        self.assertIsNone(select_affected_modules(self._graph, ['Readme.md', join('images', 'animal.jpg')],
+                                                  test_modules))
+
+
+class TestParseImports(TestCase):
+    def test_relative_imports(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = join(directory, 'module.py')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('from . import sibling\nfrom ..other import name\n\n\ndef f():\n    import json\n')
+
+            self.assertEqual(parse_imports(path, 'package.sub.module', is_package=False),
+                             ['json', 'package.other', 'package.other.name', 'package.sub', 'package.sub.sibling'])
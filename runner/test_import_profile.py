@@ -0,0 +1,54 @@
+import io
+from os.path import abspath, dirname
+from unittest import TestCase
+
+from runner.import_profile import (ImportRecord, PackageCost, aggregate, get_project_packages, parse_importtime,
+                                   print_report, profile)
+
+_root_dir: str = dirname(dirname(abspath(__file__)))
+
+_OUTPUT: list[str] = [
+    'import time: self [us] | cumulative | imported package',
+    'import time:        10 |         10 |       numpy.core',
+    'import time:       100 |        110 |     numpy',
+    'import time:         5 |        115 |   numpy_.arrays',
+    'import time:         1 |        116 | numpy_',
+    'import time:        20 |         20 |   numpy',
+    'import time:         2 |         22 | pandas_.frames',
+]
+
+
+class TestImportProfile(TestCase):
+    def test_parse_importtime(self) -> None:
+        roots: list[ImportRecord] = parse_importtime(_OUTPUT)
+
+        self.assertEqual([root.name for root in roots], ['numpy_', 'pandas_.frames'])
+        self.assertEqual(roots[0].cumulative_time, 116)
+        self.assertEqual(roots[0].children[0].children[0].children[0].name, 'numpy.core')
+
+    def test_aggregate(self) -> None:
+        costs: dict[str, PackageCost] = aggregate(parse_importtime(_OUTPUT), {'numpy_', 'pandas_'})
+
+        # numpy.core is a part of the cumulative time of numpy imported by numpy_.arrays
+        self.assertEqual(costs['numpy'], PackageCost('numpy', 130, 3, ['numpy_.arrays', 'pandas_.frames'], 130))
+        self.assertEqual(costs['numpy_'].cumulative_time, 116)
+        self.assertEqual(costs['numpy_'].importers, [])
+
+    def test_print_report_with_baseline(self) -> None:
+        stream: io.StringIO = io.StringIO()
+        print_report(stream, {'numpy': PackageCost('numpy', 3000)},
+                     {'numpy': PackageCost('numpy', 1000), 'scipy': PackageCost('scipy', 500)})
+
+        self.assertEqual(stream.getvalue().splitlines()[1:],
+                         [f'{"numpy":<30}       3.0ms 100.0%       0.0ms cumulative      +2.0ms',
+                          f'{"scipy":<30} removed (0.5ms)'])
+
+    def test_profile_module(self) -> None:
+        costs: dict[str, PackageCost] = aggregate(profile('import runner.discovery', _root_dir),
+                                                  get_project_packages(_root_dir))
+
+        self.assertIn('runner.discovery', costs['ast'].importers)
+
+    def test_profile_failed_import(self) -> None:
+        with self.assertRaisesRegex(RuntimeError, 'ModuleNotFoundError'):
+            profile('import does_not_exist', _root_dir)
@@ -0,0 +1,54 @@
+import io
+import sys
+import unittest
+from os.path import abspath, dirname, join
+from types import ModuleType
+from unittest import TestCase, TestResult
+
+from runner.discovery import TestSource
+from runner.sharding import SHARD_GROUP_ATTRIBUTE, ShardedTestRunner, split_into_shards
+
+_root_dir: str = dirname(dirname(abspath(__file__)))
+
+
+def _make_test_class(module_name: str) -> type[TestCase]:
+    def test_nothing(_) -> None:
+        pass
+
+    return type('TestNothing', (TestCase,), {'__module__': module_name, 'test_first': test_nothing,
+                                             'test_second': test_nothing})
+
+
+class TestSplitIntoShards(TestCase):
+    _module_names: tuple[str, ...] = ('shard_module_a', 'shard_module_b', 'shard_module_c')
+
+    def setUp(self) -> None:
+        for name in self._module_names:
+            sys.modules[name] = ModuleType(name)
+        setattr(sys.modules['shard_module_b'], SHARD_GROUP_ATTRIBUTE, 'group')
+        setattr(sys.modules['shard_module_c'], SHARD_GROUP_ATTRIBUTE, 'group')
+
+    def tearDown(self) -> None:
+        for name in self._module_names:
+            del sys.modules[name]
+
+    def test_modules_of_group_stay_together(self) -> None:
+        tests: list[TestCase] = [test_class(method) for test_class in map(_make_test_class, self._module_names)
+                                 for method in ('test_first', 'test_second')]
+        shards: list[tuple[str, ...]] = split_into_shards(tests)
+
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(shards[0], tuple(test.id() for test in tests[2:]))
+        self.assertEqual(shards[1], tuple(test.id() for test in tests[:2]))
+
+
+class TestShardedTestRunner(TestCase):
+    def test_same_result_as_sequential_run(self) -> None:
+        source: TestSource = TestSource(join(_root_dir, 'python', 'statements'), 'test*.py', _root_dir)
+        sequential_result: TestResult = unittest.TextTestRunner(stream=io.StringIO()).run(source.load())
+
+        result: TestResult = ShardedTestRunner(2, source, stream=io.StringIO()).run(source.load())
+
+        self.assertGreater(result.testsRun, 0)
+        self.assertEqual(result.testsRun, sequential_result.testsRun)
+        self.assertEqual(result.wasSuccessful(), sequential_result.wasSuccessful())
@@ -0,0 +1,79 @@
+import fnmatch
+import re
+from unittest import TestCase, TestSuite
+from unittest.mock import patch
+
+from runner.suite_filter import TestIndex, by_glob, by_regex, by_tag, compile_globs, flatten_suite, tag
+
+
+def _get_test_cases() -> tuple[type[TestCase], type[TestCase]]:
+    """The test cases are defined inside the function, the test loader would run them as module attributes"""
+    @tag('slow')
+    class Tagged(TestCase):
+        @tag('gpu')
+        def test_a(self) -> None:
+            pass
+
+        def test_b(self) -> None:
+            pass
+
+    class Plain(TestCase):
+        @tag('gpu')
+        def test_c(self) -> None:
+            pass
+
+        def test_d(self) -> None:
+            pass
+
+    return Tagged, Plain
+
+
+# prefix of the ids of the test cases
+_CASES_ID: str = f'{__name__}.{_get_test_cases.__qualname__}.<locals>'
+
+
+def _make_suite() -> TestSuite:
+    tagged, plain = _get_test_cases()
+    # levels mix suites and test cases
+    return TestSuite([TestSuite([tagged('test_a'), TestSuite([tagged('test_b')])]),
+                      plain('test_c'), TestSuite([TestSuite([TestSuite([plain('test_d')])])])])
+
+
+def _get_names(suite: TestSuite) -> list[str]:
+    return [test.id().rpartition('.')[2] for test in flatten_suite(suite)]
+
+
+class TestSuiteFilter(TestCase):
+    def test_flatten_mixed_levels(self) -> None:
+        self.assertEqual(_get_names(_make_suite()), ['test_a', 'test_b', 'test_c', 'test_d'])
+
+    def test_predicates(self) -> None:
+        index: TestIndex = TestIndex(_make_suite())
+
+        self.assertEqual(_get_names(index.filter(by_glob(f'{_CASES_ID}.Plain'))), ['test_c', 'test_d'])
+        self.assertEqual(_get_names(index.filter(by_regex(r'test_[ab]$'))), ['test_a', 'test_b'])
+        self.assertEqual(_get_names(index.filter(by_tag('slow'))), ['test_a', 'test_b'])
+        self.assertEqual(_get_names(index.filter(by_tag('gpu'), by_glob('*Plain*'))), ['test_c'])
+
+    def test_select_keeps_order(self) -> None:
+        index: TestIndex = TestIndex(_make_suite())
+
+        self.assertEqual(_get_names(index.select([f'{_CASES_ID}.Plain.test_d', f'{_CASES_ID}.Tagged.test_a'])),
+                         ['test_a', 'test_d'])
+        self.assertIsNone(index.get('missing'))
+
+    def test_large_suite(self) -> None:
+        tagged, plain = _get_test_cases()
+        suite: TestSuite = TestSuite(TestSuite([tagged('test_a'), plain('test_d')] * 50) for _ in range(100))
+
+        filtered: TestSuite = TestIndex(suite).filter(by_glob('*.Plain.*'))
+
+        self.assertEqual(filtered.countTestCases(), 5_000)
+
+    def test_glob_anchor_of_any_python_version(self) -> None:
+        # fnmatch.translate ends the expression with \z since Python 3.14
+        with patch('runner.suite_filter.translate', lambda pattern: fnmatch.translate(pattern)[:-2] + r'\z'):
+            compiled: re.Pattern = compile_globs(('anchor.*_Plain',))
+
+        self.assertIsNotNone(compiled.match('anchor.test_module._Plain.test_c'))
+        self.assertIsNone(compiled.match('anchor.test_module._Plainer'))
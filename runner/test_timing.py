@@ -0,0 +1,55 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import TestCase, TestSuite
+
+from runner.timing import Measurement, Regression, TimingTestResult, find_regressions, read_report, write_report
+
+
+class TestTimingTestResult(TestCase):
+    def test_records_every_test(self) -> None:
+        # defined here to be hidden from the test discovery
+        class Allocating(TestCase):
+            def test_allocate(self) -> None:
+                self.assertEqual(len(bytearray(1024 * 1024)), 1024 * 1024)
+
+            def test_nothing(self) -> None:
+                pass
+
+        suite: TestSuite = unittest.defaultTestLoader.loadTestsFromTestCase(Allocating)
+        result: TimingTestResult = unittest.TextTestRunner(stream=io.StringIO(), resultclass=TimingTestResult).run(
+                suite)
+
+        allocate: Measurement = result.timings[Allocating('test_allocate').id()]
+        nothing: Measurement = result.timings[Allocating('test_nothing').id()]
+        self.assertEqual(len(result.timings), 2)
+        self.assertGreaterEqual(allocate.memory_peak, 1024 * 1024)
+        self.assertLess(nothing.memory_peak, 1024 * 1024)
+        self.assertGreater(allocate.wall_time, 0)
+
+    def test_report_round_trip(self) -> None:
+        timings: dict[str, Measurement] = {'module.Case.test': Measurement(0.5, 0.25, 1024)}
+        with tempfile.TemporaryDirectory() as directory:
+            path: str = os.path.join(directory, 'report.json')
+            write_report(path, timings)
+
+            self.assertEqual(read_report(path), timings)
+
+
+class TestFindRegressions(TestCase):
+    def test_threshold_and_noise_floor(self) -> None:
+        baseline: dict[str, Measurement] = {
+            'slower': Measurement(1.0, 1.0, 10 ** 6),
+            'same': Measurement(1.0, 1.0, 10 ** 6),
+            'tiny': Measurement(0.0001, 0.0001, 100),
+        }
+        timings: dict[str, Measurement] = {
+            'slower': Measurement(2.0, 1.1, 10 ** 6),
+            'same': Measurement(1.1, 1.1, 10 ** 6),
+            'tiny': Measurement(0.001, 0.001, 1000),
+            'new': Measurement(10.0, 10.0, 10 ** 9),
+        }
+
+        self.assertEqual(find_regressions(timings, baseline, threshold=0.5),
+                         [Regression('slower', 'wall_time', 1.0, 2.0)])
@@ -0,0 +1,74 @@
+import contextlib
+import io
+import unittest
+from multiprocessing.connection import Client, Listener
+from os.path import abspath, dirname, join
+from threading import Thread
+from unittest import TestCase, TestResult
+
+from runner.discovery import TestSource
+from runner.worker_pool import AUTHKEY, TestRunRequest, WorkerPoolServer, run_in_worker_pool
+
+_root_dir: str = dirname(dirname(abspath(__file__)))
+
+
+class TestWorkerPool(TestCase):
+    def test_same_result_as_sequential_run(self) -> None:
+        source: TestSource = TestSource(join(_root_dir, 'python', 'statements'), 'test*.py', _root_dir)
+        sequential_result: TestResult = unittest.TextTestRunner(stream=io.StringIO()).run(source.load())
+
+        # the number of tests is greater than the limit per worker, so workers are recycled during the run
+        with WorkerPoolServer(workers=2, max_tests_per_worker=2) as server, \
+                Listener(('localhost', 0), authkey=AUTHKEY) as listener:
+            thread: Thread = Thread(target=server.serve_one, args=(listener,))
+            thread.start()
+            result: TestResult = run_in_worker_pool(listener.address[1], source, stream=io.StringIO())
+            thread.join()
+
+        self.assertGreater(result.testsRun, 2 * 2)
+        self.assertEqual(result.testsRun, sequential_result.testsRun)
+        self.assertEqual(result.wasSuccessful(), sequential_result.wasSuccessful())
+
+    def test_client_disconnected(self) -> None:
+        source: TestSource = TestSource(join(_root_dir, 'python', 'statements'), 'test*.py', _root_dir)
+
+        def disconnect(address: tuple[str, int], send_request: bool) -> None:
+            with Client(address, authkey=AUTHKEY) as conn:
+                if send_request:
+                    conn.send(TestRunRequest(_root_dir, source, verbosity=0))
+
+        with WorkerPoolServer(workers=2, max_tests_per_worker=100) as server, \
+                Listener(('localhost', 0), authkey=AUTHKEY) as listener:
+            for send_request in (False, True):
+                client: Thread = Thread(target=disconnect, args=(listener.address, send_request))
+                client.start()
+                with contextlib.redirect_stderr(io.StringIO()):
+                    server.serve_one(listener)
+                client.join()
+
+            # replies of the abandoned request don't reach the next one
+            thread: Thread = Thread(target=server.serve_one, args=(listener,))
+            thread.start()
+            result: TestResult = run_in_worker_pool(listener.address[1], source, stream=io.StringIO())
+            thread.join()
+
+        sequential_result: TestResult = unittest.TextTestRunner(stream=io.StringIO()).run(source.load())
+        self.assertEqual(result.testsRun, sequential_result.testsRun)
+        self.assertEqual(result.wasSuccessful(), sequential_result.wasSuccessful())
+
+    def test_dead_worker_replaced(self) -> None:
+        source: TestSource = TestSource(join(_root_dir, 'python', 'statements'), 'test*.py', _root_dir)
+
+        with WorkerPoolServer(workers=1, max_tests_per_worker=100) as server, \
+                Listener(('localhost', 0), authkey=AUTHKEY) as listener:
+            # pylint: disable=protected-access
+            server._workers[0].process.kill()
+            server._workers[0].process.join()
+            thread: Thread = Thread(target=server.serve_one, args=(listener,))
+            thread.start()
+            result: TestResult = run_in_worker_pool(listener.address[1], source, stream=io.StringIO())
+            thread.join()
+
+        sequential_result: TestResult = unittest.TextTestRunner(stream=io.StringIO()).run(source.load())
+        self.assertEqual(result.testsRun, sequential_result.testsRun)
+        self.assertEqual(result.wasSuccessful(), sequential_result.wasSuccessful())
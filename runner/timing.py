@@ -0,0 +1,114 @@
+import json
+import math
+import time
+import tracemalloc
+import unittest
+from dataclasses import asdict, dataclass
+from typing import TextIO
+from unittest import TestCase
+
+# values below these are dominated by noise and aren't compared with the baseline
+_metric_floors: dict[str, float] = {
+    'wall_time': 0.005,
+    'cpu_time': 0.005,
+    'memory_peak': 64 * 1024,
+}
+
+
+@dataclass
+class Measurement:
+    wall_time: float
+    cpu_time: float
+    memory_peak: int
+
+
+@dataclass
+class Regression:
+    test_id: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else math.inf
+
+
+class TimingTestResult(unittest.TextTestResult):
+    """Records wall time, CPU time and peak of memory allocated by python for every test"""
+    timings: dict[str, Measurement]
+    _started_tracing: bool
+    _wall_start: float
+    _cpu_start: float
+
+    def __init__(self, stream: TextIO, descriptions: bool, verbosity: int):
+        super().__init__(stream, descriptions, verbosity)
+        self.timings = {}
+        self._started_tracing = False
+
+    def startTestRun(self) -> None:
+        super().startTestRun()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stopTestRun(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        super().stopTestRun()
+
+    def startTest(self, test: TestCase) -> None:
+        super().startTest(test)
+        tracemalloc.reset_peak()
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+
+    def stopTest(self, test: TestCase) -> None:
+        wall_time: float = time.perf_counter() - self._wall_start
+        cpu_time: float = time.process_time() - self._cpu_start
+        self.timings[test.id()] = Measurement(wall_time, cpu_time, tracemalloc.get_traced_memory()[1])
+        super().stopTest(test)
+
+
+def write_report(path: str, timings: dict[str, Measurement]) -> None:
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({'tests': {test_id: asdict(timing) for test_id, timing in sorted(timings.items())}}, file,
+                  indent=2)
+
+
+def read_report(path: str) -> dict[str, Measurement]:
+    with open(path, encoding='utf-8') as file:
+        return {test_id: Measurement(**timing) for test_id, timing in json.load(file)['tests'].items()}
+
+
+def find_regressions(timings: dict[str, Measurement], baseline: dict[str, Measurement],
+                     threshold: float) -> list[Regression]:
+    """Returns metrics which exceed the baseline by more than the threshold, e.g. 0.5 means 50% slower"""
+    regressions: list[Regression] = []
+    for test_id, timing in timings.items():
+        if test_id not in baseline:
+            continue
+        for metric, floor in _metric_floors.items():
+            baseline_value: float = getattr(baseline[test_id], metric)
+            current_value: float = getattr(timing, metric)
+            if current_value > max(baseline_value, floor) * (1 + threshold):
+                regressions.append(Regression(test_id, metric, baseline_value, current_value))
+
+    return sorted(regressions, key=lambda regression: regression.ratio, reverse=True)
+
+
+def _format_value(metric: str, value: float) -> str:
+    return f'{value / 1024:.1f}KiB' if metric == 'memory_peak' else f'{value:.3f}s'
+
+
+def print_regressions(stream: TextIO, regressions: list[Regression], threshold: float) -> None:
+    if len(regressions) == 0:
+        stream.write(f'No performance regressions above {threshold:.0%} found\n')
+        return
+
+    stream.write(f'Performance regressions above {threshold:.0%}:\n')
+    for regression in regressions:
+        baseline: str = _format_value(regression.metric, regression.baseline)
+        current: str = _format_value(regression.metric, regression.current)
+        stream.write(f'{regression.test_id}: {regression.metric} {baseline} -> {current} (x{regression.ratio:.2f})\n')
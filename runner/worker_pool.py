@@ -0,0 +1,286 @@
+"""Resident pool of processes with heavy dependencies (e.g. tensorflow) already imported.
+
+The server keeps the workers alive between test runs, clients send a discovery request over a local socket and receive
+the reports of the test modules as soon as they are finished. The request carries the discovery arguments and the
+test id patterns instead of the list of test ids: the ids are known only after the test modules are imported, and
+importing them in the client would pay the import cost of the heavy dependencies the pool exists to avoid. Workers
+reload the project modules for every request and are replaced by fresh ones after running a configured number of
+tests, so the leaked state does not build up.
+"""
+import importlib
+import multiprocessing
+import os
+import sys
+import sysconfig
+import time
+import traceback
+from argparse import ArgumentParser, Namespace
+from collections import deque
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass
+from multiprocessing.connection import Client, Connection, Listener, wait
+from multiprocessing.process import BaseProcess
+from typing import Any, TextIO
+from unittest import TestResult, TextTestResult
+
+from runner.discovery import TestSource, load_tests, matches
+from runner.sharding import ShardReport, WritelnStream, merge_report, print_summary, run_shard, split_into_shards
+
+DEFAULT_PORT: int = 6001
+AUTHKEY: bytes = b'ds_stack_demo'
+
+_library_paths: tuple[str, ...] = tuple({os.path.abspath(sysconfig.get_path(name)) for name in ('stdlib', 'purelib',
+                                                                                              'platlib')})
+
+
+@dataclass(frozen=True)
+class TestRunRequest:
+    cwd: str
+    source: TestSource
+    verbosity: int
+    resultclass: type[TextTestResult] = TextTestResult
+    patterns: tuple[str, ...] | None = None
+
+
+def _create_context(context_name: str | None) -> AbstractContextManager:
+    if context_name is None:
+        return nullcontext()
+    module_name, _, class_name = context_name.rpartition('.')
+
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def _unload_project_modules(preloaded: set[str]) -> None:
+    """Drops the modules imported by the previous request to pick up the changes of the test files"""
+    for name, module in list(sys.modules.items()):
+        file: str | None = getattr(module, '__file__', None)
+        if name in preloaded or file is None or os.path.abspath(file).startswith(_library_paths):
+            continue
+        del sys.modules[name]
+
+
+def _worker_main(conn: Connection, context_name: str | None, max_tests: int) -> None:
+    with _create_context(context_name):
+        preloaded: set[str] = set(sys.modules)
+        current_request_id: int | None = None
+        tests_run: int = 0
+        while tests_run < max_tests:
+            try:
+                command, request_id, request, shard = conn.recv()
+            except EOFError:
+                break
+            if request_id != current_request_id:
+                current_request_id = request_id
+                _unload_project_modules(preloaded)
+                load_tests.cache_clear()
+                os.chdir(request.cwd)
+
+            response: Any
+            try:
+                if command == 'list':
+                    response = split_into_shards([test for test in load_tests(request.source)
+                                                  if request.patterns is None or matches(test.id(), request.patterns)])
+                else:
+                    response = run_shard(request.source, shard, request.verbosity, request.resultclass)
+                    tests_run += response.tests_run
+            # pylint: disable=broad-except
+            except Exception:
+                response = RuntimeError(traceback.format_exc())
+            conn.send((response, tests_run >= max_tests))
+    conn.close()
+
+
+class _Worker:
+    process: BaseProcess
+    conn: Connection
+
+    def __init__(self, context_name: str | None, max_tests: int):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        # tensorflow and similar libraries aren't fork-safe
+        self.process = multiprocessing.get_context('spawn').Process(target=_worker_main,
+                                                                     args=(child_conn, context_name, max_tests))
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def stop(self) -> None:
+        self.conn.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+def _get_crash_report(shard: tuple[str, ...], exitcode: int | None) -> ShardReport:
+    message: str = f'Worker process exited with code {exitcode} while running the test'
+
+    return ShardReport(tests_run=len(shard), output='', failures=[], errors=[(test_id, message) for test_id in shard],
+                       skipped=[], expected_failures=[], unexpected_successes=[])
+
+
+class WorkerPoolServer:
+    _workers: list[_Worker]
+    _context_name: str | None
+    _max_tests_per_worker: int
+    _request_count: int
+
+    def __init__(self, workers: int, max_tests_per_worker: int, context_name: str | None = None):
+        self._context_name = context_name
+        self._max_tests_per_worker = max_tests_per_worker
+        self._request_count = 0
+        self._workers = [self._start_worker() for _ in range(workers)]
+
+    def __enter__(self) -> 'WorkerPoolServer':
+        return self
+
+    def __exit__(self, *_) -> None:
+        for worker in self._workers:
+            worker.stop()
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(self._context_name, self._max_tests_per_worker)
+
+    def _recycle(self, worker: _Worker) -> _Worker:
+        worker.stop()
+        new_worker: _Worker = self._start_worker()
+        self._workers[self._workers.index(worker)] = new_worker
+
+        return new_worker
+
+    def _call(self, worker: _Worker, message: tuple) -> tuple[Any, _Worker]:
+        """Returns the response of the worker and the worker which should be used instead of the passed one.
+
+        The worker which has died (e.g. killed while idle) is replaced and the message is sent once more to the new one.
+        """
+        exitcode: int | None = None
+        for _ in range(2):
+            try:
+                worker.conn.send(message)
+                response, recycle = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.stop()
+                exitcode = worker.process.exitcode
+                worker = self._recycle(worker)
+                continue
+
+            return response, self._recycle(worker) if recycle else worker
+
+        return RuntimeError(f'Worker process exited with code {exitcode} while handling {message[0]!r}'), worker
+
+    def serve_forever(self, listener: Listener) -> None:
+        while True:
+            self.serve_one(listener)
+
+    def serve_one(self, listener: Listener) -> None:
+        with listener.accept() as conn:
+            try:
+                request: TestRunRequest = conn.recv()
+            except EOFError:
+                return
+            self._request_count += 1
+            try:
+                self._handle(conn, request)
+                conn.send(('done', None))
+            # pylint: disable=broad-except
+            except Exception:
+                message: str = traceback.format_exc()
+                try:
+                    conn.send(('error', message))
+                except OSError:
+                    # the client has disconnected, the server keeps serving the next ones
+                    print(f'Client of request {self._request_count} has disconnected:\n{message}', file=sys.stderr)
+
+    def _handle(self, conn: Connection, request: TestRunRequest) -> None:
+        shards: list[tuple[str, ...]] | RuntimeError
+        shards, _ = self._call(self._workers[0], ('list', self._request_count, request, None))
+        if isinstance(shards, RuntimeError):
+            raise shards
+
+        pending: deque[tuple[str, ...]] = deque(shards)
+        idle: list[_Worker] = list(self._workers)
+        busy: dict[Connection, tuple[_Worker, tuple[str, ...]]] = {}
+        # the first error stops sending new shards, the replies of the busy workers are still received, otherwise
+        # they would be read as the replies to the next request
+        error: Exception | None = None
+        while len(pending) > 0 or len(busy) > 0:
+            while len(pending) > 0 and len(idle) > 0:
+                worker: _Worker = idle.pop()
+                shard: tuple[str, ...] = pending.popleft()
+                worker.conn.send(('run', self._request_count, request, shard))
+                busy[worker.conn] = worker, shard
+
+            for ready in wait(list(busy)):
+                worker, shard = busy.pop(ready)
+                try:
+                    report, recycle = ready.recv()
+                except EOFError:
+                    report, recycle = _get_crash_report(shard, worker.process.exitcode), True
+                idle.append(self._recycle(worker) if recycle else worker)
+                if error is not None:
+                    continue
+                if isinstance(report, RuntimeError):
+                    error = report
+                    pending.clear()
+                    continue
+                try:
+                    conn.send(('report', report))
+                except OSError as send_error:
+                    error = send_error
+                    pending.clear()
+        if error is not None:
+            raise error
+
+
+# pylint: disable=too-many-arguments
+def run_in_worker_pool(port: int, source: TestSource, *, verbosity: int = 1, stream: TextIO | None = None,
+                       resultclass: type[TextTestResult] = TextTestResult,
+                       patterns: list[str] | None = None) -> TestResult:
+    """Runs all tests of the source or only the ones matching the patterns (see runner.discovery.matches)"""
+    writeln_stream: WritelnStream = WritelnStream(sys.stderr if stream is None else stream)
+    result: TextTestResult = resultclass(writeln_stream, True, verbosity)
+    request: TestRunRequest = TestRunRequest(
+            cwd=os.getcwd(),
+            source=TestSource(os.path.abspath(source.start_dir), source.pattern,
+                              None if source.top_level_dir is None else os.path.abspath(source.top_level_dir),
+                              source.module_names),
+            verbosity=verbosity,
+            resultclass=resultclass,
+            patterns=None if patterns is None else tuple(patterns),
+    )
+
+    start_time: float = time.perf_counter()
+    with Client(('localhost', port), authkey=AUTHKEY) as conn:
+        conn.send(request)
+        while True:
+            kind, payload = conn.recv()
+            if kind == 'done':
+                break
+            if kind == 'error':
+                raise RuntimeError(f'Worker pool failed to run the tests:\n{payload}')
+            writeln_stream.write(payload.output)
+            writeln_stream.flush()
+            merge_report(result, payload, {})
+    time_taken: float = time.perf_counter() - start_time
+
+    result.printErrors()
+    print_summary(writeln_stream, result, time_taken)
+
+    return result
+
+
+def main(context_name: str | None = None) -> None:
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument('--max-tests', type=int, default=200, help='number of tests after which a worker is replaced')
+    parser.add_argument('--context', default=context_name,
+                        help='dotted path of the context manager class every worker runs the tests within')
+    args: Namespace = parser.parse_args()
+
+    with WorkerPoolServer(args.workers, args.max_tests, args.context) as server, \
+            Listener(('localhost', args.port), authkey=AUTHKEY) as listener:
+        print(f'Serving {args.workers} workers on localhost:{args.port}')
+        server.serve_forever(listener)
+
+
+if __name__ == '__main__':
+    main()
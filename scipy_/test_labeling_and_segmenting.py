@@ -1,7 +1,10 @@
 from unittest import TestCase
 
 import numpy as np
-from scipy.ndimage import label, find_objects, sum_labels
+
+from lazy_imports import lazy_import
+
+ndimage = lazy_import('scipy.ndimage')
 
 
 class TestLabelingAndSegmenting(TestCase):
@@ -18,7 +21,7 @@ class TestLabelingAndSegmenting(TestCase):
 
         image_labeled: np.ndarray
         labels_count: int
-        image_labeled, labels_count = label(self.image, footprint_4_connected)
+        image_labeled, labels_count = ndimage.label(self.image, footprint_4_connected)
 
         self.assertEqual(labels_count, 2)
         self.assertTrue(np.all(image_labeled == np.array([[1, 0],
@@ -31,7 +34,7 @@ class TestLabelingAndSegmenting(TestCase):
 
         image_labeled: np.ndarray
         labels_count: int
-        image_labeled, labels_count = label(self.image, footprint_8_connected)
+        image_labeled, labels_count = ndimage.label(self.image, footprint_8_connected)
 
         self.assertEqual(labels_count, 1)
         self.assertTrue(np.all(image_labeled == np.array([[1, 0],
@@ -41,10 +44,10 @@ class TestLabelingAndSegmenting(TestCase):
         image_labeled: np.ndarray
         # pylint: disable=unused-variable
         labels_count: int
-        image_labeled, labels_count = label(self.image)
+        image_labeled, labels_count = ndimage.label(self.image)
 
         # noinspection PyTypeChecker
-        objects_list: list[slice] = find_objects(image_labeled)
+        objects_list: list[slice] = ndimage.find_objects(image_labeled)
 
         self.assertEqual(objects_list[0], (slice(0, 1, None), slice(0, 1, None)))
         self.assertEqual(objects_list[1], (slice(1, 2, None), slice(1, 2, None)))
@@ -58,18 +61,18 @@ class TestLabelingAndSegmenting(TestCase):
         image_labeled: np.ndarray
         # pylint: disable=unused-variable
         labels_count: int
-        image_labeled, labels_count = label(self.image)
+        image_labeled, labels_count = ndimage.label(self.image)
         # image_labeled legend:
         # 0 - background
         # 1 - first_obj
         # 2 - second_obj
 
         # noinspection PyTypeChecker
-        objects_list: list[slice] = find_objects(image_labeled)
+        objects_list: list[slice] = ndimage.find_objects(image_labeled)
 
         square: np.ndarray = np.ones(self.image.shape)
-        first_object_area: float = sum_labels(square[objects_list[0]], image_labeled[objects_list[0]], 1)
+        first_object_area: float = ndimage.sum_labels(square[objects_list[0]], image_labeled[objects_list[0]], 1)
         self.assertEqual(first_object_area, 1.0)
 
-        all_object_areas: np.ndarray = sum_labels(square, image_labeled, [0, 1, 2])
+        all_object_areas: np.ndarray = ndimage.sum_labels(square, image_labeled, [0, 1, 2])
         self.assertTrue(np.all(all_object_areas == np.array([2.0, 1.0, 1.0])))
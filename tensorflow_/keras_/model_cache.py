@@ -0,0 +1,110 @@
+"""Process wide cache of Keras model architectures shared by the tests.
+
+Models are built once per configuration of the main layer, the loss and the metrics, every test gets its own copy made
+by clone_model with the weights set from the snapshot taken after the model was built, and compiles it with its own
+optimizer, loss and metrics. Copies share no state, so a test can't see what another test did to its model.
+Tests which change the model itself (add_loss, add_metric) have to build their own model.
+
+Keys contain the module, the qualified name and the code of the classes and the functions, get_config() of the
+layers, losses and metrics and the captured values of the functions. Classes and functions defined inside the tests
+are new objects on every call but share the code objects of the defining function, so they get the same key in every
+call, while the definitions with the same name in the different tests get different keys. Functions capturing objects
+without a value (e.g. the TestCase) have no key and their models aren't cached.
+"""
+import json
+from dataclasses import dataclass
+from types import CodeType
+from typing import Any, Callable, Hashable
+
+import numpy as np
+import tensorflow as tf
+
+# layer names are unique per instance (e.g. "dense_1") so they are not a part of the configuration
+_INSTANCE_CONFIG_KEYS: tuple[str, ...] = ('name',)
+
+
+def _get_config_key(config: dict[str, Any], ignored_keys: tuple[str, ...] = ()) -> str:
+    return json.dumps({key: value for key, value in config.items() if key not in ignored_keys},
+                      sort_keys=True, default=repr)
+
+
+def _get_definition_key(definition: Any) -> tuple[str, str, tuple[CodeType, ...]]:
+    """Module, qualified name and code objects of the function or the class, the code objects are a part of the key
+    themselves, ids could be reused by other code after the defining function is collected"""
+    members: list[Any] = list(vars(definition).values()) if isinstance(definition, type) else [definition]
+    codes: tuple[CodeType, ...] = tuple(member.__code__ for member in members if isinstance(
+        getattr(member, '__code__', None), CodeType))
+
+    return definition.__module__, definition.__qualname__, codes
+
+
+_VALUE_TYPES: tuple[type, ...] = (bool, int, float, str, type(None))
+
+
+def get_object_key(value: Any) -> Hashable:
+    """Returns the key of a layer, loss or metric which is equal for the objects with the same configuration, raises
+    TypeError for the functions capturing objects which aren't plain values"""
+    if value is None:
+        return None
+    if isinstance(value, tf.keras.layers.Layer):
+        return _get_definition_key(type(value)), _get_config_key(value.get_config(), _INSTANCE_CONFIG_KEYS)
+    if isinstance(value, (tf.keras.losses.Loss, tf.keras.metrics.Metric)):
+        return _get_definition_key(type(value)), _get_config_key(value.get_config())
+    if callable(value):
+        # closures with different captured values are different functions
+        captured: tuple[Any, ...] = tuple(cell.cell_contents for cell in (getattr(value, '__closure__', None) or ()))
+        if not all(isinstance(item, _VALUE_TYPES) for item in captured):
+            raise TypeError(f'{getattr(value, "__qualname__", value)} captures objects without a value configuration')
+        # callable objects without __qualname__ (e.g. functools.partial) are keyed by their class
+        return _get_definition_key(value if hasattr(value, '__qualname__') else type(value)), captured
+
+    return repr(value)
+
+
+def get_model_key(main_layer: Any, loss: Any, metrics: list | None) -> Hashable | None:
+    """Returns the key of the model compiled with the layer, the loss and the metrics, None if it can't be cached"""
+    try:
+        return get_object_key(main_layer), get_object_key(loss), tuple(get_object_key(metric)
+                                                                       for metric in metrics or ())
+    except TypeError:
+        return None
+
+
+@dataclass
+class _CachedModel:
+    model: tf.keras.Model  # never handed out, only cloned
+    weights: list[np.ndarray]
+
+
+class CompiledModelCache:
+    _models: dict[Hashable, _CachedModel]
+
+    def __init__(self):
+        self._models = {}
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def get(self, key: Hashable | None, build: Callable[[], tf.keras.Model],
+            compile_model: Callable[[tf.keras.Model], None]) -> tf.keras.Model:
+        """Returns a copy of the model built by build() for the key with the initial weights compiled by
+        compile_model, the model isn't cached when the key is None"""
+        cached: _CachedModel | None = self._models.get(key)
+        if cached is None:
+            model: tf.keras.Model = build()
+            if key is None:
+                compile_model(model)
+                return model
+            cached = self._models[key] = _CachedModel(model, model.get_weights())
+
+        clone: tf.keras.Model = tf.keras.models.clone_model(cached.model)
+        clone.set_weights(cached.weights)
+        compile_model(clone)
+
+        return clone
+
+    def clear(self) -> None:
+        self._models.clear()
+
+
+model_cache: CompiledModelCache = CompiledModelCache()
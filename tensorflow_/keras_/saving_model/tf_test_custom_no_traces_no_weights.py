@@ -8,6 +8,7 @@ from tensorflow_.suppress_tf_warning import SuppressTFWarnings
 from .models import SimplestCustomModel, CustomModelWithParam, CustomModelWithParamConfig
 
 _save_path: str = join(OUTPUT_PATH, 'saved')
+SHARD_GROUP: str = OUTPUT_PATH  # modules saving to OUTPUT_PATH can't be run in parallel
 
 
 class TestCustomNoTracesNoWeight(TestCase):
@@ -9,6 +9,7 @@ from .models import CustomModelWithWeights
 from ...suppress_tf_warning import SuppressTFWarnings
 
 _save_path: str = join(OUTPUT_PATH, 'saved')
+SHARD_GROUP: str = OUTPUT_PATH  # modules saving to OUTPUT_PATH can't be run in parallel
 
 
 # For some reason, model with 'build' function cannot be restored without traces correctly
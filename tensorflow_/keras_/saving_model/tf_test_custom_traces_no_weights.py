@@ -8,6 +8,7 @@ from constants import OUTPUT_PATH
 from .models import SimplestCustomModel, CustomModelWithParam
 
 _save_path: str = join(OUTPUT_PATH, 'saved')
+SHARD_GROUP: str = OUTPUT_PATH  # modules saving to OUTPUT_PATH can't be run in parallel
 
 
 class TestCustomTracesNoWeight(TestCase):
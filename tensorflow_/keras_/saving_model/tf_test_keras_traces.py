@@ -7,6 +7,7 @@ from constants import OUTPUT_PATH
 from tensorflow_.suppress_tf_warning import SuppressTFWarnings
 
 _save_path: str = join(OUTPUT_PATH, 'saved')
+SHARD_GROUP: str = OUTPUT_PATH  # modules saving to OUTPUT_PATH can't be run in parallel
 
 
 class TestKerasTraces(TestCase):
@@ -49,6 +49,7 @@ class Sequential(tf.keras.Model):
 
 
 _save_path: str = join(OUTPUT_PATH, 'saved')
+SHARD_GROUP: str = OUTPUT_PATH  # modules saving to OUTPUT_PATH can't be run in parallel
 
 
 class TestModelSaving(TestCase):
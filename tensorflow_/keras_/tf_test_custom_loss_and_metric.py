@@ -3,6 +3,7 @@ from unittest import TestCase
 
 import tensorflow as tf
 
+from tensorflow_.keras_.model_cache import CompiledModelCache, get_model_key, model_cache
 from tensorflow_.suppress_tf_warning import SuppressTFWarnings
 
 
@@ -22,17 +23,23 @@ class TestCustomLossAndMetric(TestCase):
     @staticmethod
     def __build_model(main_layer: tf.keras.layers.Layer | None = None,
                       loss: tf.keras.losses.Loss | Callable[[tf.Tensor, tf.Tensor], tf.Tensor] | None = None,
-                      metrics: list[tf.keras.metrics.Metric] | None = None) -> tf.keras.Model:
-        input_layer = tf.keras.Input(shape=(1,))
-        layer = main_layer(input_layer) if main_layer is not None else input_layer
-        model = tf.keras.Model(inputs=input_layer, outputs=layer)
-        model.compile(
-                optimizer=tf.keras.optimizers.SGD(learning_rate=0.01),
-                loss=loss,
-                metrics=metrics,
-        )
-
-        return model
+                      metrics: list[tf.keras.metrics.Metric] | None = None,
+                      cached: bool = True) -> tf.keras.Model:
+        """Models which are changed by the test (e.g. by add_metric) must not be cached"""
+        def build() -> tf.keras.Model:
+            input_layer = tf.keras.Input(shape=(1,))
+            layer = main_layer(input_layer) if main_layer is not None else input_layer
+
+            return tf.keras.Model(inputs=input_layer, outputs=layer)
+
+        def compile_model(model: tf.keras.Model) -> None:
+            model.compile(
+                    optimizer=tf.keras.optimizers.SGD(learning_rate=0.01),
+                    loss=loss,
+                    metrics=metrics,
+            )
+
+        return model_cache.get(get_model_key(main_layer, loss, metrics) if cached else None, build, compile_model)
 
     def __evaluate_model(self, model: tf.keras.Model) -> float | list[float]:
         with SuppressTFWarnings():
@@ -53,9 +60,77 @@ class TestCustomLossAndMetric(TestCase):
         self.assertAlmostEqual(loss, target_loss)
         self.assertAlmostEqual(metric, target_metric)
 
+    def test_cached_model_is_copied(self) -> None:
+        model: tf.keras.Model = self.__build_model(main_layer=tf.keras.layers.Dense(1, kernel_initializer='ones'),
+                                                   loss=tf.keras.losses.mean_squared_error)
+        initial_weights: list = model.get_weights()
+        first_loss: float = self.__evaluate_model(model)
+
+        copy: tf.keras.Model = self.__build_model(main_layer=tf.keras.layers.Dense(1, kernel_initializer='ones'),
+                                                  loss=tf.keras.losses.mean_squared_error)
+        self.assertIsNot(copy, model)
+        self.assertIsNot(copy.optimizer, model.optimizer)
+        self.assertEqual(int(copy.optimizer.iterations.numpy()), 0)
+        for weights, initial in zip(copy.get_weights(), initial_weights):
+            self.assertTrue((weights == initial).all())
+        self.assertAlmostEqual(self.__evaluate_model(copy), first_loss)
+
+    def test_model_keys(self) -> None:
+        def define_loss(additional_term: float) -> tf.keras.losses.Loss:
+            class ScaledMSE(tf.keras.losses.MeanSquaredError):
+                def get_config(self) -> dict:
+                    return {**super().get_config(), 'additional_term': additional_term}
+
+            return ScaledMSE()
+
+        def define_other_loss(additional_term: float) -> tf.keras.losses.Loss:
+            class ScaledMSE(tf.keras.losses.MeanSquaredError):
+                def get_config(self) -> dict:
+                    return {**super().get_config(), 'additional_term': additional_term, 'other': True}
+
+                def call(self, y_true: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
+                    return super().call(y_true, y_pred) * 2
+
+            return ScaledMSE()
+
+        # every call defines a new class, it shares the code and the qualified name with the class of the other calls
+        self.assertEqual(get_model_key(None, define_loss(1.0), None), get_model_key(None, define_loss(1.0), None))
+        self.assertNotEqual(get_model_key(None, define_loss(1.0), None), get_model_key(None, define_loss(2.0), None))
+        # the classes of the same name defined in the different places
+        self.assertNotEqual(get_model_key(None, define_loss(1.0), None),
+                            get_model_key(None, define_other_loss(1.0), None))
+        self.assertNotEqual(get_model_key(None, lambda y_true, y_pred: y_pred, None),
+                            get_model_key(None, lambda y_true, y_pred: y_true, None))
+        self.assertIsNone(get_model_key(None, lambda y_true, y_pred: y_pred + self._constant, None))
+
+    def test_cache(self) -> None:
+        cache: CompiledModelCache = CompiledModelCache()
+        builds: list[tf.keras.Model] = []
+
+        def build() -> tf.keras.Model:
+            input_layer = tf.keras.Input(shape=(1,))
+            builds.append(tf.keras.Model(inputs=input_layer, outputs=tf.keras.layers.Dense(1)(input_layer)))
+            return builds[-1]
+
+        def compile_model(model: tf.keras.Model) -> None:
+            model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=0.1), loss='mse')
+
+        first: tf.keras.Model = cache.get('dense', build, compile_model)
+        first_loss: float = self.__evaluate_model(first)
+        second: tf.keras.Model = cache.get('dense', build, compile_model)
+
+        self.assertEqual((len(builds), len(cache)), (1, 1))
+        self.assertNotIn(first, builds)
+        self.assertAlmostEqual(self.__evaluate_model(second), first_loss)
+        self.assertIs(cache.get(None, build, compile_model), builds[-1])
+        self.assertEqual((len(builds), len(cache)), (2, 1))
+
     def test_custom_loss_function(self) -> None:
+        # the function captures the value instead of self to be a part of the model cache key
+        constant: float = self._constant
+
         def custom_mean_squared_error(y_true: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
-            return tf.math.reduce_mean(tf.square(y_true - y_pred)) + self._constant
+            return tf.math.reduce_mean(tf.square(y_true - y_pred)) + constant
 
         target_loss: float = (self._target - self._constant) ** 2 + self._constant
 
@@ -72,6 +147,10 @@ class TestCustomLossAndMetric(TestCase):
                 super().__init__(name='custom_mse')
                 self.additional_term = additional_term
 
+            # configuration is a part of the model cache key
+            def get_config(self) -> dict:
+                return {**super().get_config(), 'additional_term': self.additional_term}
+
             # labels/predictions count corresponds to batch_size
             def call(self, y_true: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
                 return tf.math.reduce_mean(tf.square(y_true - y_pred)) + self.additional_term
@@ -100,6 +179,9 @@ class TestCustomLossAndMetric(TestCase):
 
                 self.mean_absolute_error.assign_add(tf.reduce_mean(values) + self.additional_term)
 
+            def get_config(self) -> dict:
+                return {**super().get_config(), 'additional_term': self.additional_term}
+
             def result(self) -> tf.Tensor:
                 return self.mean_absolute_error
 
@@ -139,7 +221,7 @@ class TestCustomLossAndMetric(TestCase):
         term: float = 1.0
         target_loss: float = (self._target - self._constant) ** 2 + term
 
-        model: tf.keras.Model = self.__build_model(loss=tf.keras.losses.mean_squared_error, )
+        model: tf.keras.Model = self.__build_model(loss=tf.keras.losses.mean_squared_error, cached=False)
         self.assertEqual(len(model.losses), 0)
 
         model.add_loss(lambda: term)
@@ -158,7 +240,7 @@ class TestCustomLossAndMetric(TestCase):
 
         target_metric: float = term
         model: tf.keras.Model = self.__build_model(main_layer=AdditionalMetricLayer(),
-                                                   loss=tf.keras.losses.mean_squared_error)
+                                                   loss=tf.keras.losses.mean_squared_error, cached=False)
         self.assertEqual(len(model.metrics), 1)
 
         metric: float
@@ -171,7 +253,7 @@ class TestCustomLossAndMetric(TestCase):
         term: float = 1.0
         target_metric: float = self._constant + term
 
-        model = self.__build_model(loss=tf.keras.losses.mean_squared_error)
+        model = self.__build_model(loss=tf.keras.losses.mean_squared_error, cached=False)
         model.add_metric(model.outputs[0] + term, name='additional_term', aggregation='mean')
         metric: float
         _, metric = self.__evaluate_model(model)
@@ -1,16 +1,18 @@
 from types import TracebackType
 
-import absl.logging
-import tensorflow as tf
+from lazy_imports import lazy_import
+
+absl_logging = lazy_import('absl.logging')
+tf = lazy_import('tensorflow')
 
 
 class SuppressTFWarnings:
     def __enter__(self) -> None:
         tf.compat.v1.logging.set_verbosity(tf.compat.v1.logging.ERROR)
-        absl.logging.set_verbosity(absl.logging.ERROR)
+        absl_logging.set_verbosity(absl_logging.ERROR)
 
     def __exit__(self, exc_type: type[BaseException] | None,
                  exc_val: BaseException | None,
                  exc_tb: TracebackType | None) -> None:
         tf.compat.v1.logging.set_verbosity(tf.compat.v1.logging.WARN)
-        absl.logging.set_verbosity(absl.logging.WARNING)
+        absl_logging.set_verbosity(absl_logging.WARNING)
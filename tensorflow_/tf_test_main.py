@@ -1,6 +1,11 @@
 # need this module because for some reason, DataSpell sometimes refuses to run configurations for tests
-import unittest
+import sys
+from os.path import abspath, dirname
+
+# the script is run by path from the repository root, python puts only tensorflow_/ on the path then
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from runner.cli import main  # pylint: disable=wrong-import-position
 
 if __name__ == '__main__':
-    tests = unittest.defaultTestLoader.discover('.', pattern='tf_test*.py')
-    unittest.TextTestRunner(verbosity=2).run(tests)
+    main('tf_test*.py')
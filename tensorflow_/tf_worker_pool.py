@@ -0,0 +1,11 @@
+# keeps tensorflow imported by resident processes, run tf_test_main.py with --worker-pool argument to use them
+import sys
+from os.path import abspath, dirname
+
+# the script is run by path from the repository root, python puts only tensorflow_/ on the path then
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from runner.worker_pool import main  # pylint: disable=wrong-import-position
+
+if __name__ == '__main__':
+    main('tensorflow_.suppress_tf_warning.SuppressTFWarnings')
@@ -0,0 +1,24 @@
+import sys
+from types import ModuleType
+from unittest import TestCase
+
+from lazy_imports import LazyModule, lazy_import
+
+
+class TestLazyImports(TestCase):
+    def test_import_on_attribute_access(self) -> None:
+        sys.modules.pop('wave', None)
+
+        wave: ModuleType = lazy_import('wave')
+        self.assertIsInstance(wave, LazyModule)
+        self.assertNotIn('wave', sys.modules)
+
+        self.assertTrue(callable(wave.open))
+        self.assertIn('wave', sys.modules)
+        self.assertIs(lazy_import('wave'), sys.modules['wave'])
+
+    def test_missing_module_fails_on_access(self) -> None:
+        missing: ModuleType = lazy_import('missing_module_name')
+
+        with self.assertRaises(ModuleNotFoundError):
+            _ = missing.attribute
@@ -1,6 +1,5 @@
 # need this module because for some reason, DataSpell sometimes refuses to run configurations for tests
-import unittest
+from runner.cli import main
 
 if __name__ == '__main__':
-    tests = unittest.defaultTestLoader.discover('.')
-    unittest.TextTestRunner(verbosity=2).run(tests)
+    main('test*.py')